@@ -1,5 +1,11 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from inviteflow.paginators import EstimatedCountPaginator
+from invitations.models import Invitation
+
 from .models import User
 
 
@@ -11,6 +17,8 @@ class UserAdmin(BaseUserAdmin):
     list_filter = ['tier', 'is_staff', 'is_superuser', 'is_active']
     search_fields = ['email', 'username', 'first_name', 'last_name']
     ordering = ['-created_at']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     fieldsets = (
         (None, {'fields': ('email', 'username', 'password')}),
@@ -30,3 +38,19 @@ class UserAdmin(BaseUserAdmin):
     )
 
     readonly_fields = ['created_at', 'updated_at']
+
+    def get_queryset(self, request):
+        # Read the stored total (UserStats); count only for hosts without a stats row yet
+        invitations = Invitation.objects.filter(user=OuterRef('pk')).order_by().values('user')
+        return super().get_queryset(request).annotate(
+            invitation_total=Coalesce(
+                'stats__total_invitations',
+                Subquery(invitations.annotate(count=Count('pk')).values('count')),
+                0,
+                output_field=IntegerField(),
+            )
+        )
+
+    def invitation_count(self, obj):
+        return obj.invitation_total
+    invitation_count.short_description = 'Invitations'
@@ -0,0 +1,89 @@
+"""
+JWT authentication that resolves users from the cache.
+
+simplejwt's JWTAuthentication loads the user row on every request. Here the
+fields authentication and the API read from ``request.user`` are cached for
+AUTH_USER_CACHE_TIMEOUT seconds under the user's id, so most authenticated
+requests do no user lookup at all. The password hash is never cached: the
+user is rebuilt with the other fields deferred. Saving or deleting a user
+drops the entry (signals.py), and again once the transaction commits. A
+password change bumps the user's ``token_version``: tokens carrying an older
+version in their ``ver`` claim are rejected, cached or not.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+TIER_CLAIM = 'tier'
+TOKEN_VERSION_CLAIM = 'ver'
+
+
+def _user_key(user_id):
+    return f'auth-user:{user_id}'
+
+
+# The user fields kept in the cache; any other field is loaded on first access
+CACHED_USER_FIELDS = (
+    'id', 'email', 'tier', 'is_active', 'is_staff', 'is_superuser', 'token_version'
+)
+
+
+def _user_from_fields(fields):
+    """A User with ``fields`` loaded and the rest deferred, as ``.only()`` returns one."""
+    model = get_user_model()
+    names = [field.attname for field in model._meta.concrete_fields if field.attname in fields]
+    return model.from_db(DEFAULT_DB_ALIAS, names, [fields[name] for name in names])
+
+
+def get_cached_user(user_id):
+    """The user with ``user_id``, from the cache when possible; None if there is none."""
+    key = _user_key(user_id)
+    fields = cache.get(key)
+    if fields is None:
+        fields = get_user_model().objects.filter(
+            **{api_settings.USER_ID_FIELD: user_id}
+        ).values(*CACHED_USER_FIELDS).first()
+        if fields is None:
+            return None
+        cache.set(key, fields, settings.INVITEFLOW_SETTINGS.get('AUTH_USER_CACHE_TIMEOUT', 60))
+    return _user_from_fields(fields)
+
+
+def invalidate_cached_user(user_id):
+    key = _user_key(user_id)
+    cache.delete(key)
+    # Again once the change is visible to other connections, which may have
+    # cached the old row in between.
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def get_token_user(token):
+    """The active user a token was issued to, with the same checks as JWTAuthentication."""
+    try:
+        user_id = token[api_settings.USER_ID_CLAIM]
+    except KeyError as e:
+        raise InvalidToken(_('Token contained no recognizable user identification')) from e
+
+    user = get_cached_user(user_id)
+    if user is None:
+        raise AuthenticationFailed(_('User not found'), code='user_not_found')
+
+    if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+        raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+    if token.get(TOKEN_VERSION_CLAIM, 0) != user.token_version:
+        raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
+
+    return user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that reads users through the cache instead of the database."""
+
+    def get_user(self, validated_token):
+        return get_token_user(validated_token)
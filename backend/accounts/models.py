@@ -14,6 +14,8 @@ class User(AbstractUser):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     email = models.EmailField(unique=True)
     tier = models.CharField(max_length=10, choices=Tier.choices, default=Tier.FREE)
+    # Bumped by ChangePasswordView; tokens issued for an older version are rejected
+    token_version = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -28,32 +30,19 @@ class User(AbstractUser):
     def __str__(self):
         return self.email
 
+    # Tier limits and usage come from the quota service (invitations/quotas.py)
+
     @property
     def invitation_count(self):
-        return self.invitations.count()
+        from invitations.quotas import invitation_quota
+        return invitation_quota(self)['used']
 
     @property
     def can_create_invitation(self):
-        from django.conf import settings
-        limits = settings.INVITEFLOW_SETTINGS
-
-        if self.tier == self.Tier.FREE:
-            max_invitations = limits['FREE_TIER_MAX_INVITATIONS']
-        elif self.tier == self.Tier.PRO:
-            max_invitations = limits['PRO_TIER_MAX_INVITATIONS']
-        else:
-            return True  # Premium has unlimited
-
-        return self.invitation_count < max_invitations
+        from invitations.quotas import invitation_quota
+        return invitation_quota(self)['remaining'] != 0
 
     @property
     def max_guests_per_invitation(self):
-        from django.conf import settings
-        limits = settings.INVITEFLOW_SETTINGS
-
-        if self.tier == self.Tier.FREE:
-            return limits['FREE_TIER_MAX_GUESTS_PER_INVITATION']
-        elif self.tier == self.Tier.PRO:
-            return limits['PRO_TIER_MAX_GUESTS_PER_INVITATION']
-        else:
-            return None  # Unlimited
+        from invitations.quotas import guest_limit
+        return guest_limit(self.tier)
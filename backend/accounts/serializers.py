@@ -1,16 +1,41 @@
 from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 
+from invitations.quotas import guest_limit, invitation_quota
+
+from .authentication import TIER_CLAIM, TOKEN_VERSION_CLAIM, get_token_user
+
 User = get_user_model()
 
 
-class UserSerializer(serializers.ModelSerializer):
+class QuotaFieldsMixin:
+    """Getters for the tier usage fields, read from a single quota lookup per user."""
+
+    def to_representation(self, instance):
+        self.quota = invitation_quota(instance)
+        return super().to_representation(instance)
+
+    def get_invitation_count(self, obj):
+        return self.quota['used']
+
+    def get_can_create_invitation(self, obj):
+        return self.quota['remaining'] != 0
+
+    def get_max_guests_per_invitation(self, obj):
+        return guest_limit(obj.tier)
+
+
+class UserSerializer(QuotaFieldsMixin, serializers.ModelSerializer):
     """Serializer for user profile."""
 
-    invitation_count = serializers.ReadOnlyField()
-    can_create_invitation = serializers.ReadOnlyField()
-    max_guests_per_invitation = serializers.ReadOnlyField()
+    invitation_count = serializers.SerializerMethodField()
+    can_create_invitation = serializers.SerializerMethodField()
+    max_guests_per_invitation = serializers.SerializerMethodField()
 
     class Meta:
         model = User
@@ -75,12 +100,12 @@ class ChangePasswordSerializer(serializers.Serializer):
         return value
 
 
-class UserTierSerializer(serializers.ModelSerializer):
+class UserTierSerializer(QuotaFieldsMixin, serializers.ModelSerializer):
     """Serializer for user tier information."""
 
-    invitation_count = serializers.ReadOnlyField()
-    can_create_invitation = serializers.ReadOnlyField()
-    max_guests_per_invitation = serializers.ReadOnlyField()
+    invitation_count = serializers.SerializerMethodField()
+    can_create_invitation = serializers.SerializerMethodField()
+    max_guests_per_invitation = serializers.SerializerMethodField()
     invitations_remaining = serializers.SerializerMethodField()
 
     class Meta:
@@ -91,14 +116,56 @@ class UserTierSerializer(serializers.ModelSerializer):
         ]
 
     def get_invitations_remaining(self, obj):
-        from django.conf import settings
-        limits = settings.INVITEFLOW_SETTINGS
+        return self.quota['remaining']
+
+
+class UserRefreshToken(RefreshToken):
+    """Refresh token carrying the user's tier and token version.
+
+    Access tokens minted from it copy both claims.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token.set_user_claims(user)
+        return token
+
+    def set_user_claims(self, user):
+        self[TIER_CLAIM] = user.tier
+        self[TOKEN_VERSION_CLAIM] = user.token_version
+
+
+class UserTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Login serializer issuing UserRefreshTokens."""
+
+    token_class = UserRefreshToken
+
+
+class UserTokenRefreshSerializer(TokenRefreshSerializer):
+    """Token refresh that rejects revoked tokens and brings the tier claim up to date."""
+
+    token_class = UserRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        try:
+            user = get_token_user(refresh)
+        except AuthenticationFailed:
+            raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+        refresh.set_user_claims(user)
+
+        data = {'access': str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                refresh.blacklist()
+
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            refresh.outstand()
 
-        if obj.tier == User.Tier.FREE:
-            max_inv = limits['FREE_TIER_MAX_INVITATIONS']
-        elif obj.tier == User.Tier.PRO:
-            max_inv = limits['PRO_TIER_MAX_INVITATIONS']
-        else:
-            return None  # Unlimited
+            data['refresh'] = str(refresh)
 
-        return max(0, max_inv - obj.invitation_count)
+        return data
@@ -1,3 +1,76 @@
-from django.test import TestCase
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from .authentication import CACHED_USER_FIELDS, _user_key
+from .models import User
+from .serializers import UserRefreshToken
+
+
+class TokenVersionTests(TestCase):
+    """Password changes revoke issued tokens; nothing else does."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='host@example.com', username='host', password='old-password-1'
+        )
+        self.access = str(UserRefreshToken.for_user(self.user).access_token)
+        self.addCleanup(cache.delete, _user_key(self.user.pk))
+
+    def get_profile(self, access):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        return client.get('/api/auth/me/')
+
+    def test_password_change_revokes_tokens(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access}')
+        response = client.put('/api/auth/me/change-password/', {
+            'old_password': 'old-password-1', 'new_password': 'new-password-2'
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.get_profile(self.access).status_code, 401)
+        self.assertEqual(self.get_profile(response.data['tokens']['access']).status_code, 200)
+
+    @override_settings(PASSWORD_HASHERS=[
+        'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+        'django.contrib.auth.hashers.MD5PasswordHasher',
+    ])
+    def test_hash_upgrade_keeps_tokens(self):
+        User.objects.filter(pk=self.user.pk).update(
+            password=make_password('old-password-1', hasher='md5')
+        )
+        user = User.objects.get(pk=self.user.pk)
+        self.assertTrue(user.check_password('old-password-1'))
+        # A later save of the same instance must not revoke anything either
+        user.save()
+
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('pbkdf2_'))
+        self.assertEqual(user.token_version, 0)
+        self.assertEqual(self.get_profile(self.access).status_code, 200)
+
+    def test_cache_holds_no_password_hash(self):
+        response = self.get_profile(self.access)
+        self.assertEqual(response.data['email'], 'host@example.com')
+
+        cached = cache.get(_user_key(self.user.pk))
+        self.assertNotIn('password', cached)
+        self.assertEqual(cached['token_version'], 0)
+        # Served from the cache the second time
+        self.assertEqual(self.get_profile(self.access).status_code, 200)
+
+    def test_user_cached_before_commit_is_dropped(self):
+        key = _user_key(self.user.pk)
+        stale = User.objects.filter(pk=self.user.pk).values(*CACHED_USER_FIELDS).get()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.set_password('new-password-2')
+            self.user.token_version += 1
+            self.user.save()
+            # A request on another connection still reads the old row and caches it
+            cache.set(key, stale)
+
+        self.assertIsNone(cache.get(key))
+        self.assertEqual(self.get_profile(self.access).status_code, 401)
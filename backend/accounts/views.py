@@ -9,7 +9,8 @@ from .serializers import (
     UserSerializer,
     RegisterSerializer,
     ChangePasswordSerializer,
-    UserTierSerializer
+    UserTierSerializer,
+    UserRefreshToken
 )
 
 User = get_user_model()
@@ -28,7 +29,7 @@ class RegisterView(generics.CreateAPIView):
         user = serializer.save()
 
         # Generate tokens for the new user
-        refresh = RefreshToken.for_user(user)
+        refresh = UserRefreshToken.for_user(user)
 
         return Response({
             'user': UserSerializer(user).data,
@@ -46,7 +47,8 @@ class ProfileView(generics.RetrieveUpdateAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_object(self):
-        return self.request.user
+        # request.user may be a cached copy; saves must start from the current row
+        return User.objects.get(pk=self.request.user.pk)
 
 
 class ChangePasswordView(generics.UpdateAPIView):
@@ -56,7 +58,7 @@ class ChangePasswordView(generics.UpdateAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_object(self):
-        return self.request.user
+        return User.objects.get(pk=self.request.user.pk)
 
     def update(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -64,9 +66,20 @@ class ChangePasswordView(generics.UpdateAPIView):
 
         user = self.get_object()
         user.set_password(serializer.validated_data['new_password'])
-        user.save()
+        # Revokes every token issued so far, including this one. Bumped here rather
+        # than in set_password(), which Django also calls to upgrade password hashes
+        user.token_version += 1
+        user.save(update_fields=['password', 'token_version', 'updated_at'])
 
-        return Response({'message': 'Password updated successfully.'})
+        refresh = UserRefreshToken.for_user(user)
+
+        return Response({
+            'message': 'Password updated successfully.',
+            'tokens': {
+                'refresh': str(refresh),
+                'access': str(refresh.access_token),
+            }
+        })
 
 
 class UserTierView(generics.RetrieveAPIView):
@@ -1,5 +1,20 @@
 from django.contrib import admin
-from .models import Template, Theme, Invitation, Guest, ShareLink
+from django.forms.models import BaseInlineFormSet
+from django.urls import reverse
+from django.utils.html import format_html
+
+from inviteflow.paginators import EstimatedCountPaginator
+
+from .models import (
+    Template, Theme, Invitation, Guest, ShareLink, OutboundEmail, RSVPSubmission, Job
+)
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Base admin for tables too large to COUNT(*) on every changelist page."""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(Template)
@@ -21,11 +36,26 @@ class ThemeAdmin(admin.ModelAdmin):
     search_fields = ['id', 'name']
 
 
+class RecentGuestsFormSet(BaseInlineFormSet):
+    """Inline formset limited to the invitation's most recent guests."""
+
+    max_rows = 50
+
+    def get_queryset(self):
+        # Cached: the formset indexes into it once per form
+        if not hasattr(self, '_recent_queryset'):
+            self._recent_queryset = super().get_queryset()[:self.max_rows]
+        return self._recent_queryset
+
+
 class GuestInline(admin.TabularInline):
-    """Inline admin for guests in invitation."""
+    """Inline admin for the most recent guests of an invitation; see 'All guests' for the rest."""
 
     model = Guest
+    formset = RecentGuestsFormSet
     extra = 0
+    show_change_link = True
+    verbose_name_plural = f'Guests (latest {RecentGuestsFormSet.max_rows})'
     readonly_fields = ['rsvp_date', 'invitation_sent_at', 'created_at']
     fields = ['name', 'email', 'rsvp_status', 'plus_one', 'invitation_sent']
 
@@ -40,7 +70,7 @@ class ShareLinkInline(admin.TabularInline):
 
 
 @admin.register(Invitation)
-class InvitationAdmin(admin.ModelAdmin):
+class InvitationAdmin(LargeTableAdmin):
     """Admin configuration for Invitation model."""
 
     list_display = [
@@ -48,9 +78,10 @@ class InvitationAdmin(admin.ModelAdmin):
         'guest_count', 'attending_count', 'created_at'
     ]
     list_filter = ['status', 'template__category', 'created_at', 'event_date']
+    list_select_related = ['user', 'template']
     search_fields = ['title', 'user__email', 'celebrant_name', 'venue_name']
     ordering = ['-created_at']
-    date_hierarchy = 'created_at'
+    raw_id_fields = ['user']
 
     fieldsets = (
         (None, {'fields': ('user', 'template', 'theme', 'status')}),
@@ -59,26 +90,39 @@ class InvitationAdmin(admin.ModelAdmin):
         }),
         ('Venue', {'fields': ('venue_name', 'venue_address')}),
         ('Settings', {'fields': ('max_guests', 'expires_at')}),
+        ('Guests', {'fields': ('all_guests',)}),
         ('Timestamps', {
             'fields': ('created_at', 'updated_at'),
             'classes': ('collapse',)
         }),
     )
 
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['all_guests', 'created_at', 'updated_at']
     inlines = [GuestInline, ShareLinkInline]
 
+    # The counts come from the counters stored on the row, not from the guests table
     def guest_count(self, obj):
-        return obj.guest_count
+        return obj.guests_total
     guest_count.short_description = 'Guests'
+    guest_count.admin_order_field = 'guests_total'
 
     def attending_count(self, obj):
-        return obj.attending_count
+        return obj.guests_attending
     attending_count.short_description = 'Attending'
+    attending_count.admin_order_field = 'guests_attending'
+
+    def all_guests(self, obj):
+        if obj.pk is None:
+            return '-'
+        url = reverse('admin:invitations_guest_changelist')
+        return format_html(
+            '<a href="{}?invitation__id__exact={}">All {} guests</a>', url, obj.pk, obj.guests_total
+        )
+    all_guests.short_description = 'All guests'
 
 
 @admin.register(Guest)
-class GuestAdmin(admin.ModelAdmin):
+class GuestAdmin(LargeTableAdmin):
     """Admin configuration for Guest model."""
 
     list_display = [
@@ -86,8 +130,10 @@ class GuestAdmin(admin.ModelAdmin):
         'plus_one', 'invitation_sent', 'created_at'
     ]
     list_filter = ['rsvp_status', 'invitation_sent', 'plus_one', 'created_at']
+    list_select_related = ['invitation']
     search_fields = ['name', 'email', 'invitation__title']
     ordering = ['-created_at']
+    raw_id_fields = ['invitation']
 
     fieldsets = (
         (None, {'fields': ('invitation', 'name', 'email', 'phone')}),
@@ -99,12 +145,53 @@ class GuestAdmin(admin.ModelAdmin):
 
 
 @admin.register(ShareLink)
-class ShareLinkAdmin(admin.ModelAdmin):
+class ShareLinkAdmin(LargeTableAdmin):
     """Admin configuration for ShareLink model."""
 
     list_display = ['token', 'invitation', 'is_active', 'view_count', 'expires_at', 'created_at']
     list_filter = ['is_active', 'created_at', 'expires_at']
+    list_select_related = ['invitation']
     search_fields = ['token', 'invitation__title']
     ordering = ['-created_at']
+    raw_id_fields = ['invitation']
 
     readonly_fields = ['token', 'view_count', 'created_at']
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(LargeTableAdmin):
+    """Admin configuration for OutboundEmail model."""
+
+    list_display = ['subject', 'to_email', 'status', 'attempts', 'next_attempt_at', 'sent_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['to_email', 'subject']
+    ordering = ['-created_at']
+    raw_id_fields = ['guest']
+
+    readonly_fields = ['claimed_by', 'claimed_at', 'created_at', 'sent_at']
+
+
+@admin.register(RSVPSubmission)
+class RSVPSubmissionAdmin(LargeTableAdmin):
+    """Admin configuration for RSVPSubmission model."""
+
+    list_display = ['id', 'email', 'rsvp_status', 'invitation', 'submitted_at', 'applied_at']
+    list_filter = ['rsvp_status', 'submitted_at']
+    list_select_related = ['invitation']
+    search_fields = ['email', 'name']
+    ordering = ['-id']
+    raw_id_fields = ['invitation']
+
+
+@admin.register(Job)
+class JobAdmin(LargeTableAdmin):
+    """Admin configuration for Job model."""
+
+    list_display = ['task', 'status', 'user', 'attempts', 'next_attempt_at', 'created_at', 'finished_at']
+    list_filter = ['status', 'task', 'created_at']
+    list_select_related = ['user']
+    search_fields = ['task', 'user__email']
+    ordering = ['-created_at']
+    raw_id_fields = ['user']
+
+    readonly_fields = ['claimed_by', 'claimed_at', 'created_at', 'finished_at']
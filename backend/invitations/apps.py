@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class InvitationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'invitations'
+
+    def ready(self):
+        from .cache import check_shared_cache
+        from . import signals  # noqa: F401
+        from . import emails, expiry, imports, rsvp  # noqa: F401  (register job tasks and pollers)
+
+        check_shared_cache()
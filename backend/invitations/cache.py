@@ -0,0 +1,148 @@
+"""
+Caching of the public invitation payload served through share links.
+
+Entries are keyed by share link token and hold the serialized payload together
+with the link's validity window and HTTP validators, so a cache hit needs
+neither the database nor the serializer. Signal handlers in signals.py drop
+entries when the invitation or share link changes; template and theme edits
+bump a version stamp that is part of every key. The stamp is the time of the
+last catalog change, so it also moves every entry's Last-Modified forward.
+"""
+import hashlib
+import json
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.http import Http404
+from django.utils import timezone
+
+PUBLIC_VERSION_KEY = 'public-invitation:version'
+
+# Backends that cannot carry invalidations between workers: each process has
+# its own LocMemCache, and a file cache lives on one host, keeps its entries
+# in pickles and culls them (version stamps included) at random when full
+LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.filebased.FileBasedCache',
+)
+
+
+def check_shared_cache():
+    """Refuse to run without a shared default cache unless DEBUG is on.
+
+    Every invalidation here and in tokens.py, catalog.py and
+    accounts.authentication goes through the default cache. On a local
+    backend the other workers would miss it and would keep serving stale
+    payloads, tokens, templates and users.
+    """
+    backend = settings.CACHES['default']['BACKEND']
+    if backend in LOCAL_BACKENDS and not settings.DEBUG:
+        raise ImproperlyConfigured(
+            f'The default cache ({backend}) is not shared by all workers, so cache '
+            'invalidations would not reach them. Configure Redis or Memcached '
+            '(DJANGO_CACHE_BACKEND and DJANGO_CACHE_LOCATION), or run with DEBUG.'
+        )
+
+
+def _timeout():
+    return settings.INVITEFLOW_SETTINGS.get('PUBLIC_INVITATION_CACHE_TIMEOUT', 3600)
+
+
+def _public_version():
+    # A fresh stamp on a miss, so an evicted version can never resurrect old entries.
+    return cache.get_or_set(PUBLIC_VERSION_KEY, time.time_ns, timeout=None)
+
+
+def _public_key(token, version=None):
+    if version is None:
+        version = _public_version()
+    return f'public-invitation:{version}:{token}'
+
+
+# Share link columns a public entry needs besides the payload itself
+SHARE_LINK_FIELDS = ('is_active', 'expires_at', 'created_at', 'invitation_id', 'invitation__updated_at')
+
+
+def build_public_entry(row, version):
+    """Build the cache entry for a share link from its ``.values()`` row.
+
+    ``version`` is the catalog version stamp the entry is cached under.
+    """
+    from .rowserializers import public_invitation_rows
+
+    payload = public_invitation_rows.to_representation(row)
+    body = json.dumps(payload, cls=DjangoJSONEncoder, sort_keys=True)
+
+    return {
+        'invitation_id': row['invitation_id'],
+        'is_active': row['is_active'],
+        'expires_at': row['expires_at'],
+        'payload': payload,
+        'etag': '"%s"' % hashlib.sha256(body.encode()).hexdigest(),
+        'last_modified': max(
+            row['invitation__updated_at'],
+            row['created_at'],
+            datetime.fromtimestamp(version / 1e9, tz=dt_timezone.utc),
+        ),
+    }
+
+
+def _public_row_queryset(token):
+    from .models import ShareLink
+    from .rowserializers import public_invitation_rows
+
+    return ShareLink.objects.filter(token=token).values(
+        *SHARE_LINK_FIELDS, *public_invitation_rows.paths
+    )
+
+
+def get_public_entry(token):
+    """Return the cached public entry for ``token``, building it on a miss.
+
+    Raises Http404 for unknown tokens.
+    """
+    version = _public_version()
+    key = _public_key(token, version)
+    entry = cache.get(key)
+    if entry is None:
+        row = _public_row_queryset(token).first()
+        if row is None:
+            raise Http404
+        entry = build_public_entry(row, version)
+        cache.set(key, entry, _timeout())
+    return entry
+
+
+def is_entry_valid(entry):
+    """Mirror of ShareLink.is_valid for a cached entry."""
+    return entry['is_active'] and timezone.now() <= entry['expires_at']
+
+
+def invalidate_public_tokens(tokens):
+    """Drop cached public payloads for the given share link tokens."""
+    tokens = list(tokens)
+    if not tokens:
+        return
+
+    def drop():
+        version = _public_version()
+        cache.delete_many([_public_key(token, version) for token in tokens])
+
+    drop()
+    # Drop again once the change is visible to other connections, which may
+    # have cached the old row in the meantime.
+    transaction.on_commit(drop)
+
+
+def invalidate_public_catalog():
+    """Invalidate every cached public payload (templates or themes changed)."""
+    def bump():
+        cache.set(PUBLIC_VERSION_KEY, time.time_ns(), timeout=None)
+
+    bump()
+    transaction.on_commit(bump)
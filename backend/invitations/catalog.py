@@ -0,0 +1,123 @@
+"""
+Process-local catalog of active templates and themes.
+
+Templates and themes are read on almost every request but written rarely (by
+``seed_data`` and the admin), so each worker keeps them in memory together with
+their pre-serialized list payloads. A version stamp in the shared cache is
+bumped whenever a template or theme is saved or deleted; workers compare it at
+most every CATALOG_VERSION_CHECK_INTERVAL seconds and reload on a mismatch.
+The default cache therefore has to be shared by all workers (settings.CACHES).
+"""
+import hashlib
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+CATALOG_VERSION_KEY = 'catalog:version'
+
+
+def _etag(payload):
+    body = json.dumps(payload, cls=DjangoJSONEncoder, sort_keys=True)
+    return '"%s"' % hashlib.sha256(body.encode()).hexdigest()
+
+
+class CatalogSnapshot:
+    """Immutable view of the catalog at one version, built from ``.values()`` rows."""
+
+    def __init__(self, version, templates, themes):
+        from .models import Template, Theme
+        from .rowserializers import template_rows, theme_rows
+
+        self.version = version
+        self.templates = {row['id']: Template(**row) for row in templates}
+        self.themes = {row['id']: Theme(**row) for row in themes}
+
+        template_payload = template_rows.many(templates)
+        self.template_details = {
+            item['id']: (item, _etag(item)) for item in template_payload
+        }
+
+        categories = {}
+        for item in template_payload:
+            categories.setdefault(item['category'], []).append(item)
+        self.template_lists = {
+            category: (items, _etag(items)) for category, items in categories.items()
+        }
+        self.template_lists[None] = (template_payload, _etag(template_payload))
+
+        theme_payload = theme_rows.many(themes)
+        self.theme_list = (theme_payload, _etag(theme_payload))
+
+    @classmethod
+    def load(cls, version):
+        from .models import Template, Theme
+
+        return cls(
+            version,
+            list(Template.objects.filter(is_active=True).values()),
+            list(Theme.objects.filter(is_active=True).values()),
+        )
+
+
+class Catalog:
+    """Lazily loaded, version-checked holder of the current CatalogSnapshot."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._checked_at = 0.0
+
+    @property
+    def snapshot(self):
+        snapshot = self._snapshot
+        now = time.monotonic()
+        interval = settings.INVITEFLOW_SETTINGS.get('CATALOG_VERSION_CHECK_INTERVAL', 1)
+        if snapshot is not None and now - self._checked_at < interval:
+            return snapshot
+
+        # A fresh stamp on a miss, so an evicted version always forces a reload.
+        version = cache.get_or_set(CATALOG_VERSION_KEY, time.time_ns, timeout=None)
+        self._checked_at = now
+        if snapshot is None or snapshot.version != version:
+            with self._lock:
+                if self._snapshot is None or self._snapshot.version != version:
+                    self._snapshot = CatalogSnapshot.load(version)
+                snapshot = self._snapshot
+        return snapshot
+
+    def get_template(self, template_id):
+        """Active template by id, or None."""
+        return self.snapshot.templates.get(template_id)
+
+    def get_theme(self, theme_id):
+        """Active theme by id, or None."""
+        return self.snapshot.themes.get(theme_id)
+
+    def template_detail(self, template_id):
+        """(payload, etag) for one active template, or None."""
+        return self.snapshot.template_details.get(template_id)
+
+    def template_list(self, category=None):
+        """(payload, etag) for the active templates, optionally of one category."""
+        return self.snapshot.template_lists.get(category, ([], _etag([])))
+
+    def theme_list(self):
+        """(payload, etag) for the active themes."""
+        return self.snapshot.theme_list
+
+    def invalidate(self):
+        """Force every worker to reload the catalog."""
+        self._snapshot = None
+        cache.set(CATALOG_VERSION_KEY, time.time_ns(), timeout=None)
+        # Bump again once the change is visible to other connections.
+        transaction.on_commit(
+            lambda: cache.set(CATALOG_VERSION_KEY, time.time_ns(), timeout=None)
+        )
+
+
+catalog = Catalog()
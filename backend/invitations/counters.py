@@ -0,0 +1,337 @@
+"""
+Maintenance of the denormalized counters: the RSVP counters stored on
+Invitation and the per-host UserStats rows behind the dashboard.
+
+Every write path that adds, removes or re-statuses a guest or an invitation
+goes through one of the helpers below, so the counters stay in step with the
+underlying tables inside the same transaction.
+"""
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Template, Invitation, Guest, UserStats
+
+RSVP_COUNTER_FIELDS = {
+    Guest.RSVPStatus.ATTENDING: 'guests_attending',
+    Guest.RSVPStatus.PENDING: 'guests_pending',
+    Guest.RSVPStatus.NOT_ATTENDING: 'guests_not_attending',
+}
+
+# Invitation counter -> UserStats column it rolls up into
+USER_STATS_GUEST_FIELDS = {
+    'guests_total': 'total_guests',
+    'guests_attending': 'total_attending',
+    'guests_pending': 'total_pending',
+    'guests_not_attending': 'total_not_attending',
+}
+
+
+def guest_deltas(rsvp_status, sign=1, count=1):
+    """Counter deltas for adding (sign=1) or removing (sign=-1) guests."""
+    return {
+        'guests_total': sign * count,
+        RSVP_COUNTER_FIELDS[rsvp_status]: sign * count,
+    }
+
+
+def apply_guest_deltas(invitation_id, deltas, instance=None):
+    """Apply counter deltas to an invitation with a single atomic UPDATE.
+
+    If the caller holds the invitation instance, its in-memory counters are
+    moved by the same amounts so it keeps reading consistent values.
+    """
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    Invitation.objects.filter(pk=invitation_id).update(
+        **{field: F(field) + delta for field, delta in deltas.items()}
+    )
+    UserStats.objects.filter(user__invitations=invitation_id).update(**{
+        USER_STATS_GUEST_FIELDS[field]: F(USER_STATS_GUEST_FIELDS[field]) + delta
+        for field, delta in deltas.items()
+    })
+
+    if instance is not None:
+        for field, delta in deltas.items():
+            setattr(instance, field, getattr(instance, field) + delta)
+
+
+def lock_row(queryset, *fields):
+    """Write-lock the row in ``queryset`` and return its ``fields``, or None if there is none.
+
+    The lock is a no-op UPDATE of the first field, which on SQLite also takes
+    the database write lock up front. The read that follows therefore sees
+    the row as it is, and it cannot change again before the transaction ends.
+    """
+    if not queryset.update(**{fields[0]: F(fields[0])}):
+        return None
+    return queryset.values_list(*fields).get()
+
+
+def _cached_invitation(guest):
+    if Guest.invitation.is_cached(guest):
+        return guest.invitation
+    return None
+
+
+def record_guest_saved(guest, previous):
+    """Update counters after a Guest row was written.
+
+    ``previous`` is the row's (invitation_id, rsvp_status) before the write,
+    read under lock by Guest.save, or None if the write inserted it.
+    """
+    deltas = Counter(guest_deltas(guest.rsvp_status))
+    if previous is not None:
+        old_invitation_id, old_status = previous
+        if old_invitation_id == guest.invitation_id:
+            deltas.update(guest_deltas(old_status, sign=-1))
+        else:
+            apply_guest_deltas(old_invitation_id, guest_deltas(old_status, sign=-1))
+    apply_guest_deltas(guest.invitation_id, deltas, _cached_invitation(guest))
+
+
+def record_guests_deleted(removed):
+    """Update counters after deleting guests.
+
+    ``removed`` holds (invitation_id, rsvp_status, count) for the deleted rows.
+    """
+    by_invitation = {}
+    for invitation_id, rsvp_status, count in removed:
+        by_invitation.setdefault(invitation_id, Counter()).update(
+            guest_deltas(rsvp_status, sign=-1, count=count)
+        )
+    for invitation_id, deltas in by_invitation.items():
+        apply_guest_deltas(invitation_id, deltas)
+
+
+def _adjust_invitation_stats(user_id, invitations=0, active=0, templates=None, guests=None):
+    """Move the invitation totals of a host's UserStats row, if it exists.
+
+    ``templates`` maps template ids to the change in invitations using them,
+    and ``guests`` maps invitation counter fields to the change in guests.
+    """
+    updates = {'updated_at': timezone.now()}
+    if invitations:
+        updates['total_invitations'] = F('total_invitations') + invitations
+    if active:
+        updates['active_invitations'] = F('active_invitations') + active
+    for field, delta in (guests or {}).items():
+        if delta:
+            stats_field = USER_STATS_GUEST_FIELDS[field]
+            updates[stats_field] = F(stats_field) + delta
+
+    categories = Counter()
+    templates = {pk: delta for pk, delta in (templates or {}).items() if pk is not None and delta}
+    if templates:
+        for template_id, category in Template.objects.filter(pk__in=templates).values_list(
+            'pk', 'category'
+        ):
+            categories[category] += templates[template_id]
+    _adjust_user_stats(UserStats.objects.filter(pk=user_id), updates, categories)
+
+
+def _adjust_user_stats(stats, updates, categories):
+    """Apply ``updates`` to the ``stats`` rows and move their per-category invitation counts."""
+    categories = {category: delta for category, delta in categories.items() if delta}
+    with transaction.atomic():
+        # Write first: the rows stay locked while their category counts are read back
+        if not stats.update(**updates) or not categories:
+            return
+        for pk, by_template in list(stats.values_list('pk', 'invitations_by_template')):
+            for category, delta in categories.items():
+                by_template[category] = by_template.get(category, 0) + delta
+                if not by_template[category]:
+                    del by_template[category]
+            UserStats.objects.filter(pk=pk).update(invitations_by_template=by_template)
+
+
+def record_invitation_saved(invitation, previous):
+    """Update the host's dashboard stats after an invitation was written.
+
+    ``previous`` is the row's (status, template_id) before the write, read
+    under lock by Invitation.save, or None if the write inserted it.
+    """
+    current = (invitation.status, invitation.template_id)
+    if previous == current:
+        return
+
+    active = int(invitation.status == Invitation.Status.ACTIVE)
+    templates = Counter({invitation.template_id: 1})
+    if previous is not None:
+        old_status, old_template_id = previous
+        active -= int(old_status == Invitation.Status.ACTIVE)
+        templates[old_template_id] -= 1
+
+    _adjust_invitation_stats(
+        invitation.user_id, invitations=int(previous is None), active=active, templates=templates
+    )
+
+
+def record_invitations_created(user_id, invitations):
+    """Update a host's dashboard stats after bulk-creating ``invitations`` for them."""
+    _adjust_invitation_stats(
+        user_id,
+        invitations=len(invitations),
+        active=sum(invitation.status == Invitation.Status.ACTIVE for invitation in invitations),
+        templates=Counter(invitation.template_id for invitation in invitations),
+    )
+
+
+def record_invitation_deleted(invitation):
+    """Update the host's dashboard stats for an invitation about to be deleted.
+
+    Runs before the delete, so the invitation's stored counters take its
+    guests out of the stats in one go; the guests themselves are then
+    removed by the cascade without touching the counters.
+    """
+    row = lock_row(
+        Invitation.objects.filter(pk=invitation.pk),
+        'status', 'template_id', 'user_id', *Invitation.COUNTER_FIELDS
+    )
+    if row is None:
+        return
+    status, template_id, user_id, *counters = row
+    _adjust_invitation_stats(
+        user_id,
+        invitations=-1,
+        active=-int(status == Invitation.Status.ACTIVE),
+        templates={template_id: -1},
+        guests={field: -count for field, count in zip(Invitation.COUNTER_FIELDS, counters)},
+    )
+
+
+def _move_template_invitations(template_id, old_category, new_category):
+    """Move the invitations using a template from one category to another in their hosts' stats.
+
+    A category of None drops them from the per-category counts.
+    """
+    per_user = (
+        Invitation.objects.filter(template_id=template_id).order_by()
+        .values('user_id').annotate(count=Count('pk')).values_list('user_id', 'count')
+    )
+    # One pass per distinct count rather than one per host
+    by_count = defaultdict(list)
+    for user_id, count in per_user:
+        by_count[count].append(user_id)
+
+    for count, user_ids in by_count.items():
+        categories = Counter()
+        if old_category:
+            categories[old_category] -= count
+        if new_category:
+            categories[new_category] += count
+        _adjust_user_stats(
+            UserStats.objects.filter(pk__in=user_ids), {'updated_at': timezone.now()}, categories
+        )
+
+
+def record_template_saved(template, previous_category):
+    """Update the dashboard stats after a template was saved over ``previous_category``."""
+    if previous_category != template.category:
+        _move_template_invitations(template.pk, previous_category, template.category)
+
+
+def record_template_deleted(template):
+    """Update the dashboard stats for a template about to be deleted.
+
+    Its invitations keep existing without a template, so they stop counting
+    towards any category.
+    """
+    row = lock_row(Template.objects.filter(pk=template.pk), 'category')
+    if row is not None:
+        _move_template_invitations(template.pk, row[0], None)
+
+
+def compute_user_stats(user_id):
+    """Dashboard statistics for a host, computed from the tables in two queries."""
+    invitations = Invitation.objects.filter(user_id=user_id).order_by()
+
+    stats = invitations.aggregate(
+        total_invitations=Count('id'),
+        active_invitations=Count('id', filter=Q(status=Invitation.Status.ACTIVE)),
+        **{
+            stats_field: Coalesce(Sum(counter_field), 0)
+            for counter_field, stats_field in USER_STATS_GUEST_FIELDS.items()
+        }
+    )
+
+    template_counts = invitations.filter(template__isnull=False).values(
+        'template__category'
+    ).annotate(count=Count('id'))
+    stats['invitations_by_template'] = {
+        item['template__category']: item['count'] for item in template_counts
+    }
+    return stats
+
+
+def get_user_stats(user_id):
+    """Read a host's materialized stats, building the row on first use."""
+    stats = UserStats.objects.filter(pk=user_id).values(*UserStats.STATS_FIELDS).first()
+    if stats is None:
+        with transaction.atomic():
+            # Insert before reading, so concurrent first reads queue on the write lock
+            UserStats.objects.bulk_create([UserStats(user_id=user_id)], ignore_conflicts=True)
+            stats = compute_user_stats(user_id)
+            UserStats.objects.filter(pk=user_id).update(**stats)
+    return stats
+
+
+def rebuild_user_stats(fix=True):
+    """Recompute every materialized stats row. Returns the users whose rows had drifted."""
+    drifted = []
+    for stats in UserStats.objects.all():
+        actual = compute_user_stats(stats.user_id)
+        if any(getattr(stats, field) != value for field, value in actual.items()):
+            drifted.append(stats.user_id)
+            if fix:
+                UserStats.objects.filter(pk=stats.user_id).update(**actual)
+    return drifted
+
+
+def counted_guests_annotations():
+    """Annotations that compute the counters from the guests table."""
+    def count_guests(**filters):
+        return Coalesce(
+            Subquery(
+                Guest.objects.filter(invitation=OuterRef('pk'), **filters)
+                .order_by()
+                .values('invitation')
+                .annotate(count=Count('pk'))
+                .values('count'),
+                output_field=IntegerField(),
+            ),
+            Value(0),
+        )
+
+    annotations = {'guests_total': count_guests()}
+    for rsvp_status, field in RSVP_COUNTER_FIELDS.items():
+        annotations[field] = count_guests(rsvp_status=rsvp_status)
+    return annotations
+
+
+def rebuild_counters(queryset=None):
+    """Recompute the counters for the given invitations in one UPDATE."""
+    if queryset is None:
+        queryset = Invitation.objects.all()
+    return queryset.order_by().update(**counted_guests_annotations())
+
+
+def find_counter_drift(queryset=None):
+    """Return invitations whose stored counters differ from the real counts."""
+    if queryset is None:
+        queryset = Invitation.objects.all()
+
+    annotations = {
+        f'actual_{field}': expression
+        for field, expression in counted_guests_annotations().items()
+    }
+    drift = Q()
+    for field in Invitation.COUNTER_FIELDS:
+        drift |= ~Q(**{field: F(f'actual_{field}')})
+
+    return queryset.order_by().annotate(**annotations).filter(drift)
@@ -0,0 +1,260 @@
+"""
+Email outbox: invitation emails are queued as OutboundEmail rows in the
+request and delivered by the 'emails.outbox' poller of the job runner
+(``run_jobs``), or on their own by the ``send_outbox`` management command.
+Bulk sends to more than BULK_SEND_INLINE_LIMIT guests, and sends of a new
+share link to the guests already invited, queue their emails from an
+'emails.send_invitations' job instead (see jobs.py).
+"""
+import time
+import uuid
+from datetime import timedelta
+from urllib.parse import urljoin
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Case, F, Q, When
+from django.utils import timezone
+
+from .jobs import poller, task
+from .models import Invitation, Guest, OutboundEmail
+
+
+# Emails still on their way; a guest never gets a second one queued meanwhile
+WAITING_STATUSES = [OutboundEmail.Status.PENDING, OutboundEmail.Status.SENDING]
+
+
+def _setting(name, default):
+    return settings.INVITEFLOW_SETTINGS.get(name, default)
+
+
+def render_invitation_email(guest, invitation, invite_url):
+    """Return the (subject, body) of the invitation email for a guest."""
+    subject = f"You're Invited: {invitation.title}"
+    body = f"""
+Hi {guest.name},
+
+You've been invited to {invitation.title}!
+
+Event Date: {invitation.event_date}
+Venue: {invitation.venue_name}
+
+Please RSVP using this link:
+{invite_url}
+
+We hope to see you there!
+                """
+    return subject, body
+
+
+def _outbound_invitation_email(guest, invitation, invite_url):
+    subject, body = render_invitation_email(guest, invitation, invite_url)
+    return OutboundEmail(
+        guest=guest,
+        to_email=guest.email,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        subject=subject,
+        body=body,
+    )
+
+
+def queue_invitation_email(guest, invitation, invite_url):
+    """Add an invitation email for ``guest`` to the outbox.
+
+    If one is already waiting to be delivered, that email is returned instead.
+    """
+    with transaction.atomic():
+        # Lock the guest first, so concurrent requests can't both queue one
+        Guest.objects.filter(pk=guest.pk).update(updated_at=F('updated_at'))
+        email = guest.emails.filter(status__in=WAITING_STATUSES).first()
+        if email is None:
+            email = _outbound_invitation_email(guest, invitation, invite_url)
+            email.save()
+    return email
+
+
+def queue_invitation_emails(guests, invitation, invite_url):
+    """Add invitation emails for many guests to the outbox in one INSERT batch."""
+    return OutboundEmail.objects.bulk_create(
+        [_outbound_invitation_email(guest, invitation, invite_url) for guest in guests],
+        batch_size=_setting('EMAIL_BATCH_SIZE', 100),
+    )
+
+
+def invite_url(site_url, share_link):
+    """Absolute URL of the public invitation page for ``share_link``."""
+    return urljoin(site_url, f'invite/{share_link.token}')
+
+
+def queue_bulk_invitations(invitation, site_url, audience=None, guest_ids=None, share_link=None):
+    """Queue invitation emails for the guests selected by ``guest_ids`` or ``audience``.
+
+    Guests with an email already waiting in the outbox are skipped. The
+    emails link to ``share_link``, by default an active one.
+    """
+    guests = invitation.guests.exclude(emails__status__in=WAITING_STATUSES)
+    if guest_ids is not None:
+        guests = guests.filter(id__in=guest_ids)
+    elif audience == 'pending':
+        guests = guests.filter(rsvp_status=Guest.RSVPStatus.PENDING)
+    elif audience == 'invited':
+        guests = guests.filter(invitation_sent=True)
+    else:
+        guests = guests.filter(invitation_sent=False)
+
+    if share_link is None:
+        share_link = invitation.get_active_share_link()
+    return queue_invitation_emails(
+        guests.only('id', 'invitation', 'name', 'email'),
+        invitation,
+        invite_url(site_url, share_link)
+    )
+
+
+@task('emails.send_invitations')
+def send_invitations_task(invitation_id, site_url, audience=None, guest_ids=None, share_link_id=None):
+    invitation = Invitation.objects.get(pk=invitation_id)
+    share_link = invitation.share_links.get(pk=share_link_id) if share_link_id else None
+    emails = queue_bulk_invitations(invitation, site_url, audience, guest_ids, share_link)
+    return {'queued': len(emails), 'email_ids': [str(email.pk) for email in emails]}
+
+
+STALE_CLAIM_ERROR = 'Delivery did not finish within EMAIL_CLAIM_TIMEOUT.'
+
+
+def claim_batch(batch_size):
+    """Claim up to ``batch_size`` due emails for this worker.
+
+    Claiming is a conditional UPDATE, so concurrent workers never pick up the
+    same row. Rows stuck in SENDING longer than EMAIL_CLAIM_TIMEOUT seconds
+    (a worker died mid-batch) count as a failed attempt: they become
+    claimable again, or FAILED once they have used up EMAIL_MAX_ATTEMPTS.
+    """
+    now = timezone.now()
+    stale_claim = Q(
+        status=OutboundEmail.Status.SENDING,
+        claimed_at__lt=now - timedelta(seconds=_setting('EMAIL_CLAIM_TIMEOUT', 600)),
+    )
+    OutboundEmail.objects.filter(
+        stale_claim, attempts__gte=_setting('EMAIL_MAX_ATTEMPTS', 5) - 1
+    ).update(
+        status=OutboundEmail.Status.FAILED,
+        attempts=F('attempts') + 1,
+        claimed_by='',
+        last_error=STALE_CLAIM_ERROR,
+    )
+    due = Q(status=OutboundEmail.Status.PENDING, next_attempt_at__lte=now) | stale_claim
+
+    candidates = list(
+        OutboundEmail.objects.filter(due)
+        .order_by('next_attempt_at')
+        .values_list('pk', flat=True)[:batch_size]
+    )
+    if not candidates:
+        return []
+
+    claim = uuid.uuid4().hex
+    OutboundEmail.objects.filter(due, pk__in=candidates).update(
+        status=OutboundEmail.Status.SENDING,
+        claimed_by=claim,
+        claimed_at=now,
+        # A reclaimed row counts the attempt its dead worker never finished
+        attempts=F('attempts') + Case(When(stale_claim, then=1), default=0),
+    )
+    return list(OutboundEmail.objects.filter(claimed_by=claim, status=OutboundEmail.Status.SENDING))
+
+
+def _retry_delay(attempts):
+    return timedelta(seconds=_setting('EMAIL_RETRY_BACKOFF', 60) * 2 ** (attempts - 1))
+
+
+def _record_failure(email, error, now):
+    email.attempts += 1
+    email.last_error = error
+    email.claimed_by = ''
+    if email.attempts >= _setting('EMAIL_MAX_ATTEMPTS', 5):
+        email.status = OutboundEmail.Status.FAILED
+    else:
+        email.status = OutboundEmail.Status.PENDING
+        email.next_attempt_at = now + _retry_delay(email.attempts)
+
+
+def deliver_outbox(batch_size=None, connection=None):
+    """Send one batch of due emails, reusing a connection per EMAIL_CHUNK_SIZE
+    messages and pacing them to at most EMAIL_RATE_LIMIT per second.
+
+    Returns a (sent, failed) tuple with the number of emails delivered and the
+    number that failed this round (and were rescheduled or given up on).
+    """
+    if batch_size is None:
+        batch_size = _setting('EMAIL_BATCH_SIZE', 100)
+
+    emails = claim_batch(batch_size)
+    if not emails:
+        return 0, 0
+
+    connection = connection or get_connection(fail_silently=False)
+    chunk_size = _setting('EMAIL_CHUNK_SIZE', 50)
+    rate_limit = _setting('EMAIL_RATE_LIMIT', 0)
+    send_interval = 1 / rate_limit if rate_limit else 0
+    next_send = time.monotonic()
+    sent, failed = [], []
+
+    # One connection per chunk: many SMTP servers cap messages per session.
+    for start in range(0, len(emails), chunk_size):
+        chunk = emails[start:start + chunk_size]
+        try:
+            connection.open()
+        except Exception as e:
+            failed.extend((email, f'Could not connect: {e}') for email in chunk)
+            continue
+
+        try:
+            for email in chunk:
+                if send_interval:
+                    delay = next_send - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                    next_send = max(next_send, time.monotonic()) + send_interval
+
+                message = EmailMessage(
+                    subject=email.subject,
+                    body=email.body,
+                    from_email=email.from_email,
+                    to=[email.to_email],
+                    connection=connection,
+                )
+                try:
+                    message.send()
+                except Exception as e:
+                    failed.append((email, str(e)))
+                else:
+                    sent.append(email)
+        finally:
+            connection.close()
+
+    now = timezone.now()
+
+    if sent:
+        OutboundEmail.objects.filter(pk__in=[email.pk for email in sent]).update(
+            status=OutboundEmail.Status.SENT, sent_at=now, claimed_by='', last_error=''
+        )
+        Guest.objects.filter(
+            pk__in=[email.guest_id for email in sent if email.guest_id]
+        ).update(invitation_sent=True, invitation_sent_at=now, updated_at=now)
+
+    if failed:
+        for email, error in failed:
+            _record_failure(email, error, now)
+        OutboundEmail.objects.bulk_update(
+            [email for email, _ in failed],
+            ['status', 'attempts', 'next_attempt_at', 'claimed_by', 'last_error'],
+        )
+
+    return len(sent), len(failed)
+
+
+@poller('emails.outbox', interval=5)
+def deliver_outbox_poll():
+    return sum(deliver_outbox())
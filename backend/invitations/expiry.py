@@ -0,0 +1,122 @@
+"""
+Expiry sweeps: move invitations past their ``expires_at`` to EXPIRED and
+deactivate expired share links, so status filters and ``is_active`` lookups
+match what ``is_expired`` / ``is_valid`` compute in Python.
+
+Each call handles one bounded chunk. Candidates are read from the expiry
+indexes (invitations_status_expiry_idx, share_links_expiring_idx), oldest
+first, and transitioned by a short write transaction that starts with the
+UPDATE, so a sweep never holds the write lock for long and can run every
+minute (``manage.py sweep_expired``, or the job runner's 'expiry.sweep'
+poller) next to regular traffic.
+
+QuerySet.update() skips save() and the signal handlers, so the dashboard
+stats and the cached public payloads are adjusted here.
+"""
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .cache import invalidate_public_tokens
+from .jobs import poller
+from .models import Invitation, ShareLink, UserStats
+
+
+def _batch_size(batch_size):
+    if batch_size is None:
+        batch_size = settings.INVITEFLOW_SETTINGS.get('EXPIRY_BATCH_SIZE', 1000)
+    return batch_size
+
+
+def _expire_invitation_chunk(status, batch_size, now):
+    """Expire up to ``batch_size`` invitations in ``status``. Returns the number changed."""
+    candidates = list(
+        Invitation.objects.filter(status=status, expires_at__lt=now)
+        .order_by('expires_at')
+        .values_list('pk', flat=True)[:batch_size]
+    )
+    if not candidates:
+        return 0
+
+    with transaction.atomic():
+        # The sweep's timestamp marks the rows this UPDATE transitioned
+        expired = Invitation.objects.filter(
+            pk__in=candidates, status=status, expires_at__lt=now
+        ).update(status=Invitation.Status.EXPIRED, updated_at=now)
+
+        if expired and status == Invitation.Status.ACTIVE:
+            per_user = Counter(
+                Invitation.objects.filter(
+                    pk__in=candidates, status=Invitation.Status.EXPIRED, updated_at=now
+                ).order_by().values_list('user_id', flat=True)
+            )
+            # One UPDATE per distinct decrement rather than one per host
+            by_delta = defaultdict(list)
+            for user_id, count in per_user.items():
+                by_delta[count].append(user_id)
+            for count, user_ids in by_delta.items():
+                UserStats.objects.filter(pk__in=user_ids).update(
+                    active_invitations=F('active_invitations') - count
+                )
+
+    if expired:
+        invalidate_public_tokens(
+            ShareLink.objects.filter(invitation_id__in=candidates)
+            .order_by().values_list('token', flat=True)
+        )
+    return expired
+
+
+def expire_invitations(batch_size=None, now=None):
+    """Move one chunk of expired draft and active invitations to EXPIRED.
+
+    Returns the number of invitations changed.
+    """
+    batch_size = _batch_size(batch_size)
+    now = now or timezone.now()
+
+    expired = 0
+    for status in (Invitation.Status.ACTIVE, Invitation.Status.DRAFT):
+        expired += _expire_invitation_chunk(status, batch_size - expired, now)
+        if expired >= batch_size:
+            break
+    return expired
+
+
+def expire_share_links(batch_size=None, now=None):
+    """Deactivate one chunk of active share links past their expiry.
+
+    Returns the number of share links changed.
+    """
+    batch_size = _batch_size(batch_size)
+    now = now or timezone.now()
+
+    candidates = dict(
+        ShareLink.objects.filter(is_active=True, expires_at__lt=now)
+        .order_by('expires_at')
+        .values_list('pk', 'token')[:batch_size]
+    )
+    if not candidates:
+        return 0
+
+    deactivated = ShareLink.objects.filter(
+        pk__in=candidates, is_active=True, expires_at__lt=now
+    ).update(is_active=False)
+
+    # Resolved tokens (tokens.py) already read as invalid past expires_at; only the payloads go
+    invalidate_public_tokens(candidates.values())
+    return deactivated
+
+
+def sweep_expired(batch_size=None):
+    """Run one chunk of both sweeps. Returns (invitations expired, share links deactivated)."""
+    now = timezone.now()
+    return expire_invitations(batch_size, now), expire_share_links(batch_size, now)
+
+
+@poller('expiry.sweep', interval=60)
+def sweep_expired_poll():
+    return sum(sweep_expired())
@@ -0,0 +1,54 @@
+"""
+Streaming guest-list exports.
+
+Rows are read with ``values_list().iterator()`` and written out one at a time,
+so an export holds a single chunk of guests in memory no matter how long the
+list is, and the response starts before the query has finished.
+"""
+import csv
+import json
+from datetime import date
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+GUEST_EXPORT_FIELDS = (
+    'name', 'email', 'phone', 'rsvp_status', 'rsvp_date', 'plus_one', 'plus_one_count',
+    'notes', 'invitation_sent', 'invitation_sent_at', 'created_at',
+)
+
+
+class _Echo:
+    """File-like object whose write() hands back the line csv.writer produced."""
+
+    def write(self, value):
+        return value
+
+
+def _rows(queryset):
+    chunk_size = settings.INVITEFLOW_SETTINGS.get('GUEST_EXPORT_CHUNK_SIZE', 2000)
+    return queryset.values_list(*GUEST_EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+
+
+def stream_guests_csv(queryset):
+    """Yield ``queryset`` as CSV lines, header first."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(GUEST_EXPORT_FIELDS)
+    for row in _rows(queryset):
+        yield writer.writerow(
+            value.isoformat() if isinstance(value, date) else value for value in row
+        )
+
+
+def stream_guests_ndjson(queryset):
+    """Yield ``queryset`` as newline-delimited JSON objects."""
+    encoder = DjangoJSONEncoder()
+    for row in _rows(queryset):
+        yield encoder.encode(dict(zip(GUEST_EXPORT_FIELDS, row))) + '\n'
+
+
+# export_format -> (content type, file extension, row stream)
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv', stream_guests_csv),
+    'ndjson': ('application/x-ndjson', 'ndjson', stream_guests_ndjson),
+}
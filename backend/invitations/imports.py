@@ -0,0 +1,85 @@
+"""
+Bulk guest imports.
+
+Small imports run in the request; imports larger than GUEST_IMPORT_INLINE_LIMIT
+rows are queued as a 'guests.import' job (see jobs.py).
+"""
+from django.conf import settings
+from django.db import transaction
+
+from .counters import apply_guest_deltas, guest_deltas
+from .jobs import task
+from .models import Invitation, Guest
+from .quotas import reserve_guests
+from .serializers import GuestCreateSerializer
+
+
+def import_guests(invitation, tier, guests_data):
+    """Validate and insert guests for ``invitation`` in one transaction.
+
+    Returns (created guests, per-row errors). Rows with invalid data, emails
+    already on the invitation, or beyond the tier's guest capacity are
+    reported as errors; the rest are inserted with one bulk INSERT.
+    """
+    # Validate the whole batch in memory; duplicates are checked set-wise below
+    validated = []
+    for guest_data in guests_data:
+        serializer = GuestCreateSerializer(data=guest_data)
+        if serializer.is_valid():
+            validated.append((guest_data, serializer.validated_data, None))
+        else:
+            validated.append((guest_data, None, serializer.errors))
+
+    batch_size = settings.INVITEFLOW_SETTINGS.get('GUEST_BULK_CREATE_BATCH_SIZE', 500)
+    new_guests = []
+    errors = []
+
+    with transaction.atomic():
+        remaining = reserve_guests(invitation.pk, tier)
+
+        seen_emails = set(
+            Guest.objects.filter(
+                invitation=invitation,
+                email__in=[data['email'] for _, data, _ in validated if data]
+            ).values_list('email', flat=True)
+        )
+
+        for guest_data, data, row_errors in validated:
+            if data and data['email'] in seen_emails:
+                row_errors = {'email': [GuestCreateSerializer.duplicate_email_message]}
+
+            if row_errors:
+                errors.append({
+                    'email': guest_data.get('email'),
+                    'error': row_errors
+                })
+            elif remaining is not None and len(new_guests) >= remaining:
+                errors.append({
+                    'email': guest_data.get('email'),
+                    'error': 'Maximum guest limit reached.'
+                })
+            else:
+                seen_emails.add(data['email'])
+                new_guests.append(Guest(invitation=invitation, **data))
+
+        if new_guests:
+            # bulk_create skips Guest.save, so move the counters ourselves
+            Guest.objects.bulk_create(new_guests, batch_size=batch_size)
+            apply_guest_deltas(
+                invitation.pk,
+                guest_deltas(Guest.RSVPStatus.PENDING, count=len(new_guests)),
+                invitation
+            )
+
+    return new_guests, errors
+
+
+@task('guests.import')
+def import_guests_task(invitation_id, guests):
+    invitation = Invitation.objects.select_related('user').get(pk=invitation_id)
+    new_guests, errors = import_guests(invitation, invitation.user.tier, guests)
+    return {
+        'created': len(new_guests),
+        'guest_ids': [str(guest.pk) for guest in new_guests],
+        'errors': errors,
+    }
@@ -0,0 +1,294 @@
+"""
+Durable background jobs, with no broker beyond the database.
+
+Slow side effects are queued as Job rows in the request (``enqueue``) and run
+by the ``run_jobs`` management command on a thread or process pool. Workers
+claim due jobs the way the email outbox does: a conditional UPDATE, so
+concurrent workers never run the same job, on SQLite as well as on
+databases with SELECT ... FOR UPDATE SKIP LOCKED. Failed jobs are retried
+with exponential backoff, up to their max_attempts.
+
+Tasks are functions registered with ``@task('name')``. They are called with
+the job's payload as keyword arguments and return a JSON-serialisable result,
+which is stored on the job for the status endpoints.
+
+Work that is already queued in its own table (the email outbox, the RSVP
+log, expiry sweeps) is registered with ``@poller('name')`` instead; the same
+runner calls each poller on the pool over and over while it finds work, so
+one ``run_jobs`` process serves all background work.
+"""
+import logging
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Case, F, Q, When
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+_tasks = {}
+# name -> (function, seconds to wait after a call that found no work)
+_pollers = {}
+
+
+def _setting(name, default):
+    return settings.INVITEFLOW_SETTINGS.get(name, default)
+
+
+def task(name):
+    """Register the decorated function as the task ``name``."""
+    def register(func):
+        if name in _tasks:
+            raise ValueError(f'Task {name!r} is already registered.')
+        _tasks[name] = func
+        return func
+    return register
+
+
+def poller(name, interval):
+    """Register the decorated function as the poller ``name``.
+
+    It is called with no arguments and returns the number of items it
+    handled; after a call that handled none, the runner waits ``interval``
+    seconds before calling it again.
+    """
+    def register(func):
+        if name in _pollers:
+            raise ValueError(f'Poller {name!r} is already registered.')
+        _pollers[name] = (func, interval)
+        return func
+    return register
+
+
+def enqueue(task_name, payload=None, user=None):
+    """Queue a job running ``task_name`` with ``payload`` and return it."""
+    if task_name not in _tasks:
+        raise LookupError(f'Unknown task {task_name!r}.')
+    return Job.objects.create(
+        task=task_name,
+        payload=payload or {},
+        user=user,
+        max_attempts=_setting('JOB_MAX_ATTEMPTS', 3),
+    )
+
+
+STALE_CLAIM_ERROR = 'The job did not finish within JOB_CLAIM_TIMEOUT.'
+
+
+def claim_jobs(batch_size):
+    """Claim up to ``batch_size`` due jobs for this worker.
+
+    Running jobs whose claim was not refreshed for JOB_CLAIM_TIMEOUT seconds
+    (the runner that held it stopped; see JobRunner.heartbeat) count as a
+    failed attempt, like stale outbox claims: they become claimable again,
+    or FAILED once they have used up their max_attempts, so a job that keeps
+    killing its worker is not retried forever.
+    """
+    now = timezone.now()
+    stale_claim = Q(
+        status=Job.Status.RUNNING,
+        claimed_at__lt=now - timedelta(seconds=_setting('JOB_CLAIM_TIMEOUT', 300)),
+    )
+    Job.objects.filter(stale_claim, attempts__gte=F('max_attempts') - 1).update(
+        status=Job.Status.FAILED,
+        attempts=F('attempts') + 1,
+        claimed_by='',
+        last_error=STALE_CLAIM_ERROR,
+        finished_at=now,
+    )
+    due = Q(status=Job.Status.QUEUED, next_attempt_at__lte=now) | stale_claim
+
+    candidates = list(
+        Job.objects.filter(due).order_by('next_attempt_at').values_list('pk', flat=True)[:batch_size]
+    )
+    if not candidates:
+        return []
+
+    claim = uuid.uuid4().hex
+    Job.objects.filter(due, pk__in=candidates).update(
+        status=Job.Status.RUNNING,
+        claimed_by=claim,
+        claimed_at=now,
+        # A reclaimed job counts the attempt its dead worker never finished
+        attempts=F('attempts') + Case(When(stale_claim, then=1), default=0),
+    )
+    return list(Job.objects.filter(claimed_by=claim, status=Job.Status.RUNNING))
+
+
+def _retry_delay(attempts):
+    return timedelta(seconds=_setting('JOB_RETRY_BACKOFF', 30) * 2 ** (attempts - 1))
+
+
+def run_job(job):
+    """Run a claimed job and record the outcome. Returns True if it succeeded."""
+    try:
+        func = _tasks.get(job.task)
+        if func is None:
+            raise LookupError(f'Unknown task {job.task!r}.')
+        result = func(**job.payload)
+    except Exception as e:
+        logger.exception('Job %s (%s) failed', job.pk, job.task)
+        attempts = job.attempts + 1
+        if attempts >= job.max_attempts:
+            outcome = {'status': Job.Status.FAILED, 'finished_at': timezone.now()}
+        else:
+            outcome = {
+                'status': Job.Status.QUEUED,
+                'next_attempt_at': timezone.now() + _retry_delay(attempts),
+            }
+        outcome.update(attempts=attempts, last_error=f'{type(e).__name__}: {e}')
+        succeeded = False
+    else:
+        outcome = {
+            'status': Job.Status.SUCCEEDED,
+            'attempts': job.attempts + 1,
+            'result': result,
+            'last_error': '',
+            'finished_at': timezone.now(),
+        }
+        succeeded = True
+
+    # Only the worker still holding the claim records the outcome
+    Job.objects.filter(pk=job.pk, claimed_by=job.claimed_by).update(claimed_by='', **outcome)
+    return succeeded
+
+
+def _run_in_worker(job):
+    try:
+        return run_job(job)
+    finally:
+        connections.close_all()
+
+
+def _poll_in_worker(name):
+    func, _ = _pollers[name]
+    try:
+        return func()
+    except Exception:
+        logger.exception('Poller %s failed', name)
+        return 0
+    finally:
+        connections.close_all()
+
+
+def run_due_jobs(batch_size=None):
+    """Claim one batch of due jobs and run them one by one in this thread.
+
+    Returns a (succeeded, failed) tuple. Nothing refreshes the claims
+    meanwhile, so this is for tests and short jobs; workers use JobRunner.
+    """
+    if batch_size is None:
+        batch_size = _setting('JOB_BATCH_SIZE', 20)
+
+    results = [run_job(job) for job in claim_jobs(batch_size)]
+    succeeded = sum(results)
+    return succeeded, len(results) - succeeded
+
+
+class JobRunner:
+    """Keeps up to ``workers`` jobs, plus every registered poller, running on ``executor``.
+
+    Jobs are claimed and submitted one by one as workers free up, never more
+    than ``batch_size`` per claim, so a slow job holds up only its own
+    worker. While jobs run, the runner refreshes their claims every
+    JOB_HEARTBEAT_INTERVAL seconds: only the jobs of a runner that stopped
+    go stale and are run again. Pollers run on their own workers, so
+    ``executor`` needs ``workers + len(pollers)`` of them (see ``pool_size``).
+    """
+
+    def __init__(self, executor, workers, batch_size=None, pollers=None):
+        self.executor = executor
+        self.workers = workers
+        self.batch_size = batch_size or _setting('JOB_BATCH_SIZE', 20)
+        names = list(_pollers) if pollers is None else pollers
+        # poller name -> monotonic time it is next due; dropped once drained with once=True
+        self.pollers = {name: 0.0 for name in names}
+        self.jobs = {}
+        self.polls = {}
+        self.last_heartbeat = time.monotonic()
+        self.forked = False
+
+    @staticmethod
+    def pool_size(workers, pollers=None):
+        """Workers an executor needs for ``workers`` jobs and the pollers."""
+        return workers + len(_pollers if pollers is None else pollers)
+
+    def submit(self, func, arg):
+        if isinstance(self.executor, ProcessPoolExecutor) and not self.forked:
+            # Forked workers must open their own database connections
+            connections.close_all()
+            self.forked = True
+        return self.executor.submit(func, arg)
+
+    def start_pollers(self):
+        now = time.monotonic()
+        busy = set(self.polls.values())
+        for name, due in self.pollers.items():
+            if name not in busy and due <= now:
+                self.polls[self.submit(_poll_in_worker, name)] = name
+
+    def claim(self):
+        free = self.workers - len(self.jobs)
+        if free > 0:
+            for job in claim_jobs(min(free, self.batch_size)):
+                self.jobs[self.submit(_run_in_worker, job)] = job
+
+    def heartbeat(self):
+        """Refresh the claims of the running jobs, at most every JOB_HEARTBEAT_INTERVAL seconds."""
+        now = time.monotonic()
+        if now - self.last_heartbeat < _setting('JOB_HEARTBEAT_INTERVAL', 60):
+            return
+        self.last_heartbeat = now
+        claims = {job.claimed_by for job in self.jobs.values()}
+        if claims:
+            Job.objects.filter(claimed_by__in=claims, status=Job.Status.RUNNING).update(
+                claimed_at=timezone.now()
+            )
+
+    def finish_poll(self, future, once):
+        name = self.polls.pop(future)
+        handled = future.result()
+        if handled:
+            self.pollers[name] = 0.0
+        elif once:
+            del self.pollers[name]
+        else:
+            self.pollers[name] = time.monotonic() + _pollers[name][1]
+
+    def finish_job(self, future):
+        job = self.jobs.pop(future)
+        try:
+            return job, future.result()
+        except Exception:
+            # The claim is no longer refreshed, so the job is run again once it goes stale
+            logger.exception('Job %s (%s) did not finish', job.pk, job.task)
+            return job, False
+
+    def run(self, once=False, interval=1):
+        """Run jobs and pollers until interrupted; with ``once``, until there is nothing left to do.
+
+        Yields a (job, succeeded) tuple for every job that finishes.
+        """
+        while True:
+            self.start_pollers()
+            self.claim()
+            if not self.jobs and not self.polls:
+                if once and not self.pollers:
+                    return
+                time.sleep(interval)
+                continue
+
+            timeout = min(interval, _setting('JOB_HEARTBEAT_INTERVAL', 60))
+            done, _ = wait([*self.jobs, *self.polls], timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in self.polls:
+                    self.finish_poll(future, once)
+                else:
+                    yield self.finish_job(future)
+            self.heartbeat()
@@ -0,0 +1,53 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError
+from invitations.rsvp import apply_rsvp_log
+
+
+class Command(BaseCommand):
+    help = 'Apply queued RSVPs from the RSVP log to guests'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.INVITEFLOW_SETTINGS.get('RSVP_APPLY_BATCH_SIZE', 500),
+            help='Number of log entries applied per transaction.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1,
+            help='Seconds to wait before polling again when the log is drained.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Apply the entries that are currently queued, then exit.',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('Applying RSVP log...')
+        total = 0
+
+        try:
+            while True:
+                try:
+                    applied = apply_rsvp_log(batch_size=options['batch_size'])
+                except DatabaseError as exc:
+                    # The batch rolled back and stays queued; try it again on the next poll
+                    self.stderr.write(f"  Applying a batch failed: {exc}")
+                    applied = 0
+                total += applied
+                if applied:
+                    self.stdout.write(f"  Applied {applied} RSVPs")
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f'RSVP log applied: {total} entries.'))
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+from invitations.counters import find_counter_drift, rebuild_counters, rebuild_user_stats
+
+
+class Command(BaseCommand):
+    help = 'Rebuild and verify the denormalized invitation counters and dashboard stats'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only report counters that have drifted; do not fix them.',
+        )
+
+    def handle(self, *args, **options):
+        drifted = list(find_counter_drift().values_list('id', flat=True))
+
+        if options['check']:
+            drifted_users = rebuild_user_stats(fix=False)
+            for invitation_id in drifted:
+                self.stdout.write(f"  Counter drift on invitation {invitation_id}")
+            for user_id in drifted_users:
+                self.stdout.write(f"  Stats drift for user {user_id}")
+            if drifted or drifted_users:
+                raise CommandError(
+                    f"{len(drifted)} invitation(s) and {len(drifted_users)} user stats row(s) are stale."
+                )
+            self.stdout.write(self.style.SUCCESS('All counters are correct.'))
+            return
+
+        self.stdout.write('Rebuilding invitation counters...')
+        updated = rebuild_counters()
+        self.stdout.write(f"  Recounted {updated} invitation(s), {len(drifted)} had drifted")
+
+        remaining = find_counter_drift().count()
+        if remaining:
+            raise CommandError(f"{remaining} invitation(s) still have stale counters.")
+
+        # Dashboard stats roll up the invitation counters, so rebuild them afterwards
+        self.stdout.write('Rebuilding dashboard stats...')
+        drifted_users = rebuild_user_stats()
+        self.stdout.write(f"  {len(drifted_users)} user stats row(s) had drifted")
+
+        self.stdout.write(self.style.SUCCESS('Counters rebuilt successfully!'))
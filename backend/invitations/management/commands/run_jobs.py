@@ -0,0 +1,70 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from invitations.jobs import JobRunner
+
+
+class Command(BaseCommand):
+    help = (
+        'Run queued background jobs on a pool of workers, along with the email outbox, '
+        'the RSVP log and the expiry sweeps'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.INVITEFLOW_SETTINGS.get('JOB_WORKERS', 4),
+            help='Number of jobs run in parallel; the pollers get a worker each on top.',
+        )
+        parser.add_argument(
+            '--pool',
+            choices=['thread', 'process'],
+            default='thread',
+            help='Run jobs on worker threads or on forked worker processes.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.INVITEFLOW_SETTINGS.get('JOB_BATCH_SIZE', 20),
+            help='Most jobs claimed at a time.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1,
+            help='Seconds to wait before polling again when no job is due.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Run until no job is due and every poller has found no work, then exit.',
+        )
+
+    def handle(self, *args, **options):
+        size = JobRunner.pool_size(options['workers'])
+        if options['pool'] == 'process':
+            executor = ProcessPoolExecutor(size, mp_context=multiprocessing.get_context('fork'))
+        else:
+            executor = ThreadPoolExecutor(size, thread_name_prefix='job')
+
+        self.stdout.write(f"Running jobs on {options['workers']} {options['pool']} worker(s)...")
+        total_succeeded = total_failed = 0
+
+        with executor:
+            runner = JobRunner(executor, options['workers'], options['batch_size'])
+            try:
+                for job, succeeded in runner.run(once=options['once'], interval=options['interval']):
+                    if succeeded:
+                        total_succeeded += 1
+                    else:
+                        total_failed += 1
+                    self.stdout.write(f"  {job.task} {job.pk}: {'succeeded' if succeeded else 'failed'}")
+            except KeyboardInterrupt:
+                pass
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Job runner finished: {total_succeeded} succeeded, {total_failed} failed.'
+        ))
@@ -0,0 +1,50 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from invitations.emails import deliver_outbox
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued emails from the outbox (run_jobs delivers it too)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.INVITEFLOW_SETTINGS.get('EMAIL_BATCH_SIZE', 100),
+            help='Number of emails claimed and sent per connection.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Seconds to wait before polling again when the outbox is empty.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Drain the emails that are currently due, then exit.',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('Delivering outbox...')
+        total_sent = total_failed = 0
+
+        try:
+            while True:
+                sent, failed = deliver_outbox(batch_size=options['batch_size'])
+                total_sent += sent
+                total_failed += failed
+                if sent or failed:
+                    self.stdout.write(f"  Sent {sent}, failed {failed}")
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Outbox delivery finished: {total_sent} sent, {total_failed} failed.'
+        ))
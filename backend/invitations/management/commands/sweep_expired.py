@@ -0,0 +1,51 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from invitations.expiry import sweep_expired
+
+
+class Command(BaseCommand):
+    help = 'Expire invitations and deactivate share links past their expiry date'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.INVITEFLOW_SETTINGS.get('EXPIRY_BATCH_SIZE', 1000),
+            help='Number of rows transitioned per transaction.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=60,
+            help='Seconds to wait before sweeping again once nothing is left to expire.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Sweep the rows that are currently expired, then exit (e.g. from cron).',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('Sweeping expired invitations and share links...')
+        total_invitations = total_links = 0
+
+        try:
+            while True:
+                invitations, links = sweep_expired(batch_size=options['batch_size'])
+                total_invitations += invitations
+                total_links += links
+                if invitations or links:
+                    self.stdout.write(f"  Expired {invitations} invitations, {links} share links")
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Expiry sweep finished: {total_invitations} invitations expired, '
+            f'{total_links} share links deactivated.'
+        ))
@@ -1,6 +1,7 @@
 import uuid
 import secrets
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F
 from django.conf import settings
 from django.utils import timezone
 from datetime import timedelta
@@ -35,6 +36,17 @@ class Template(models.Model):
     def __str__(self):
         return f"{self.name} ({self.category})"
 
+    def save(self, *args, **kwargs):
+        from .counters import lock_row, record_template_saved
+
+        with transaction.atomic(using=kwargs.get('using')):
+            previous = None
+            if not self._state.adding:
+                previous = lock_row(Template.objects.filter(pk=self.pk), 'category')
+            super().save(*args, **kwargs)
+            if previous is not None:
+                record_template_saved(self, *previous)
+
 
 class Theme(models.Model):
     """Color theme for invitations."""
@@ -55,6 +67,19 @@ class Theme(models.Model):
         return self.name
 
 
+class CounterField(models.PositiveIntegerField):
+    """Denormalized count, only ever moved with F() updates (see counters.py).
+
+    A regular save inserts the value but writes the column back as itself on
+    update, so saving a stale instance never overwrites the stored count.
+    """
+
+    def pre_save(self, model_instance, add):
+        if add:
+            return super().pre_save(model_instance, add)
+        return F(self.attname)
+
+
 class Invitation(models.Model):
     """Main invitation model."""
 
@@ -96,6 +121,12 @@ class Invitation(models.Model):
     max_guests = models.PositiveIntegerField(default=50)
     status = models.CharField(max_length=10, choices=Status.choices, default=Status.DRAFT)
 
+    # Denormalized RSVP counters, maintained by Guest writes (see counters.py)
+    guests_total = CounterField(default=0, editable=False)
+    guests_attending = CounterField(default=0, editable=False)
+    guests_pending = CounterField(default=0, editable=False)
+    guests_not_attending = CounterField(default=0, editable=False)
+
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -104,33 +135,58 @@ class Invitation(models.Model):
     class Meta:
         db_table = 'invitations'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(
+                fields=['user', '-created_at', '-id'], name='invitations_user_created_idx'
+            ),
+            models.Index(fields=['user', 'status'], name='invitations_user_status_idx'),
+            models.Index(fields=['status', 'expires_at'], name='invitations_status_expiry_idx'),
+            # Newest-first listings across all hosts (admin changelist)
+            models.Index(fields=['-created_at', '-id'], name='invitations_created_idx'),
+        ]
+
+    COUNTER_FIELDS = ('guests_total', 'guests_attending', 'guests_pending', 'guests_not_attending')
+    # Fields whose changes move the host's dashboard stats
+    COUNTED_FIELDS = ('status', 'template_id')
 
     def __str__(self):
         return f"{self.title} - {self.event_date}"
 
     def save(self, *args, **kwargs):
+        from .counters import lock_row, record_invitation_saved
+
+        self.set_default_expiry()
+        counted = _saves_any(kwargs.get('update_fields'), self.COUNTED_FIELDS)
+        with transaction.atomic(using=kwargs.get('using')):
+            previous = None
+            if counted and not self._state.adding:
+                previous = lock_row(Invitation.objects.filter(pk=self.pk), *self.COUNTED_FIELDS)
+            super().save(*args, **kwargs)
+            if counted:
+                record_invitation_saved(self, previous)
+
+    def set_default_expiry(self):
         # Auto-expire invitations after the event date
         if not self.expires_at and self.event_date:
             self.expires_at = timezone.make_aware(
                 timezone.datetime.combine(self.event_date, timezone.datetime.max.time())
             )
-        super().save(*args, **kwargs)
 
     @property
     def guest_count(self):
-        return self.guests.count()
+        return self.guests_total
 
     @property
     def attending_count(self):
-        return self.guests.filter(rsvp_status=Guest.RSVPStatus.ATTENDING).count()
+        return self.guests_attending
 
     @property
     def pending_count(self):
-        return self.guests.filter(rsvp_status=Guest.RSVPStatus.PENDING).count()
+        return self.guests_pending
 
     @property
     def not_attending_count(self):
-        return self.guests.filter(rsvp_status=Guest.RSVPStatus.NOT_ATTENDING).count()
+        return self.guests_not_attending
 
     @property
     def is_expired(self):
@@ -138,10 +194,49 @@ class Invitation(models.Model):
             return timezone.now() > self.expires_at
         return False
 
+    def get_active_share_link(self):
+        """Return an active share link, creating one if there is none."""
+        share_link = self.share_links.filter(is_active=True).first()
+        if not share_link:
+            share_link = ShareLink.objects.create(invitation=self)
+        return share_link
+
+    def remaining_guest_capacity(self):
+        """Number of guests that can still be added, or None when unlimited."""
+        from .quotas import remaining_guests
+        return remaining_guests(self, self.user.tier)
+
     def can_add_guest(self):
-        if self.user.max_guests_per_invitation is None:
-            return True
-        return self.guest_count < self.max_guests
+        remaining = self.remaining_guest_capacity()
+        return remaining is None or remaining > 0
+
+
+def _saves_any(update_fields, names):
+    """Whether a save with ``update_fields`` writes any of the fields ``names``."""
+    if update_fields is None:
+        return True
+    return any(name in update_fields or name.removesuffix('_id') in update_fields for name in names)
+
+
+class GuestQuerySet(models.QuerySet):
+
+    def delete(self):
+        """Delete the guests and move their invitations' counters in one UPDATE each."""
+        from .counters import record_guests_deleted
+
+        with transaction.atomic(using=self.db):
+            # Lock the rows first, so the statuses counted are the ones deleted
+            self.update(rsvp_status=F('rsvp_status'))
+            removed = list(
+                self.order_by().values('invitation_id', 'rsvp_status')
+                .annotate(count=Count('pk')).values_list('invitation_id', 'rsvp_status', 'count')
+            )
+            result = super().delete()
+            record_guests_deleted(removed)
+        return result
+
+    delete.alters_data = True
+    delete.queryset_only = True
 
 
 class Guest(models.Model):
@@ -179,10 +274,49 @@ class Guest(models.Model):
         db_table = 'guests'
         ordering = ['-created_at']
         unique_together = ['invitation', 'email']
+        indexes = [
+            # The seek behind every guest list page (pagination.KeysetPagination).
+            # Migrations are generated per deployment; on a large PostgreSQL guests
+            # table add it with AddIndexConcurrently in a non-atomic migration.
+            models.Index(
+                fields=['invitation', '-created_at', '-id'], name='guests_invitation_created_idx'
+            ),
+            models.Index(fields=['invitation', 'rsvp_status'], name='guests_invitation_rsvp_idx'),
+            models.Index(fields=['invitation', 'invitation_sent'], name='guests_invitation_sent_idx'),
+            # Newest-first listings across all invitations (admin changelist)
+            models.Index(fields=['-created_at', '-id'], name='guests_created_idx'),
+        ]
+
+    objects = GuestQuerySet.as_manager()
+
+    # Fields whose changes move the invitation counters
+    COUNTED_FIELDS = ('invitation_id', 'rsvp_status')
 
     def __str__(self):
         return f"{self.name} ({self.email})"
 
+    def save(self, *args, **kwargs):
+        from .counters import lock_row, record_guest_saved
+
+        counted = _saves_any(kwargs.get('update_fields'), self.COUNTED_FIELDS)
+        with transaction.atomic(using=kwargs.get('using')):
+            previous = None
+            if counted and not self._state.adding:
+                previous = lock_row(Guest.objects.filter(pk=self.pk), *self.COUNTED_FIELDS)
+            super().save(*args, **kwargs)
+            if counted:
+                record_guest_saved(self, previous)
+
+    def delete(self, *args, **kwargs):
+        from .counters import lock_row, record_guests_deleted
+
+        with transaction.atomic(using=kwargs.get('using')):
+            previous = lock_row(Guest.objects.filter(pk=self.pk), *self.COUNTED_FIELDS)
+            result = super().delete(*args, **kwargs)
+            if previous is not None:
+                record_guests_deleted([(*previous, 1)])
+        return result
+
     def update_rsvp(self, status):
         self.rsvp_status = status
         self.rsvp_date = timezone.now()
@@ -207,6 +341,14 @@ class ShareLink(models.Model):
     class Meta:
         db_table = 'share_links'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['invitation', 'is_active'], name='share_links_invitation_idx'),
+            models.Index(
+                fields=['expires_at'],
+                name='share_links_expiring_idx',
+                condition=models.Q(is_active=True),
+            ),
+        ]
 
     def __str__(self):
         return f"Link for {self.invitation.title}"
@@ -228,5 +370,163 @@ class ShareLink(models.Model):
         return self.is_active and not self.is_expired
 
     def increment_view_count(self):
-        self.view_count += 1
-        self.save(update_fields=['view_count'])
+        # Buffered; flushed to view_count in batches (see viewcounts.py)
+        from .viewcounts import view_count_buffer
+
+        view_count_buffer.increment(self.token)
+
+
+class OutboundEmail(models.Model):
+    """Queued email, delivered by the send_outbox worker."""
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        SENDING = 'sending', 'Sending'
+        SENT = 'sent', 'Sent'
+        FAILED = 'failed', 'Failed'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    guest = models.ForeignKey(
+        Guest,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='emails'
+    )
+    to_email = models.EmailField()
+    from_email = models.CharField(max_length=254)
+    subject = models.CharField(max_length=300)
+    body = models.TextField()
+
+    # Delivery state
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claimed_by = models.CharField(max_length=64, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'email_outbox'
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='email_outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.to_email} ({self.status})"
+
+
+class RSVPSubmission(models.Model):
+    """Append-only log of queued RSVPs, folded into guests by the apply_rsvps worker."""
+
+    id = models.BigAutoField(primary_key=True)
+    invitation = models.ForeignKey(
+        Invitation,
+        on_delete=models.CASCADE,
+        related_name='rsvp_submissions'
+    )
+    name = models.CharField(max_length=100)
+    email = models.EmailField()
+    rsvp_status = models.CharField(max_length=15, choices=Guest.RSVPStatus.choices)
+    plus_one = models.BooleanField(default=False)
+    plus_one_count = models.PositiveIntegerField(default=0)
+    notes = models.TextField(blank=True)
+    submitted_at = models.DateTimeField(default=timezone.now)
+    applied_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'rsvp_log'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['invitation', 'email', '-id'], name='rsvp_log_guest_idx'),
+            models.Index(
+                fields=['id'],
+                name='rsvp_log_pending_idx',
+                condition=models.Q(applied_at__isnull=True),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.email}: {self.rsvp_status} (#{self.id})"
+
+
+class Job(models.Model):
+    """Background job, run by the run_jobs worker (see jobs.py)."""
+
+    class Status(models.TextChoices):
+        QUEUED = 'queued', 'Queued'
+        RUNNING = 'running', 'Running'
+        SUCCEEDED = 'succeeded', 'Succeeded'
+        FAILED = 'failed', 'Failed'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='jobs'
+    )
+    task = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    result = models.JSONField(null=True, blank=True)
+
+    # Execution state
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claimed_by = models.CharField(max_length=64, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'jobs'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='jobs_due_idx'),
+            models.Index(fields=['user', '-created_at', '-id'], name='jobs_user_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.task} ({self.status})"
+
+
+class UserStats(models.Model):
+    """Materialized dashboard statistics for a host, maintained incrementally."""
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats'
+    )
+    total_invitations = models.PositiveIntegerField(default=0)
+    active_invitations = models.PositiveIntegerField(default=0)
+    total_guests = models.PositiveIntegerField(default=0)
+    total_attending = models.PositiveIntegerField(default=0)
+    total_pending = models.PositiveIntegerField(default=0)
+    total_not_attending = models.PositiveIntegerField(default=0)
+    invitations_by_template = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    STATS_FIELDS = (
+        'total_invitations', 'active_invitations', 'total_guests', 'total_attending',
+        'total_pending', 'total_not_attending', 'invitations_by_template',
+    )
+
+    class Meta:
+        db_table = 'user_stats'
+        verbose_name_plural = 'user stats'
+
+    def __str__(self):
+        return f"Stats for {self.user_id}"
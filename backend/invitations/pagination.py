@@ -0,0 +1,160 @@
+import binascii
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ParseError
+from rest_framework.pagination import BasePagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Keyset pagination on (created_at, id), newest first.
+
+    A page seeks past the last row of the previous one instead of counting and
+    skipping rows, so with a matching (..., -created_at, -id) index every page
+    costs the same however deep the client goes. Cursors are opaque tokens and
+    stay valid while rows are added. There is no COUNT(*): ``?include_count=1``
+    adds a 'count' taken from the view's ``get_total_count()``, which reads it
+    from a stored counter (or returns None). The order is fixed, so an
+    ``?ordering=`` parameter is rejected rather than silently ignored.
+    """
+
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    cursor_query_param = 'cursor'
+    count_query_param = 'include_count'
+    invalid_cursor_message = 'Invalid cursor'
+    ordering_message = 'This list is always ordered newest first; ordering is not supported.'
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                return _positive_int(
+                    request.query_params[self.page_size_query_param],
+                    strict=True,
+                    cutoff=self.max_page_size
+                )
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def decode_cursor(self, request, model):
+        """(created_at, pk, reverse) from the cursor parameter, or None on the first page."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            data = json.loads(urlsafe_b64decode(encoded.encode()))
+            created_at = model._meta.get_field('created_at').to_python(data['t'])
+            pk = model._meta.pk.to_python(data['k'])
+            reverse = bool(data.get('r'))
+        except (TypeError, ValueError, KeyError, ValidationError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        if created_at is None or pk is None:
+            raise NotFound(self.invalid_cursor_message)
+        return created_at, pk, reverse
+
+    def get_cursor_key(self, obj):
+        """(created_at, pk) of a model instance or a ``.values()`` row."""
+        if isinstance(obj, dict):
+            return obj['created_at'], obj['id']
+        return obj.created_at, obj.pk
+
+    def encode_cursor(self, obj, reverse=False):
+        created_at, pk = self.get_cursor_key(obj)
+        data = {'t': created_at.isoformat(), 'k': str(pk)}
+        if reverse:
+            data['r'] = 1
+        token = urlsafe_b64encode(json.dumps(data, separators=(',', ':')).encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        if api_settings.ORDERING_PARAM in request.query_params:
+            raise ParseError(self.ordering_message)
+
+        self.base_url = request.build_absolute_uri()
+        cursor = self.decode_cursor(request, queryset.model)
+        reverse = cursor is not None and cursor[2]
+
+        if cursor is not None:
+            created_at, pk, _ = cursor
+            # Range on created_at first, so the index seek does the work; pk only breaks ties
+            if reverse:
+                seek = Q(created_at__gte=created_at) & (Q(created_at__gt=created_at) | Q(pk__gt=pk))
+            else:
+                seek = Q(created_at__lte=created_at) & (Q(created_at__lt=created_at) | Q(pk__lt=pk))
+            queryset = queryset.filter(seek)
+
+        ordering = ('created_at', 'pk') if reverse else ('-created_at', '-pk')
+        results = list(queryset.order_by(*ordering)[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+
+        self.count = None
+        if request.query_params.get(self.count_query_param) and hasattr(view, 'get_total_count'):
+            self.count = view.get_total_count()
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1])
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def first_page(self, queryset, base_url=None):
+        """The first page of ``queryset`` and the link to the next page under ``base_url``.
+
+        For lists embedded in another endpoint's response: the request's query
+        parameters belong to that endpoint, so they are not read here. Without
+        ``base_url`` there is no next link.
+        """
+        results = list(queryset.order_by('-created_at', '-pk')[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        self.has_next, self.has_previous = len(results) > self.page_size, False
+        if base_url is None:
+            return self.page, None
+        self.base_url = base_url
+        return self.page, self.get_next_link()
+
+    def get_paginated_response(self, data):
+        response = {'next': self.get_next_link(), 'previous': self.get_previous_link()}
+        if self.count is not None:
+            response['count'] = self.count
+        response['results'] = data
+        return Response(response)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'count': {'type': 'integer', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+
+class GuestCursorPagination(KeysetPagination):
+    """Keyset pagination for an invitation's guests."""
+
+    page_size = 50
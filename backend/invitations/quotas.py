@@ -0,0 +1,96 @@
+"""
+Tier quotas: how many invitations a host may create and how many guests an
+invitation may hold.
+
+Usage is read from the stored counters (UserStats.total_invitations and
+Invitation.guests_total) instead of counting rows. The reserve_* helpers
+take a write lock on the counter row before reading it (a no-op UPDATE, as
+in rsvp.py), so when they run inside the transaction that inserts the rows,
+concurrent creates queue on the lock and can never overshoot the limits in
+INVITEFLOW_SETTINGS. The lock must be the first statement of the
+transaction: SQLite cannot upgrade a transaction that has already read.
+"""
+from django.conf import settings
+from django.db.models import F
+
+from .counters import get_user_stats
+from .models import Invitation, UserStats
+
+INVITATION_LIMIT_MESSAGE = (
+    "You have reached the maximum number of invitations for your tier. "
+    "Please upgrade to create more invitations."
+)
+GUEST_LIMIT_MESSAGE = "Maximum guest limit reached for this invitation."
+
+
+def invitation_limit(tier):
+    """Invitations a host on ``tier`` may have, or None when unlimited."""
+    return settings.INVITEFLOW_SETTINGS.get(f'{tier.upper()}_TIER_MAX_INVITATIONS')
+
+
+def guest_limit(tier):
+    """Guests per invitation a host on ``tier`` may have, or None when unlimited."""
+    return settings.INVITEFLOW_SETTINGS.get(f'{tier.upper()}_TIER_MAX_GUESTS_PER_INVITATION')
+
+
+def _invitation_usage(user_id):
+    used = UserStats.objects.filter(pk=user_id).values_list('total_invitations', flat=True).first()
+    if used is None:
+        used = get_user_stats(user_id)['total_invitations']
+    return used
+
+
+def invitation_quota(user):
+    """The host's invitation usage as {'used', 'limit', 'remaining'}.
+
+    'limit' and 'remaining' are None when the tier is unlimited.
+    """
+    used = _invitation_usage(user.pk)
+    limit = invitation_limit(user.tier)
+    remaining = None if limit is None else max(0, limit - used)
+    return {'used': used, 'limit': limit, 'remaining': remaining}
+
+
+def reserve_invitation(user, count=1):
+    """Whether ``user`` may create ``count`` more invitations, holding their usage row locked.
+
+    Call inside the transaction that creates the invitations.
+    """
+    limit = invitation_limit(user.tier)
+    if limit is None:
+        return True
+
+    usage = UserStats.objects.filter(pk=user.pk)
+    if not usage.update(total_invitations=F('total_invitations')):
+        get_user_stats(user.pk)
+        usage.update(total_invitations=F('total_invitations'))
+    return usage.values_list('total_invitations', flat=True).get() + count <= limit
+
+
+def guest_capacity(max_guests, tier):
+    """Guests an invitation may hold: its own max_guests, capped by the tier; None when unlimited."""
+    limit = guest_limit(tier)
+    if limit is None:
+        return None
+    return min(max_guests, limit)
+
+
+def remaining_guests(invitation, tier):
+    """Guests that can still be added to ``invitation``, or None when unlimited."""
+    capacity = guest_capacity(invitation.max_guests, tier)
+    if capacity is None:
+        return None
+    return max(0, capacity - invitation.guests_total)
+
+
+def reserve_guests(invitation_id, tier):
+    """Guests that can still be added, or None when unlimited, holding the invitation locked.
+
+    Call inside the transaction that inserts the guests.
+    """
+    invitation = Invitation.objects.filter(pk=invitation_id)
+    invitation.update(updated_at=F('updated_at'))
+    if guest_limit(tier) is None:
+        return None
+    row = invitation.values('max_guests', 'guests_total').get()
+    return max(0, guest_capacity(row['max_guests'], tier) - row['guests_total'])
@@ -0,0 +1,154 @@
+"""
+Read-only serializers for the hot read paths, compiled from the DRF ones.
+
+A RowSerializer inspects a DRF serializer once and turns every field into a
+``.values()`` path and, where the database value isn't already its JSON
+representation, a converter. Serializing a row is then one dict built with
+plain lookups: no serializer or field instances per row, no get_attribute()
+chains. The output is identical to the DRF serializer's (same keys, order
+and values); tests.py checks the parity.
+"""
+from functools import cached_property
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+from rest_framework import ISO_8601, fields as drf_fields, serializers
+from rest_framework.settings import api_settings
+
+from .serializers import (
+    GuestSerializer, PublicInvitationSerializer, TemplateSerializer, ThemeSerializer
+)
+
+# Fields whose to_representation() returns database values of the matching type unchanged
+IDENTITY_FIELDS = (
+    drf_fields.CharField,
+    drf_fields.ChoiceField,
+    drf_fields.BooleanField,
+    drf_fields.IntegerField,
+    drf_fields.ReadOnlyField,
+)
+
+
+def _iso_format(field, default):
+    output_format = getattr(field, 'format', default)
+    return output_format is not None and output_format.lower() == ISO_8601
+
+
+def _current_timezone():
+    return timezone.get_current_timezone() if settings.USE_TZ else None
+
+
+def _datetime(value, tz):
+    if tz is not None:
+        value = value.astimezone(tz)
+    value = value.isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def _isoformat(value):
+    return value.isoformat()
+
+
+def _converter(field):
+    """Callable turning a database value into the field's representation; None for identity."""
+    if isinstance(field, drf_fields.UUIDField) and field.uuid_format == 'hex_verbose':
+        return str
+    if isinstance(field, drf_fields.DateTimeField):
+        if _iso_format(field, api_settings.DATETIME_FORMAT) and not hasattr(field, 'timezone'):
+            return _datetime
+    elif isinstance(field, drf_fields.DateField):
+        if _iso_format(field, api_settings.DATE_FORMAT):
+            return _isoformat
+    elif isinstance(field, drf_fields.TimeField):
+        if _iso_format(field, api_settings.TIME_FORMAT):
+            return _isoformat
+    elif isinstance(field, IDENTITY_FIELDS):
+        return None
+    return field.to_representation
+
+
+class RowSerializer:
+    """Compiled, read-only form of ``serializer_class`` for ``.values()`` rows.
+
+    ``prefix`` is prepended to every path, for rows read through a relation
+    (e.g. ``'invitation__'`` when selecting from share links).
+    """
+
+    def __init__(self, serializer_class, prefix=''):
+        self.serializer_class = serializer_class
+        self.prefix = prefix
+
+    @cached_property
+    def compiled(self):
+        """(paths, fields) where fields is a tuple of (name, path, converter, nested)."""
+        opts = self.serializer_class.Meta.model._meta
+        paths, compiled = [], []
+
+        for name, field in self.serializer_class().fields.items():
+            if field.write_only:
+                continue
+            if field.source == '*' or isinstance(field, serializers.ListSerializer):
+                raise ImproperlyConfigured(
+                    f'{self.serializer_class.__name__}.{name} cannot be read from a values() row.'
+                )
+
+            path = self.prefix + field.source.replace('.', '__')
+            if isinstance(field, serializers.BaseSerializer):
+                # The foreign key tells a missing relation (None) apart from a nested row
+                nested = RowSerializer(type(field), prefix=f'{path}__')
+                paths.append(path)
+                paths.extend(nested.paths)
+                compiled.append((name, path, None, nested))
+            else:
+                if not opts.get_field(field.source.split('.')[0]).concrete:
+                    raise ImproperlyConfigured(
+                        f'{self.serializer_class.__name__}.{name} is not a database column.'
+                    )
+                paths.append(path)
+                compiled.append((name, path, _converter(field), None))
+
+        return tuple(dict.fromkeys(paths)), tuple(compiled)
+
+    @property
+    def paths(self):
+        """The ``.values()`` paths a row must contain."""
+        return self.compiled[0]
+
+    def to_representation(self, row, tz=None):
+        """Representation of one row; ``tz`` is the current timezone, looked up if not given."""
+        if tz is None:
+            tz = _current_timezone()
+        data = {}
+        for name, path, convert, nested in self.compiled[1]:
+            value = row[path]
+            if value is None:
+                data[name] = None
+            elif nested is not None:
+                data[name] = nested.to_representation(row, tz)
+            elif convert is None:
+                data[name] = value
+            elif convert is _datetime:
+                data[name] = _datetime(value, tz)
+            else:
+                data[name] = convert(value)
+        return data
+
+    def many(self, rows):
+        """Representations of an iterable of rows."""
+        to_representation = self.to_representation
+        tz = _current_timezone()
+        return [to_representation(row, tz) for row in rows]
+
+    def serialize(self, queryset):
+        """Representations of every object in ``queryset``, read with one ``.values()`` query."""
+        return self.many(queryset.values(*self.paths))
+
+
+guest_rows = RowSerializer(GuestSerializer)
+template_rows = RowSerializer(TemplateSerializer)
+theme_rows = RowSerializer(ThemeSerializer)
+# Read through the share link: ShareLink.objects.values(*public_invitation_rows.paths)
+public_invitation_rows = RowSerializer(PublicInvitationSerializer, prefix='invitation__')
@@ -0,0 +1,261 @@
+"""
+RSVP write paths for the public share-link endpoint.
+
+By default an RSVP is written straight to its guest row (``upsert_rsvp``). With
+RSVP_INGESTION = 'queued' the submission is only appended to the RSVP log
+(``queue_rsvp``) and the ``apply_rsvps`` worker folds the log into guest rows in
+batches (``apply_rsvp_log``, also run as a job runner poller), so bursts of RSVPs never queue up behind the
+guests table's write lock.
+"""
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .counters import apply_guest_deltas, guest_deltas
+from .jobs import poller
+from .models import Guest, RSVPSubmission
+
+# Columns an RSVP overwrites on an existing guest; everything else is kept.
+RSVP_UPDATE_FIELDS = [
+    'name', 'rsvp_status', 'plus_one', 'plus_one_count', 'notes', 'rsvp_date', 'updated_at'
+]
+
+
+def _upsert_sql(on_conflict_update=True):
+    qn = connection.ops.quote_name
+    opts = Guest._meta
+    columns = ', '.join(qn(field.column) for field in opts.concrete_fields)
+    placeholders = ', '.join(['%s'] * len(opts.concrete_fields))
+    conflict = ', '.join(qn(opts.get_field(name).column) for name in ('invitation', 'email'))
+    if on_conflict_update:
+        updates = ', '.join(
+            f'{qn(column)} = EXCLUDED.{qn(column)}'
+            for column in (opts.get_field(name).column for name in RSVP_UPDATE_FIELDS)
+        )
+        action = f'DO UPDATE SET {updates}'
+    else:
+        action = 'DO NOTHING'
+    return (
+        f'INSERT INTO {qn(opts.db_table)} ({columns}) VALUES ({placeholders}) '
+        f'ON CONFLICT ({conflict}) {action} '
+        f'RETURNING {columns}'
+    )
+
+
+def _lock_guest_sql():
+    qn = connection.ops.quote_name
+    opts = Guest._meta
+    status = qn(opts.get_field('rsvp_status').column)
+    return (
+        f'UPDATE {qn(opts.db_table)} SET {status} = {status} '
+        f'WHERE {qn(opts.get_field("invitation").column)} = %s '
+        f'AND {qn(opts.get_field("email").column)} = %s '
+        f'RETURNING {status}'
+    )
+
+
+def _lock_guest(invitation_id, email):
+    """Write-lock the guest row of an RSVP and return its current status, or None if there is none."""
+    with connection.cursor() as cursor:
+        cursor.execute(_lock_guest_sql(), [
+            Guest._meta.get_field('invitation').get_db_prep_save(invitation_id, connection), email
+        ])
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def _rsvp_deltas(previous_status, rsvp_status):
+    """Counter deltas for a guest moving from ``previous_status`` (None = new guest)."""
+    deltas = Counter(guest_deltas(rsvp_status))
+    if previous_status is not None:
+        deltas.update(guest_deltas(previous_status, sign=-1))
+    return deltas
+
+
+def upsert_rsvp(invitation_id, data):
+    """Create or update the guest behind an RSVP and return it.
+
+    The guest row is locked and its current status returned by one no-op
+    UPDATE ... RETURNING, then written with INSERT ... ON CONFLICT, so
+    concurrent RSVPs for the same email can never trip the unique constraint
+    and the RSVP counters move by exactly the change this submission made.
+    Only the guest row is locked: RSVPs from different guests of an invitation
+    meet only in the final counter UPDATE. (A CTE reading the old status in
+    the upsert itself would not do: SQLite evaluates subqueries in RETURNING
+    after the row has changed.)
+    """
+    now = timezone.now()
+    guest = Guest(
+        invitation_id=invitation_id,
+        email=data['email'],
+        name=data['name'],
+        rsvp_status=data['rsvp_status'],
+        plus_one=data['plus_one'],
+        plus_one_count=data['plus_one_count'],
+        notes=data.get('notes', ''),
+        rsvp_date=now,
+        created_at=now,
+        updated_at=now,
+    )
+    params = [
+        field.get_db_prep_save(getattr(guest, field.attname), connection)
+        for field in Guest._meta.concrete_fields
+    ]
+
+    with transaction.atomic():
+        while True:
+            previous_status = _lock_guest(invitation_id, data['email'])
+            # An existing (now locked) guest is updated; a new one is inserted,
+            # unless a concurrent RSVP inserted it first, which the next pass locks.
+            written = list(Guest.objects.raw(_upsert_sql(previous_status is not None), params))
+            if written:
+                guest = written[0]
+                break
+
+        apply_guest_deltas(invitation_id, _rsvp_deltas(previous_status, guest.rsvp_status))
+
+    return guest
+
+
+def _assign_submission(guest, entry):
+    guest.name = entry.name
+    guest.rsvp_status = entry.rsvp_status
+    guest.plus_one = entry.plus_one
+    guest.plus_one_count = entry.plus_one_count
+    guest.notes = entry.notes
+    guest.rsvp_date = entry.submitted_at
+
+
+def _supersedes(entry, guest):
+    return guest.rsvp_date is None or entry.submitted_at >= guest.rsvp_date
+
+
+def _submission(invitation_id, data):
+    return RSVPSubmission(
+        invitation_id=invitation_id,
+        email=data['email'],
+        name=data['name'],
+        rsvp_status=data['rsvp_status'],
+        plus_one=data['plus_one'],
+        plus_one_count=data['plus_one_count'],
+        notes=data.get('notes', ''),
+    )
+
+
+def queue_rsvp(invitation_id, data):
+    """Append a validated RSVP to the log; it reaches the guest row once applied."""
+    entry = _submission(invitation_id, data)
+    entry.save(force_insert=True)
+    return entry
+
+
+def _pending_entries(invitation_id, email):
+    return RSVPSubmission.objects.filter(
+        invitation_id=invitation_id, email=email, applied_at__isnull=True
+    ).order_by('-id')
+
+
+def _overlay(invitation_id, email, guest, entry):
+    if entry is not None:
+        if guest is None:
+            guest = Guest(id=None, invitation_id=invitation_id, email=email)
+        if _supersedes(entry, guest):
+            _assign_submission(guest, entry)
+    return guest
+
+
+def get_rsvp(invitation_id, email):
+    """The guest as they will look once their queued RSVPs are applied, or None.
+
+    Guests who only exist in the log so far are returned unsaved, without an id.
+    """
+    guest = Guest.objects.filter(invitation_id=invitation_id, email=email).first()
+    entry = _pending_entries(invitation_id, email).first()
+    return _overlay(invitation_id, email, guest, entry)
+
+
+def _apply_submissions(invitation_id, submissions, now):
+    """Write the latest submission per email (``submissions``) to one invitation's guests.
+
+    The existing guests are write-locked before they are read, like
+    upsert_rsvp() locks its guest, so the counter deltas are taken from rows
+    no direct RSVP can change underneath. New guests are inserted with
+    ignore_conflicts: one that a direct RSVP inserted first is left alone by
+    the INSERT and goes round again as an update of that row.
+    """
+    deltas = Counter()
+    pending = dict(submissions)
+    while pending:
+        existing = Guest.objects.filter(invitation_id=invitation_id, email__in=list(pending))
+        # A no-op UPDATE: takes the row locks, and on SQLite the write lock up front
+        existing.update(rsvp_status=F('rsvp_status'))
+        guests = {guest.email: guest for guest in existing}
+
+        created, updated = [], []
+        for email, entry in pending.items():
+            guest = guests.get(email)
+            if guest is None:
+                guest = Guest(invitation_id=invitation_id, email=email)
+                created.append(guest)
+            elif _supersedes(entry, guest):
+                # An RSVP written directly after this one was queued stays in place
+                deltas.update(_rsvp_deltas(guest.rsvp_status, entry.rsvp_status))
+                updated.append(guest)
+            else:
+                continue
+            _assign_submission(guest, entry)
+            guest.updated_at = now
+
+        Guest.objects.bulk_update(updated, RSVP_UPDATE_FIELDS)
+        Guest.objects.bulk_create(created, ignore_conflicts=True)
+        inserted = set(
+            Guest.objects.filter(pk__in=[guest.pk for guest in created]).values_list('pk', flat=True)
+        )
+        pending = {}
+        for guest in created:
+            if guest.pk in inserted:
+                deltas.update(_rsvp_deltas(None, guest.rsvp_status))
+            else:
+                pending[guest.email] = submissions[guest.email]
+
+    apply_guest_deltas(invitation_id, deltas)
+
+
+@poller('rsvp.apply_log', interval=1)
+def apply_rsvp_log(batch_size=None):
+    """Fold the oldest ``batch_size`` queued RSVPs into guest rows in one transaction.
+
+    Only the latest submission per invitation and email is written; the ones
+    it supersedes are marked applied with it. Returns the number of log
+    entries applied.
+    """
+    if batch_size is None:
+        batch_size = settings.INVITEFLOW_SETTINGS.get('RSVP_APPLY_BATCH_SIZE', 500)
+
+    ids = list(
+        RSVPSubmission.objects.filter(applied_at__isnull=True)
+        .order_by('id')
+        .values_list('pk', flat=True)[:batch_size]
+    )
+    if not ids:
+        return 0
+
+    now = timezone.now()
+    with transaction.atomic():
+        # Claim first, so concurrent appliers never fold the same entries twice
+        RSVPSubmission.objects.filter(pk__in=ids, applied_at__isnull=True).update(applied_at=now)
+        entries = RSVPSubmission.objects.filter(pk__in=ids, applied_at=now).order_by('id')
+
+        latest = {}
+        applied = 0
+        for entry in entries:
+            latest.setdefault(entry.invitation_id, {})[entry.email] = entry
+            applied += 1
+
+        for invitation_id, submissions in latest.items():
+            _apply_submissions(invitation_id, submissions, now)
+
+    return applied
@@ -1,5 +1,86 @@
+from django.conf import settings
+from django.urls import reverse
 from rest_framework import serializers
-from .models import Template, Theme, Invitation, Guest, ShareLink
+from rest_framework.permissions import SAFE_METHODS
+from .catalog import catalog
+from .models import Template, Theme, Invitation, Guest, ShareLink, OutboundEmail, Job
+from .pagination import GuestCursorPagination
+from .quotas import INVITATION_LIMIT_MESSAGE, invitation_quota
+
+
+def _query_param_set(request, name):
+    value = request.query_params.get(name)
+    if value is None:
+        return None
+    return {part.strip() for part in value.split(',') if part.strip()}
+
+
+class SparseFieldsMixin:
+    """Lets read requests pick fields with ?fields=a,b and nest relations with ?expand=x.
+
+    ``expandable_fields`` maps expand names to the serializer that replaces (or
+    adds) the field. ``field_sources`` maps fields to the model fields they read
+    when that isn't their ``source``. ``shape_queryset`` uses both so a query
+    loads only the columns and joins the selected fields need.
+    """
+
+    expandable_fields = {}
+    field_sources = {}
+    # Always loaded: the primary key and the pagination key
+    required_sources = ('id', 'created_at')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS:
+            return
+
+        expand = _query_param_set(request, 'expand') or set()
+        for name in expand & set(self.expandable_fields):
+            self.fields[name] = self.expandable_fields[name](read_only=True)
+
+        requested = _query_param_set(request, 'fields')
+        if requested is not None:
+            for name in set(self.fields) - requested - expand:
+                self.fields.pop(name)
+
+    @classmethod
+    def shape_queryset(cls, queryset, request):
+        """Restrict ``queryset`` to what the fields selected by ``request`` read."""
+        opts = queryset.model._meta
+        columns, joins = set(cls.required_sources), set()
+
+        for name, field in cls(context={'request': request}).fields.items():
+            if name in cls.field_sources:
+                sources = cls.field_sources[name]
+            elif isinstance(field, serializers.BaseSerializer):
+                # A nested object needs the whole related row
+                related = opts.get_field(field.source).related_model
+                sources = [field.source] + [
+                    f'{field.source}__{related_field.name}'
+                    for related_field in related._meta.concrete_fields
+                ]
+            else:
+                sources = [field.source.replace('.', '__')]
+
+            for source in sources:
+                columns.add(source)
+                if '__' in source:
+                    joins.add(source.split('__')[0])
+
+        if joins:
+            queryset = queryset.select_related(*joins)
+        return queryset.only(*columns)
+
+
+# Invitation properties -> the stored fields they read
+INVITATION_PROPERTY_SOURCES = {
+    'guest_count': ['guests_total'],
+    'attending_count': ['guests_attending'],
+    'pending_count': ['guests_pending'],
+    'not_attending_count': ['guests_not_attending'],
+    'is_expired': ['expires_at'],
+}
 
 
 class TemplateSerializer(serializers.ModelSerializer):
@@ -21,7 +102,7 @@ class ThemeSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'primary_color', 'secondary_color', 'bg_gradient']
 
 
-class GuestSerializer(serializers.ModelSerializer):
+class GuestSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for guests."""
 
     class Meta:
@@ -37,14 +118,17 @@ class GuestSerializer(serializers.ModelSerializer):
 class GuestCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating guests."""
 
+    duplicate_email_message = "A guest with this email already exists for this invitation."
+
     class Meta:
         model = Guest
         fields = ['name', 'email', 'phone', 'plus_one', 'plus_one_count', 'notes']
 
     def validate_email(self, value):
+        # Bulk imports leave 'invitation' out of the context and check duplicates set-wise
         invitation = self.context.get('invitation')
         if invitation and Guest.objects.filter(invitation=invitation, email=value).exists():
-            raise serializers.ValidationError("A guest with this email already exists for this invitation.")
+            raise serializers.ValidationError(self.duplicate_email_message)
         return value
 
 
@@ -59,6 +143,60 @@ class RSVPSerializer(serializers.Serializer):
     notes = serializers.CharField(max_length=500, required=False, allow_blank=True)
 
 
+class PublicRSVPSerializer(serializers.ModelSerializer):
+    """Serializer for a guest's RSVP as the public share-link endpoint shows it.
+
+    Anyone holding the link can look an email up, so only the RSVP itself is
+    returned, never the host's contact details or notes.
+    """
+
+    class Meta:
+        model = Guest
+        fields = ['name', 'rsvp_status', 'plus_one_count']
+        read_only_fields = fields
+
+
+class BulkSendSerializer(serializers.Serializer):
+    """Serializer selecting the guests for a bulk invitation send."""
+
+    AUDIENCE_CHOICES = [
+        ('unsent', 'Guests not invited yet'),
+        ('pending', 'Guests who have not responded'),
+        ('invited', 'Guests already invited'),
+    ]
+
+    audience = serializers.ChoiceField(choices=AUDIENCE_CHOICES, required=False)
+    guest_ids = serializers.ListField(
+        child=serializers.UUIDField(), required=False, allow_empty=False
+    )
+
+    def validate(self, attrs):
+        if 'audience' in attrs and 'guest_ids' in attrs:
+            raise serializers.ValidationError("Provide either an audience or guest_ids, not both.")
+        if 'guest_ids' not in attrs:
+            attrs.setdefault('audience', 'unsent')
+        return attrs
+
+
+class InvitationCloneSerializer(serializers.Serializer):
+    """Options for cloning an invitation."""
+
+    include_guests = serializers.BooleanField(default=False)
+
+
+class InvitationBulkCloneSerializer(InvitationCloneSerializer):
+    """Serializer selecting several invitations to clone in one call."""
+
+    ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        allow_empty=False,
+        max_length=settings.INVITEFLOW_SETTINGS.get('CLONE_MAX_INVITATIONS', 20),
+    )
+
+    def validate_ids(self, value):
+        return list(dict.fromkeys(value))
+
+
 class ShareLinkSerializer(serializers.ModelSerializer):
     """Serializer for share links."""
 
@@ -74,9 +212,43 @@ class ShareLinkSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'token', 'view_count', 'created_at']
 
 
-class InvitationListSerializer(serializers.ModelSerializer):
+class ShareLinkCreateSerializer(serializers.Serializer):
+    """Options for creating a share link."""
+
+    # Email the new link to every guest who was already sent the invitation
+    notify_guests = serializers.BooleanField(default=False)
+
+
+class OutboundEmailSerializer(serializers.ModelSerializer):
+    """Serializer for queued email delivery status."""
+
+    class Meta:
+        model = OutboundEmail
+        fields = [
+            'id', 'guest', 'to_email', 'subject', 'status', 'attempts',
+            'next_attempt_at', 'last_error', 'created_at', 'sent_at'
+        ]
+        read_only_fields = fields
+
+
+class JobSerializer(serializers.ModelSerializer):
+    """Serializer for background job status."""
+
+    class Meta:
+        model = Job
+        fields = [
+            'id', 'task', 'status', 'attempts', 'max_attempts', 'next_attempt_at',
+            'last_error', 'result', 'created_at', 'finished_at'
+        ]
+        read_only_fields = fields
+
+
+class InvitationListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for invitation list view."""
 
+    expandable_fields = {'template': TemplateSerializer, 'theme': ThemeSerializer}
+    field_sources = INVITATION_PROPERTY_SOURCES
+
     template_name = serializers.CharField(source='template.name', read_only=True)
     template_category = serializers.CharField(source='template.category', read_only=True)
     guest_count = serializers.ReadOnlyField()
@@ -95,12 +267,15 @@ class InvitationListSerializer(serializers.ModelSerializer):
         ]
 
 
-class InvitationDetailSerializer(serializers.ModelSerializer):
+class InvitationDetailSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for invitation detail view."""
 
+    field_sources = {**INVITATION_PROPERTY_SOURCES, 'guests': [], 'guests_next': []}
+
     template = TemplateSerializer(read_only=True)
     theme = ThemeSerializer(read_only=True)
-    guests = GuestSerializer(many=True, read_only=True)
+    guests = serializers.SerializerMethodField()
+    guests_next = serializers.SerializerMethodField()
     guest_count = serializers.ReadOnlyField()
     attending_count = serializers.ReadOnlyField()
     pending_count = serializers.ReadOnlyField()
@@ -112,11 +287,41 @@ class InvitationDetailSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'title', 'subtitle', 'celebrant_name', 'template', 'theme',
             'event_date', 'event_time', 'venue_name', 'venue_address',
-            'max_guests', 'status', 'guests', 'guest_count',
+            'max_guests', 'status', 'guests', 'guests_next', 'guest_count',
             'attending_count', 'pending_count', 'not_attending_count',
             'is_expired', 'created_at', 'updated_at', 'expires_at'
         ]
 
+    def guest_page(self, invitation):
+        """First page of guests and the cursor link to the rest, computed once per invitation.
+
+        Only one page is embedded; the full list is served by the guests endpoint.
+        """
+        from .rowserializers import guest_rows
+
+        pages = self.__dict__.setdefault('_guest_pages', {})
+        if invitation.pk not in pages:
+            paginator = GuestCursorPagination()
+            guests = invitation.guests.values(*guest_rows.paths)
+            request = self.context.get('request')
+            guests_url = None
+            if request is not None:
+                guests_url = request.build_absolute_uri(reverse(
+                    'invitations:invitation-guests-list', kwargs={'invitation_pk': invitation.pk}
+                ))
+            pages[invitation.pk] = paginator.first_page(guests, guests_url)
+        return pages[invitation.pk]
+
+    def get_guests(self, obj):
+        from .rowserializers import guest_rows
+
+        guests, _ = self.guest_page(obj)
+        return guest_rows.many(guests)
+
+    def get_guests_next(self, obj):
+        _, next_link = self.guest_page(obj)
+        return next_link
+
 
 class InvitationCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating invitations."""
@@ -133,35 +338,28 @@ class InvitationCreateSerializer(serializers.ModelSerializer):
         ]
 
     def validate_template_id(self, value):
-        try:
-            Template.objects.get(id=value, is_active=True)
-        except Template.DoesNotExist:
+        if catalog.get_template(value) is None:
             raise serializers.ValidationError("Invalid template ID.")
         return value
 
     def validate_theme_id(self, value):
-        if value:
-            try:
-                Theme.objects.get(id=value, is_active=True)
-            except Theme.DoesNotExist:
-                raise serializers.ValidationError("Invalid theme ID.")
+        if value and catalog.get_theme(value) is None:
+            raise serializers.ValidationError("Invalid theme ID.")
         return value
 
     def validate(self, attrs):
-        user = self.context['request'].user
-        if not user.can_create_invitation:
-            raise serializers.ValidationError(
-                "You have reached the maximum number of invitations for your tier. "
-                "Please upgrade to create more invitations."
-            )
+        # Early answer only; the view reserves the quota when it saves
+        if invitation_quota(self.context['request'].user)['remaining'] == 0:
+            raise serializers.ValidationError(INVITATION_LIMIT_MESSAGE)
         return attrs
 
     def create(self, validated_data):
         template_id = validated_data.pop('template_id')
         theme_id = validated_data.pop('theme_id', None)
+        user = validated_data.pop('user', self.context['request'].user)
 
         invitation = Invitation.objects.create(
-            user=self.context['request'].user,
+            user=user,
             template_id=template_id,
             theme_id=theme_id,
             **validated_data
@@ -183,11 +381,8 @@ class InvitationUpdateSerializer(serializers.ModelSerializer):
         ]
 
     def validate_theme_id(self, value):
-        if value:
-            try:
-                Theme.objects.get(id=value, is_active=True)
-            except Theme.DoesNotExist:
-                raise serializers.ValidationError("Invalid theme ID.")
+        if value and catalog.get_theme(value) is None:
+            raise serializers.ValidationError("Invalid theme ID.")
         return value
 
     def update(self, instance, validated_data):
@@ -0,0 +1,61 @@
+from django.contrib.auth import get_user_model
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import Template, Theme, Invitation, Guest, ShareLink
+from .cache import invalidate_public_catalog, invalidate_public_tokens
+from .catalog import catalog
+from .tokens import share_link_tokens
+from .counters import record_invitation_deleted, record_template_deleted
+
+# Guest deletes move the counters in Guest.delete() and GuestQuerySet.delete(),
+# not in a signal: a Guest receiver would stop the guests of a deleted
+# invitation from being removed by a few bulk statements.
+
+
+@receiver(pre_delete, sender=Invitation)
+def invitation_deleted(sender, instance, origin=None, **kwargs):
+    """Keep the host's dashboard stats in step with deleted invitations."""
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if origin_model is get_user_model():
+        # The host's stats row is deleted along with them
+        return
+    record_invitation_deleted(instance)
+
+
+@receiver(post_save, sender=Invitation)
+@receiver(post_delete, sender=Invitation)
+def invitation_changed(sender, instance, **kwargs):
+    """Drop cached public payloads for the invitation's share links."""
+    invalidate_public_tokens(
+        ShareLink.objects.filter(invitation_id=instance.pk).values_list('token', flat=True)
+    )
+
+
+@receiver(post_save, sender=ShareLink)
+@receiver(post_delete, sender=ShareLink)
+def share_link_changed(sender, instance, **kwargs):
+    """Drop the cached public payload and token resolution for the share link."""
+    invalidate_public_tokens([instance.token])
+    if kwargs.get('created'):
+        # A new token can only be cached (as unknown) by the worker that saw it guessed
+        share_link_tokens.discard([instance.token])
+    else:
+        share_link_tokens.invalidate([instance.token])
+
+
+@receiver(post_save, sender=Template)
+@receiver(post_delete, sender=Template)
+@receiver(post_save, sender=Theme)
+@receiver(post_delete, sender=Theme)
+def catalog_changed(sender, **kwargs):
+    """Reload the template/theme catalog; their data is also in every public payload."""
+    catalog.invalidate()
+    invalidate_public_catalog()
+
+
+@receiver(pre_delete, sender=Template)
+def template_deleted(sender, instance, **kwargs):
+    """Take the template's invitations out of their hosts' per-category counts."""
+    record_template_deleted(instance)
@@ -1,3 +1,1696 @@
-from django.test import TestCase
+import csv
+import json
+import os
+import re
+import smtplib
+import sys
+import time as clock
+import uuid
+import timeit
+import unittest
+import unittest.mock
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO, StringIO
 
-# Create your tests here.
+from django.conf import settings
+from django.core import mail
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError, connection, connections
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import parse_http_date
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from inviteflow.paginators import EstimatedCountPaginator
+from inviteflow.parsers import FastJSONParser
+from inviteflow.renderers import FastJSONRenderer, orjson
+from .cache import PUBLIC_VERSION_KEY, _public_key, check_shared_cache, get_public_entry
+from .catalog import Catalog
+from .exports import GUEST_EXPORT_FIELDS
+from .expiry import expire_invitations, expire_share_links, sweep_expired
+from .emails import claim_batch, deliver_outbox, queue_invitation_email
+from .jobs import JobRunner, claim_jobs, enqueue, run_due_jobs, run_job, task
+from .counters import find_counter_drift, get_user_stats, rebuild_counters, rebuild_user_stats
+from .models import (
+    Template, Theme, Invitation, Guest, ShareLink, UserStats, Job, OutboundEmail
+)
+from .quotas import INVITATION_LIMIT_MESSAGE, reserve_guests
+from .rsvp import apply_rsvp_log, queue_rsvp, upsert_rsvp
+from .rowserializers import guest_rows, public_invitation_rows, template_rows, theme_rows
+from .serializers import (
+    GuestSerializer, PublicInvitationSerializer, TemplateSerializer, ThemeSerializer
+)
+from .tokens import TokenCache
+from .viewcounts import ViewCountBuffer, view_count_buffer
+
+
+def invite_settings(**overrides):
+    """override_settings() for a few INVITEFLOW_SETTINGS, keeping the rest."""
+    return override_settings(INVITEFLOW_SETTINGS={**settings.INVITEFLOW_SETTINGS, **overrides})
+
+
+# Timing benchmarks and load tests are slow and machine-dependent, so they only
+# run with INVITEFLOW_BENCHMARKS=1 in the environment
+benchmark = unittest.skipUnless(
+    os.environ.get('INVITEFLOW_BENCHMARKS'), 'set INVITEFLOW_BENCHMARKS=1 to run benchmarks'
+)
+
+# A plan step that reads a whole table instead of seeking into an index.
+FULL_SCAN = re.compile(r'^SCAN (?!CONSTANT ROW)')
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN is SQLite syntax')
+class QueryPlanTests(TestCase):
+    """The hot query shapes must be served by indexes, never by a full table scan."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='host@example.com', username='host', password='password', tier=User.Tier.PREMIUM
+        )
+        cls.template = Template.objects.create(id='plan-test', name='Plan', category='birthday')
+        cls.invitation = Invitation.objects.create(
+            user=cls.user,
+            template=cls.template,
+            title='Party',
+            event_date=date(2030, 1, 1),
+            status=Invitation.Status.ACTIVE,
+        )
+        cls.guest = Guest.objects.create(
+            invitation=cls.invitation, name='Guest', email='guest@example.com'
+        )
+        cls.share_link = ShareLink.objects.create(invitation=cls.invitation)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.addCleanup(view_count_buffer.flush)
+
+    def query_plans(self, queries):
+        plans = []
+        for query in queries:
+            sql = query['sql']
+            if not sql.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE')):
+                continue
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                plans.append((sql, [row[-1] for row in cursor.fetchall()]))
+        return plans
+
+    def assertNoFullScans(self, func, *args, **kwargs):
+        """Run ``func`` and fail if any query it issued scans a full table."""
+        with CaptureQueriesContext(connection) as captured:
+            result = func(*args, **kwargs)
+
+        for sql, steps in self.query_plans(captured.captured_queries):
+            scans = [step for step in steps if FULL_SCAN.match(step)]
+            self.assertFalse(scans, f'Full table scan {scans} in:\n{sql}')
+        return result
+
+    def url(self, path):
+        return f'/api/invitations/{self.invitation.pk}/{path}'
+
+    def test_invitation_endpoints(self):
+        self.assertNoFullScans(self.client.get, '/api/invitations/')
+        self.assertNoFullScans(self.client.get, self.url(''))
+        self.assertNoFullScans(self.client.get, self.url('analytics/'))
+        self.assertNoFullScans(self.client.get, self.url('share_link/'))
+        self.assertNoFullScans(self.client.get, '/api/dashboard/stats/')
+
+    def test_guest_endpoints(self):
+        self.assertNoFullScans(self.client.get, self.url('guests/'))
+        self.assertNoFullScans(self.client.get, self.url(f'guests/{self.guest.pk}/'))
+        self.assertNoFullScans(
+            self.client.post, self.url('guests/bulk_create/'),
+            {'guests': [{'name': 'New', 'email': 'new@example.com'}]}, format='json'
+        )
+        self.assertNoFullScans(
+            self.client.post, self.url('send_invitations/'), {'audience': 'pending'}, format='json'
+        )
+
+    def test_guest_pages_seek_the_keyset_index(self):
+        for name in ('Ann', 'Bob'):
+            Guest.objects.create(invitation=self.invitation, name=name, email=f'{name}@example.com')
+
+        url = self.url('guests/?page_size=1')
+        while url:
+            with CaptureQueriesContext(connection) as captured:
+                response = self.client.get(url)
+            url = response.data['next']
+            pages = [
+                (sql, steps) for sql, steps in self.query_plans(captured.captured_queries)
+                if sql.startswith('SELECT') and 'FROM "guests"' in sql and 'ORDER BY' in sql
+            ]
+            self.assertEqual(len(pages), 1)
+            sql, steps = pages[0]
+            self.assertTrue(
+                any('USING INDEX guests_invitation_created_idx' in step for step in steps), steps
+            )
+            self.assertFalse([step for step in steps if 'TEMP B-TREE' in step], sql)
+
+    def test_public_endpoints(self):
+        token = self.share_link.token
+        self.assertNoFullScans(self.client.get, f'/api/invite/{token}/')
+        self.assertNoFullScans(
+            self.client.post, f'/api/invite/{token}/rsvp/',
+            {'name': 'Guest', 'email': 'guest@example.com', 'rsvp_status': 'attending'},
+            format='json'
+        )
+
+    def test_outbox_claim(self):
+        self.assertNoFullScans(claim_batch, 100)
+
+    def test_expiry_sweep(self):
+        self.assertNoFullScans(sweep_expired)
+
+    def test_detects_full_scan(self):
+        with self.assertRaises(AssertionError):
+            self.assertNoFullScans(list, Guest.objects.filter(notes='unindexed'))
+
+
+class KeysetPaginationTests(TestCase):
+    """Guest lists page newest first through opaque cursors, in both directions."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='host@example.com', username='host', password='password')
+        cls.invitation = Invitation.objects.create(user=cls.user, title='Party', event_date=date(2030, 1, 1))
+        Guest.objects.bulk_create([
+            Guest(invitation=cls.invitation, name=f'Guest {i}', email=f'guest{i}@example.com')
+            for i in range(5)
+        ])
+        # Pairs of guests share a timestamp, so the pages have to break ties on the id
+        now = timezone.now()
+        for i, pk in enumerate(Guest.objects.order_by('email').values_list('pk', flat=True)):
+            Guest.objects.filter(pk=pk).update(created_at=now - timedelta(minutes=i // 2))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = f'/api/invitations/{self.invitation.pk}/guests/'
+
+    def test_pages(self):
+        expected = [
+            str(pk) for pk in
+            Guest.objects.order_by('-created_at', '-id').values_list('pk', flat=True)
+        ]
+
+        seen, url, pages = [], f'{self.url}?page_size=2', []
+        while url:
+            response = self.client.get(url)
+            pages.append(response.data)
+            seen += [guest['id'] for guest in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(seen, expected)
+
+        previous = self.client.get(pages[-1]['previous']).data
+        self.assertEqual(previous['results'], pages[-2]['results'])
+
+    def test_ordering_is_rejected(self):
+        response = self.client.get(self.url, {'ordering': 'name'})
+        self.assertEqual(response.status_code, 400)
+
+
+class DetailGuestPageTests(TestCase):
+    """Invitation detail embeds one page of guests and links to the rest."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='host@example.com', username='host', password='password', tier=User.Tier.PREMIUM
+        )
+        self.invitation = Invitation.objects.create(user=self.user, title='Party', event_date=date(2030, 1, 1))
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = f'/api/invitations/{self.invitation.pk}/'
+
+    def add_guests(self, count):
+        start = self.invitation.guests.count()
+        Guest.objects.bulk_create([
+            Guest(invitation=self.invitation, name=f'Guest {i}', email=f'guest{i}@example.com')
+            for i in range(start, start + count)
+        ])
+
+    def test_small_list(self):
+        self.add_guests(3)
+        data = self.client.get(self.url).data
+        self.assertEqual(len(data['guests']), 3)
+        self.assertIsNone(data['guests_next'])
+
+    def test_next_page(self):
+        self.add_guests(60)
+        data = self.client.get(self.url).data
+        self.assertEqual(len(data['guests']), 50)
+
+        rest = self.client.get(data['guests_next']).data
+        self.assertEqual(len(rest['results']), 10)
+        self.assertIsNone(rest['next'])
+        emails = [guest['email'] for guest in data['guests'] + rest['results']]
+        self.assertEqual(sorted(emails), sorted(self.invitation.guests.values_list('email', flat=True)))
+
+    def test_ignores_the_detail_query_params(self):
+        self.add_guests(3)
+        expected = self.client.get(self.url).data['guests']
+        response = self.client.get(self.url, {'cursor': 'bogus', 'page_size': 1, 'ordering': 'name'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['guests'], expected)
+
+    def test_query_count_stays_flat(self):
+        self.add_guests(3)
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(self.url)
+        self.add_guests(200)
+        with CaptureQueriesContext(connection) as large:
+            self.client.get(self.url)
+        self.assertEqual(len(large.captured_queries), len(small.captured_queries))
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    """Admin counts are exact unless the database has a row estimate for the table."""
+
+    @classmethod
+    def setUpTestData(cls):
+        Template.objects.bulk_create([
+            Template(id=f'tpl-{i}', name=f'Template {i}', category='birthday' if i % 2 else 'wedding')
+            for i in range(5)
+        ])
+
+    def count(self, queryset):
+        return EstimatedCountPaginator(queryset.order_by('id'), 2).count
+
+    @invite_settings(ADMIN_EXACT_COUNT_LIMIT=2)
+    def test_exact_without_an_estimate(self):
+        with unittest.mock.patch('inviteflow.paginators.estimated_row_count', return_value=None):
+            self.assertEqual(self.count(Template.objects.all()), 5)
+        paginator = EstimatedCountPaginator(Template.objects.order_by('id'), 2)
+        self.assertEqual(paginator.num_pages, 3)
+        self.assertEqual([template.id for template in paginator.page(3)], ['tpl-4'])
+
+    @invite_settings(ADMIN_EXACT_COUNT_LIMIT=2)
+    def test_estimate_only_for_unfiltered_tables(self):
+        with unittest.mock.patch('inviteflow.paginators.estimated_row_count', return_value=1000):
+            self.assertEqual(self.count(Template.objects.all()), 1000)
+            self.assertEqual(self.count(Template.objects.filter(category='wedding')), 3)
+
+    def test_exact_below_the_limit(self):
+        with unittest.mock.patch('inviteflow.paginators.estimated_row_count') as estimate:
+            self.assertEqual(self.count(Template.objects.all()), 5)
+        estimate.assert_not_called()
+
+
+class SparseFieldsTests(TestCase):
+    """?fields= and ?expand= shape both the response and the query behind it."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='host@example.com', username='host', password='password')
+        template = Template.objects.create(id='sparse', name='Sparse', category='birthday')
+        cls.invitation = Invitation.objects.create(
+            user=cls.user, template=template, title='Party', event_date=date(2030, 1, 1),
+            venue_address='1 Road',
+        )
+        Guest.objects.create(invitation=cls.invitation, name='Ann', email='ann@example.com')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, url, **params):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.data, [query['sql'] for query in captured]
+
+    def invitation_queries(self, queries):
+        return [sql for sql in queries if sql.startswith('SELECT') and 'FROM "invitations"' in sql]
+
+    def test_list_fields(self):
+        data, queries = self.get('/api/invitations/', fields='id,title,guest_count')
+        self.assertEqual(data['results'], [
+            {'id': str(self.invitation.pk), 'title': 'Party', 'guest_count': 1}
+        ])
+        (sql,) = self.invitation_queries(queries)
+        self.assertNotIn('venue_address', sql)
+        self.assertNotIn('JOIN', sql)
+
+    def test_list_expand(self):
+        data, queries = self.get('/api/invitations/', fields='id,template', expand='template')
+        (invitation,) = data['results']
+        self.assertEqual(set(invitation), {'id', 'template'})
+        self.assertEqual(invitation['template']['name'], 'Sparse')
+        (sql,) = self.invitation_queries(queries)
+        self.assertIn('JOIN "templates"', sql)
+
+        # Without ?expand the template stays a key
+        data, _ = self.get('/api/invitations/', fields='template')
+        self.assertEqual(data['results'], [{'template': 'sparse'}])
+
+    def test_detail_skips_the_guest_page(self):
+        url = f'/api/invitations/{self.invitation.pk}/'
+        data, queries = self.get(url, fields='id,attending_count,unknown')
+        self.assertEqual(data, {'id': str(self.invitation.pk), 'attending_count': 0})
+        self.assertFalse([sql for sql in queries if 'FROM "guests"' in sql])
+
+        data, _ = self.get(url, fields='guests')
+        self.assertEqual([guest['email'] for guest in data['guests']], ['ann@example.com'])
+
+    def test_guest_fields(self):
+        data, _ = self.get(f'/api/invitations/{self.invitation.pk}/guests/', fields='name,rsvp_status')
+        self.assertEqual(data['results'], [{'name': 'Ann', 'rsvp_status': 'pending'}])
+
+
+class ConcurrentRSVPTests(TransactionTestCase):
+    """Parallel RSVPs against one share link must never fail or skew the counters."""
+
+    workers = 16
+    submissions = 300
+
+    def setUp(self):
+        user = User.objects.create_user(
+            email='host@example.com', username='host', password='password', tier=User.Tier.PREMIUM
+        )
+        self.invitation = Invitation.objects.create(
+            user=user, title='Party', event_date=date(2030, 1, 1), status=Invitation.Status.ACTIVE
+        )
+        self.token = ShareLink.objects.create(invitation=self.invitation).token
+
+    def rsvp(self, index):
+        statuses = [choice for choice, _ in Guest.RSVPStatus.choices]
+        try:
+            response = APIClient().post(f'/api/invite/{self.token}/rsvp/', {
+                # Few distinct emails, so most submissions collide on the same guest
+                'name': f'Guest {index}',
+                'email': f'guest{index % 20}@example.com',
+                'rsvp_status': statuses[index % len(statuses)],
+            }, format='json')
+            return response.status_code
+        finally:
+            connections.close_all()
+
+    def test_parallel_rsvps(self):
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            codes = list(pool.map(self.rsvp, range(self.submissions)))
+
+        self.assertEqual(codes, [200] * self.submissions)
+        self.assertEqual(Guest.objects.filter(invitation=self.invitation).count(), 20)
+        self.assertFalse(find_counter_drift().exists())
+
+    def test_upsert_locks_only_the_guest(self):
+        data = {'name': 'Ann', 'email': 'ann@example.com', 'plus_one': False, 'plus_one_count': 0}
+        for rsvp_status in ('attending', 'not_attending', 'not_attending'):
+            with CaptureQueriesContext(connection) as captured:
+                guest = upsert_rsvp(self.invitation.pk, dict(data, rsvp_status=rsvp_status))
+            self.assertEqual(guest.rsvp_status, rsvp_status)
+            # The invitation row is only written by the counter UPDATE, if the status moved
+            invitation_writes = [
+                query for query in captured if query['sql'].startswith('UPDATE "invitations"')
+            ]
+            self.assertLessEqual(len(invitation_writes), 1)
+
+        self.invitation.refresh_from_db()
+        self.assertEqual((self.invitation.guests_total, self.invitation.guests_not_attending), (1, 1))
+        self.assertFalse(find_counter_drift().exists())
+
+
+class QuotaTests(TestCase):
+    """Creates and clones stop at the tier limits, read from the stored counters."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='host@example.com', username='host', password='password')
+        Template.objects.create(id='quota', name='Quota', category='birthday')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create(self):
+        return self.client.post('/api/invitations/', {
+            'title': 'Party', 'template_id': 'quota', 'event_date': '2030-01-01'
+        }, format='json')
+
+    def test_invitation_limit(self):
+        with invite_settings(FREE_TIER_MAX_INVITATIONS=2):
+            self.assertEqual([self.create().status_code for _ in range(2)], [201, 201])
+            response = self.create()
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(
+                response.data[api_settings.NON_FIELD_ERRORS_KEY], [INVITATION_LIMIT_MESSAGE]
+            )
+            self.assertEqual(self.client.get('/api/auth/me/tier/').data['invitations_remaining'], 0)
+
+            # Deleting an invitation frees its slot
+            Invitation.objects.filter(user=self.user).first().delete()
+            self.assertEqual(self.create().status_code, 201)
+        self.assertEqual(get_user_stats(self.user.pk)['total_invitations'], 2)
+
+    def test_clone_reserves_every_copy(self):
+        self.create(), self.create()
+        ids = [str(pk) for pk in Invitation.objects.filter(user=self.user).values_list('pk', flat=True)]
+        with invite_settings(FREE_TIER_MAX_INVITATIONS=3):
+            response = self.client.post('/api/invitations/clone/', {'ids': ids}, format='json')
+            self.assertEqual(response.status_code, 400)
+            response = self.client.post(f'/api/invitations/{ids[0]}/clone/', {}, format='json')
+            self.assertEqual(response.status_code, 201)
+        self.assertEqual(Invitation.objects.filter(user=self.user).count(), 3)
+
+    def test_guest_limit(self):
+        self.create()
+        invitation_id = Invitation.objects.get(user=self.user).pk
+        url = f'/api/invitations/{invitation_id}/guests/'
+        with invite_settings(FREE_TIER_MAX_GUESTS_PER_INVITATION=2):
+            codes = [
+                self.client.post(
+                    url, {'name': name, 'email': f'{name}@example.com'}, format='json'
+                ).status_code
+                for name in ('ann', 'bob', 'cat')
+            ]
+            self.assertEqual(codes, [201, 201, 400])
+            self.assertEqual(reserve_guests(invitation_id, User.Tier.FREE), 0)
+            self.assertIsNone(reserve_guests(invitation_id, User.Tier.PREMIUM))
+
+
+class ConcurrentQuotaTests(TransactionTestCase):
+    """Parallel creates queue on the usage row and never overshoot the limit."""
+
+    workers = 8
+    attempts = 16
+    limit = 5
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='host@example.com', username='host', password='password')
+        Template.objects.create(id='quota', name='Quota', category='birthday')
+
+    def create(self, index):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        try:
+            return client.post('/api/invitations/', {
+                'title': f'Party {index}', 'template_id': 'quota', 'event_date': '2030-01-01'
+            }, format='json').status_code
+        finally:
+            connections.close_all()
+
+    def test_parallel_creates(self):
+        with invite_settings(FREE_TIER_MAX_INVITATIONS=self.limit):
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                codes = list(pool.map(self.create, range(self.attempts)))
+
+        self.assertEqual(sorted(codes), [201] * self.limit + [400] * (self.attempts - self.limit))
+        self.assertEqual(Invitation.objects.filter(user=self.user).count(), self.limit)
+        self.assertEqual(rebuild_user_stats(fix=False), [])
+
+
+class CloneTests(TestCase):
+    """Clones copy their sources' guest lists with one INSERT ... SELECT."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='host@example.com', username='host', password='password', tier=User.Tier.PREMIUM
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.sources = [
+            Invitation.objects.create(
+                user=self.user, title=title, event_date=date(2030, 1, 1),
+                status=Invitation.Status.ACTIVE,
+            )
+            for title in ('Party', 'Dinner')
+        ]
+        party, dinner = self.sources
+        Guest.objects.create(
+            invitation=party, name='Ann', email='ann@example.com', phone='+1 555',
+            rsvp_status=Guest.RSVPStatus.ATTENDING, rsvp_date=timezone.now(),
+            plus_one=True, plus_one_count=2, notes='Vegetarian',
+            invitation_sent=True, invitation_sent_at=timezone.now(),
+        )
+        Guest.objects.create(
+            invitation=party, name='Bob', email='bob@example.com',
+            rsvp_status=Guest.RSVPStatus.NOT_ATTENDING,
+        )
+        Guest.objects.create(invitation=dinner, name='Cat', email='cat@example.com')
+        # Materialize the host's stats so the clone has to move them
+        get_user_stats(self.user.pk)
+
+    def guests(self, invitation_id):
+        return list(
+            Guest.objects.filter(invitation_id=invitation_id).order_by('email').values_list(
+                'name', 'email', 'phone', 'rsvp_status', 'rsvp_date', 'plus_one', 'plus_one_count',
+                'notes', 'invitation_sent', 'invitation_sent_at',
+            )
+        )
+
+    def test_clone_many_with_guests(self):
+        ids = [str(source.pk) for source in reversed(self.sources)]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                '/api/invitations/clone/', {'ids': ids, 'include_guests': True}, format='json'
+            )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([row['title'] for row in response.data], ['Dinner (Copy)', 'Party (Copy)'])
+        guest_inserts = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('INSERT INTO "guests"')
+        ]
+        self.assertEqual(len(guest_inserts), 1)
+
+        dinner_copy, party_copy = (uuid.UUID(row['id']) for row in response.data)
+        self.assertEqual(self.guests(party_copy), [
+            ('Ann', 'ann@example.com', '+1 555', 'pending', None, False, 0, '', False, None),
+            ('Bob', 'bob@example.com', '', 'pending', None, False, 0, '', False, None),
+        ])
+        self.assertEqual(self.guests(dinner_copy), [
+            ('Cat', 'cat@example.com', '', 'pending', None, False, 0, '', False, None),
+        ])
+        # The sources keep their guests and RSVPs
+        party = self.sources[0]
+        self.assertEqual(
+            [guest[3] for guest in self.guests(party.pk)], ['attending', 'not_attending']
+        )
+
+        copies = Invitation.objects.in_bulk([party_copy, dinner_copy])
+        self.assertEqual(
+            (copies[party_copy].guests_total, copies[party_copy].guests_pending), (2, 2)
+        )
+        self.assertEqual(copies[party_copy].status, Invitation.Status.DRAFT)
+        self.assertEqual(
+            (copies[dinner_copy].guests_total, copies[dinner_copy].guests_pending), (1, 1)
+        )
+        self.assertFalse(find_counter_drift().exists())
+        self.assertEqual(rebuild_user_stats(fix=False), [])
+        stats = get_user_stats(self.user.pk)
+        self.assertEqual((stats['total_invitations'], stats['total_guests']), (4, 6))
+
+    def test_clone_without_guests(self):
+        party = self.sources[0]
+        response = self.client.post(f'/api/invitations/{party.pk}/clone/', {}, format='json')
+        self.assertEqual(response.status_code, 201)
+
+        clone = Invitation.objects.get(pk=response.data['id'])
+        self.assertEqual((clone.title, clone.guests_total), ('Party (Copy)', 0))
+        self.assertFalse(clone.guests.exists())
+        self.assertEqual(Guest.objects.filter(invitation=party).count(), 2)
+        self.assertEqual(rebuild_user_stats(fix=False), [])
+
+
+class RSVPLogTests(TestCase):
+    """Public RSVP reads and the queued RSVP path."""
+
+    def setUp(self):
+        user = User.objects.create_user(
+            email='host@example.com', username='host', password='password', tier=User.Tier.PREMIUM
+        )
+        self.invitation = Invitation.objects.create(
+            user=user, title='Party', event_date=date(2030, 1, 1), status=Invitation.Status.ACTIVE
+        )
+        self.token = ShareLink.objects.create(invitation=self.invitation).token
+        self.url = f'/api/invite/{self.token}/rsvp/'
+
+    def test_public_lookup_hides_contact_details(self):
+        Guest.objects.create(
+            invitation=self.invitation, name='Ann', email='ann@example.com', phone='+1 555',
+            notes='Seat near the exit', plus_one_count=1,
+        )
+        response = APIClient().get(self.url, {'email': 'ann@example.com'})
+        self.assertEqual(
+            response.data['guest'], {'name': 'Ann', 'rsvp_status': 'pending', 'plus_one_count': 1}
+        )
+
+        data = {'name': 'Ann', 'email': 'ann@example.com', 'rsvp_status': 'attending'}
+        with invite_settings(RSVP_INGESTION='queued'):
+            response = APIClient().post(self.url, data, format='json')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(sorted(response.data['guest']), ['name', 'plus_one_count', 'rsvp_status'])
+
+        # The direct path keeps returning the full guest, as it always has
+        response = APIClient().post(self.url, data, format='json')
+        guest = Guest.objects.get(invitation=self.invitation, email='ann@example.com')
+        self.assertEqual(response.data['guest'], GuestSerializer(guest).data)
+
+    def test_apply_survives_a_concurrent_insert(self):
+        data = {'name': 'Ann', 'email': 'ann@example.com', 'plus_one': False, 'plus_one_count': 0}
+        queue_rsvp(self.invitation.pk, dict(data, rsvp_status='attending'))
+        bulk_create = Guest.objects.bulk_create
+
+        def insert_first(objs, **kwargs):
+            # A direct RSVP inserts the guest between the applier's read and its INSERT
+            if objs:
+                upsert_rsvp(self.invitation.pk, dict(data, rsvp_status='not_attending'))
+            return bulk_create(objs, **kwargs)
+
+        with unittest.mock.patch.object(Guest.objects, 'bulk_create', side_effect=insert_first):
+            self.assertEqual(apply_rsvp_log(), 1)
+
+        # The direct RSVP is newer than the queued one, so it stays
+        guest = Guest.objects.get(invitation=self.invitation)
+        self.assertEqual(guest.rsvp_status, 'not_attending')
+        self.assertFalse(find_counter_drift().exists())
+
+    def test_command_survives_a_failed_batch(self):
+        stderr = StringIO()
+        with unittest.mock.patch(
+            'invitations.management.commands.apply_rsvps.apply_rsvp_log',
+            side_effect=DatabaseError('database is locked'),
+        ):
+            call_command('apply_rsvps', once=True, stdout=StringIO(), stderr=stderr)
+        self.assertIn('database is locked', stderr.getvalue())
+
+
+class CounterTests(TestCase):
+    """Every guest and invitation write keeps the counters and dashboard stats exact."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='host@example.com', username='host', password='password', tier=User.Tier.PREMIUM
+        )
+        cls.birthday = Template.objects.create(id='birthday', name='Birthday', category='birthday')
+        cls.wedding = Template.objects.create(id='wedding', name='Wedding', category='wedding')
+        cls.invitation = Invitation.objects.create(
+            user=cls.user, template=cls.birthday, title='Party', event_date=date(2030, 1, 1),
+            status=Invitation.Status.ACTIVE,
+        )
+        cls.other = Invitation.objects.create(
+            user=cls.user, template=cls.wedding, title='Wedding', event_date=date(2030, 1, 1)
+        )
+
+    def setUp(self):
+        # Materialize the stats row, so the writes below have to move it
+        get_user_stats(self.user.pk)
+
+    def add_guest(self, invitation=None, **kwargs):
+        invitation = invitation or self.invitation
+        return Guest.objects.create(
+            invitation=invitation, name='Guest', email=f'{uuid.uuid4().hex}@example.com', **kwargs
+        )
+
+    def assertCounters(self, invitation, total, attending=0, pending=0, not_attending=0):
+        invitation.refresh_from_db()
+        self.assertEqual(
+            [getattr(invitation, field) for field in Invitation.COUNTER_FIELDS],
+            [total, attending, pending, not_attending],
+        )
+        self.assertFalse(find_counter_drift().exists())
+        self.assertEqual(rebuild_user_stats(fix=False), [])
+
+    def test_guest_writes(self):
+        ann = self.add_guest()
+        bob = self.add_guest(rsvp_status=Guest.RSVPStatus.ATTENDING)
+        cat = self.add_guest()
+        self.assertCounters(self.invitation, 3, attending=1, pending=2)
+
+        ann.update_rsvp(Guest.RSVPStatus.NOT_ATTENDING)
+        self.assertCounters(self.invitation, 3, attending=1, pending=1, not_attending=1)
+
+        bob.invitation = self.other
+        bob.save()
+        self.assertCounters(self.invitation, 2, pending=1, not_attending=1)
+        self.assertCounters(self.other, 1, attending=1)
+
+        cat.notes = 'Untracked fields do not touch the counters'
+        cat.save(update_fields=['notes'])
+        cat.delete()
+        self.assertCounters(self.invitation, 1, not_attending=1)
+
+        self.add_guest()
+        Guest.objects.filter(invitation__user=self.user).delete()
+        self.assertCounters(self.invitation, 0)
+        self.assertCounters(self.other, 0)
+
+    def test_stale_guest_instances(self):
+        guest = self.add_guest()
+        first, second = Guest.objects.get(pk=guest.pk), Guest.objects.get(pk=guest.pk)
+        first.rsvp_status = second.rsvp_status = Guest.RSVPStatus.ATTENDING
+        first.save()
+        second.save()
+        self.assertCounters(self.invitation, 1, attending=1)
+
+        second.delete()
+        first.delete()
+        self.assertCounters(self.invitation, 0)
+
+    def test_stale_invitation_save_keeps_counters(self):
+        stale = Invitation.objects.get(pk=self.invitation.pk)
+        self.add_guest()
+        stale.title = 'Renamed'
+        stale.save()
+        self.assertCounters(self.invitation, 1, pending=1)
+
+        deferred = Invitation.objects.only('title').get(pk=self.invitation.pk)
+        deferred.title = 'Deferred'
+        deferred.save()
+        self.invitation.refresh_from_db()
+        self.assertEqual(self.invitation.title, 'Deferred')
+        self.assertCounters(self.invitation, 1, pending=1)
+
+    def test_invitation_writes(self):
+        self.invitation.status = Invitation.Status.DRAFT
+        self.invitation.template = self.wedding
+        self.invitation.save()
+        stats = get_user_stats(self.user.pk)
+        self.assertEqual(stats['active_invitations'], 0)
+        self.assertEqual(stats['invitations_by_template'], {'wedding': 2})
+        self.assertEqual(rebuild_user_stats(fix=False), [])
+
+        # Saving a row deleted behind the instance's back inserts it again
+        Invitation.objects.filter(pk=self.other.pk).delete()
+        self.other.save()
+        self.assertTrue(Invitation.objects.filter(pk=self.other.pk).exists())
+        self.assertEqual(rebuild_user_stats(fix=False), [])
+
+    def test_delete_invitation_with_guests(self):
+        self.add_guest(self.other)
+        Guest.objects.bulk_create([
+            Guest(invitation=self.invitation, name='Guest', email=f'guest{i}@example.com')
+            for i in range(200)
+        ])
+        rebuild_counters()
+        rebuild_user_stats()
+
+        # The guests go with a few bulk statements, not per-guest counter updates
+        with CaptureQueriesContext(connection) as captured:
+            self.invitation.delete()
+        self.assertLess(len(captured), 20, [query['sql'] for query in captured])
+
+        stats = get_user_stats(self.user.pk)
+        self.assertEqual((stats['total_invitations'], stats['total_guests']), (1, 1))
+        self.assertEqual(rebuild_user_stats(fix=False), [])
+
+        self.user.delete()
+        self.assertFalse(UserStats.objects.exists())
+
+    def test_rebuild_command(self):
+        self.add_guest()
+        Invitation.objects.filter(pk=self.invitation.pk).update(guests_total=5, guests_pending=0)
+        UserStats.objects.filter(pk=self.user.pk).update(total_guests=7)
+
+        with self.assertRaises(CommandError):
+            call_command('rebuild_counters', '--check', stdout=StringIO())
+
+        call_command('rebuild_counters', stdout=StringIO())
+        self.assertCounters(self.invitation, 1, pending=1)
+        self.assertEqual(get_user_stats(self.user.pk)['total_guests'], 1)
+        call_command('rebuild_counters', '--check', stdout=StringIO())
+
+
+class ViewCountBufferTests(TestCase):
+    """Share link views are buffered in-process and written back in batched increments."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='host@example.com', username='host', password='password', tier=User.Tier.PREMIUM
+        )
+        cls.invitation = Invitation.objects.create(
+            user=cls.user, title='Party', event_date=date(2030, 1, 1), status=Invitation.Status.ACTIVE
+        )
+        cls.first = ShareLink.objects.create(invitation=cls.invitation)
+        cls.second = ShareLink.objects.create(invitation=cls.invitation)
+
+    def view_counts(self):
+        return dict(ShareLink.objects.values_list('token', 'view_count'))
+
+    def test_flush_writes_buffered_views(self):
+        buffer = ViewCountBuffer()
+        with self.settings(INVITEFLOW_SETTINGS={'VIEW_COUNT_FLUSH_INTERVAL': 0}):
+            with self.assertNumQueries(0):
+                buffer.increment(self.first.token)
+                buffer.increment(self.first.token)
+                buffer.increment(self.second.token, 2)
+        self.assertEqual(buffer.pending(self.first.token), 2)
+
+        # One UPDATE per distinct increment, whatever the number of tokens
+        with CaptureQueriesContext(connection) as captured:
+            self.assertEqual(buffer.flush(), 4)
+        updates = [query for query in captured if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(self.view_counts(), {self.first.token: 2, self.second.token: 2})
+        self.assertEqual(buffer.pending(self.first.token), 0)
+        self.assertEqual(buffer.flush(), 0)
+
+    def test_threshold_flushes_inline(self):
+        buffer = ViewCountBuffer()
+        with self.settings(INVITEFLOW_SETTINGS={
+            'VIEW_COUNT_FLUSH_INTERVAL': 0, 'VIEW_COUNT_FLUSH_THRESHOLD': 3,
+        }):
+            buffer.increment(self.first.token)
+            buffer.increment(self.first.token)
+            self.assertEqual(self.view_counts()[self.first.token], 0)
+            buffer.increment(self.first.token)
+        self.assertEqual(self.view_counts()[self.first.token], 3)
+
+    def test_failed_flush_keeps_views(self):
+        buffer = ViewCountBuffer()
+        with self.settings(INVITEFLOW_SETTINGS={'VIEW_COUNT_FLUSH_INTERVAL': 0}):
+            buffer.increment(self.first.token, 4)
+        with unittest.mock.patch.object(
+            ShareLink.objects, 'filter', side_effect=RuntimeError('database is down')
+        ):
+            with self.assertRaises(RuntimeError):
+                buffer.flush()
+        self.assertEqual(buffer.pending(self.first.token), 4)
+        self.assertEqual(buffer.flush(), 4)
+        self.assertEqual(self.view_counts()[self.first.token], 4)
+
+    def test_public_views_reach_analytics(self):
+        self.addCleanup(view_count_buffer.flush)
+        for _ in range(3):
+            self.assertEqual(APIClient().get(f'/api/invite/{self.first.token}/').status_code, 200)
+
+        client = APIClient()
+        client.force_authenticate(self.user)
+        url = f'/api/invitations/{self.invitation.pk}/analytics/'
+        self.assertEqual(client.get(url).data['share_link_views'], 3)
+        view_count_buffer.flush()
+        self.assertEqual(self.view_counts()[self.first.token], 3)
+        self.assertEqual(client.get(url).data['share_link_views'], 3)
+
+
+class PublicInvitationCacheTests(TestCase):
+    """Cached public payloads follow invitation and catalog edits."""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(email='host@example.com', username='host', password='password')
+        cls.template = Template.objects.create(id='party', name='Party', category='birthday')
+        cls.invitation = Invitation.objects.create(
+            user=user, template=cls.template, title='Party', event_date=date(2030, 1, 1),
+            status=Invitation.Status.ACTIVE,
+        )
+        cls.token = ShareLink.objects.create(invitation=cls.invitation).token
+        # Backdate the rows, so a Last-Modified taken from them is a day old
+        yesterday = timezone.now() - timedelta(days=1)
+        Invitation.objects.filter(pk=cls.invitation.pk).update(updated_at=yesterday)
+        ShareLink.objects.filter(token=cls.token).update(created_at=yesterday)
+
+    def setUp(self):
+        self.addCleanup(view_count_buffer.flush)
+        self.url = f'/api/invite/{self.token}/'
+
+    def test_edit_drops_entry_again_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.invitation.title = 'Renamed'
+            self.invitation.save()
+            # Another connection caching the row before the commit
+            get_public_entry(self.token)
+        self.assertIsNone(cache.get(_public_key(self.token)))
+        self.assertEqual(Client().get(self.url).json()['title'], 'Renamed')
+
+    def test_catalog_edit_moves_last_modified(self):
+        # As if the catalog last changed a day ago too
+        cache.set(PUBLIC_VERSION_KEY, clock.time_ns() - 86400 * 10**9, timeout=None)
+        last_modified = Client().get(self.url)['Last-Modified']
+        self.assertLess(parse_http_date(last_modified), clock.time() - 3600)
+        headers = {'If-Modified-Since': last_modified}
+        self.assertEqual(Client().get(self.url, headers=headers).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.template.name = 'Birthday party'
+            self.template.save()
+        # Same invitation row, new payload: the old date must not validate it
+        response = Client().get(self.url, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['template']['name'], 'Birthday party')
+
+
+class GuestImportTests(TestCase):
+    """Bulk guest imports validate set-wise, respect capacity and move the counters once."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='host@example.com', username='host', password='password')
+        cls.invitation = Invitation.objects.create(
+            user=cls.user, title='Party', event_date=date(2030, 1, 1), status=Invitation.Status.ACTIVE
+        )
+        Guest.objects.create(invitation=cls.invitation, name='Ann', email='ann@example.com')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = f'/api/invitations/{self.invitation.pk}/guests/bulk_create/'
+        get_user_stats(self.user.pk)
+
+    def post(self, *emails):
+        guests = [{'name': email.split('@')[0], 'email': email} for email in emails]
+        return self.client.post(self.url, {'guests': guests}, format='json')
+
+    def assertGuests(self, total):
+        self.invitation.refresh_from_db()
+        self.assertEqual((self.invitation.guests_total, self.invitation.guests_pending), (total, total))
+        self.assertEqual(Guest.objects.filter(invitation=self.invitation).count(), total)
+        self.assertFalse(find_counter_drift().exists())
+        self.assertEqual(rebuild_user_stats(fix=False), [])
+
+    def test_import(self):
+        response = self.post(
+            'bob@example.com', 'ann@example.com', 'cat@example.com', 'bob@example.com', 'not-an-email'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            [guest['email'] for guest in response.data['created']], ['bob@example.com', 'cat@example.com']
+        )
+        self.assertEqual(
+            [error['email'] for error in response.data['errors']],
+            ['ann@example.com', 'bob@example.com', 'not-an-email'],
+        )
+        self.assertGuests(3)
+
+        self.assertEqual(self.post('ann@example.com').status_code, 400)
+        self.assertGuests(3)
+
+    def test_capacity(self):
+        with invite_settings(FREE_TIER_MAX_GUESTS_PER_INVITATION=3):
+            response = self.post('bob@example.com', 'cat@example.com', 'dan@example.com')
+        self.assertEqual(len(response.data['created']), 2)
+        self.assertEqual(response.data['errors'], [
+            {'email': 'dan@example.com', 'error': 'Maximum guest limit reached.'}
+        ])
+        self.assertGuests(3)
+
+    def test_large_import_runs_as_job(self):
+        with invite_settings(GUEST_IMPORT_INLINE_LIMIT=2):
+            response = self.post('bob@example.com', 'cat@example.com', 'ann@example.com')
+        self.assertEqual(response.status_code, 202)
+        self.assertGuests(1)
+
+        self.assertEqual(run_due_jobs(), (1, 0))
+        self.assertGuests(3)
+        job = self.client.get(f'/api/jobs/{response.data["job_id"]}/').data
+        self.assertEqual(job['status'], Job.Status.SUCCEEDED)
+        self.assertEqual(job['result']['created'], 2)
+        self.assertEqual(job['result']['errors'][0]['email'], 'ann@example.com')
+
+
+class GuestExportTests(TestCase):
+    """Guest exports stream every matching guest in the requested format."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='host@example.com', username='host', password='password')
+        cls.invitation = Invitation.objects.create(
+            user=cls.user, title='Party', event_date=date(2030, 1, 1), status=Invitation.Status.ACTIVE
+        )
+        Guest.objects.create(
+            invitation=cls.invitation, name='Ann, "the host\'s" aunt', email='ann@example.com',
+            notes='Line one\nline two', rsvp_status=Guest.RSVPStatus.ATTENDING,
+            rsvp_date=timezone.now(),
+        )
+        for name in ('Bob', 'Cat'):
+            Guest.objects.create(invitation=cls.invitation, name=name, email=f'{name.lower()}@example.com')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = f'/api/invitations/{self.invitation.pk}/export/'
+
+    def export(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_csv(self):
+        # A chunk per row, so the export has to read across chunk boundaries
+        with invite_settings(GUEST_EXPORT_CHUNK_SIZE=1):
+            response, body = self.export()
+
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(
+            response['Content-Disposition'], f'attachment; filename="guests-{self.invitation.pk}.csv"'
+        )
+        rows = list(csv.DictReader(StringIO(body)))
+        self.assertEqual(sorted(row['email'] for row in rows), [
+            'ann@example.com', 'bob@example.com', 'cat@example.com'
+        ])
+        ann = next(row for row in rows if row['email'] == 'ann@example.com')
+        guest = Guest.objects.get(email='ann@example.com')
+        self.assertEqual(ann['name'], guest.name)
+        self.assertEqual(ann['notes'], guest.notes)
+        self.assertEqual(ann['rsvp_date'], guest.rsvp_date.isoformat())
+
+    def test_ndjson_with_filters(self):
+        response, body = self.export(export_format='ndjson', rsvp_status='pending')
+
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(sorted(row['email'] for row in rows), ['bob@example.com', 'cat@example.com'])
+        self.assertEqual(list(rows[0]), list(GUEST_EXPORT_FIELDS))
+
+    def test_rejected_requests(self):
+        response = self.client.get(self.url, {'export_format': 'xlsx'})
+        self.assertEqual(response.status_code, 400)
+
+        other = User.objects.create_user(email='other@example.com', username='other', password='password')
+        self.client.force_authenticate(other)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+class FailingEmailBackend(EmailBackend):
+    """Email backend whose SMTP server refuses every message."""
+
+    def send_messages(self, messages):
+        raise smtplib.SMTPException('Mailbox unavailable')
+
+
+class OutboxTests(TestCase):
+    """Queued invitation emails are delivered once, retried on failure and never duplicated."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='host@example.com', username='host', password='password')
+        cls.invitation = Invitation.objects.create(
+            user=cls.user, title='Party', event_date=date(2030, 1, 1), status=Invitation.Status.ACTIVE
+        )
+        cls.guest = Guest.objects.create(invitation=cls.invitation, name='Ann', email='ann@example.com')
+
+    def queue(self):
+        return queue_invitation_email(self.guest, self.invitation, 'https://example.com/invite/x')
+
+    def test_send_invitation(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        url = f'/api/invitations/{self.invitation.pk}/guests/{self.guest.pk}/send_invitation/'
+        first = client.post(url)
+        self.assertEqual(first.status_code, 202)
+        # Still waiting for delivery: the same email, not a second one
+        second = client.post(url)
+        self.assertEqual(second.status_code, 202)
+        email = OutboundEmail.objects.get()
+        self.assertEqual((first.data['email_id'], second.data['email_id']), (email.pk, email.pk))
+        self.assertNotIn('job_id', first.data)
+
+        self.assertEqual(deliver_outbox(), (1, 0))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['ann@example.com'])
+        self.assertIn('/invite/', mail.outbox[0].body)
+        self.guest.refresh_from_db()
+        self.assertTrue(self.guest.invitation_sent)
+        self.assertIsNotNone(self.guest.invitation_sent_at)
+        self.assertEqual(client.get(f'/api/emails/{email.pk}/').data['status'], OutboundEmail.Status.SENT)
+
+        # Once delivered, sending again queues a new email
+        client.post(url)
+        self.assertEqual(OutboundEmail.objects.filter(status=OutboundEmail.Status.PENDING).count(), 1)
+
+    def test_failed_delivery_is_retried(self):
+        email = self.queue()
+        self.assertEqual(deliver_outbox(connection=FailingEmailBackend()), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), (OutboundEmail.Status.PENDING, 1))
+        self.assertIn('Mailbox unavailable', email.last_error)
+        self.assertGreater(email.next_attempt_at, timezone.now())
+
+        # Not due before its backoff is over
+        self.assertEqual(deliver_outbox(), (0, 0))
+        OutboundEmail.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(deliver_outbox(), (1, 0))
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_gives_up_after_max_attempts(self):
+        email = self.queue()
+        with invite_settings(EMAIL_MAX_ATTEMPTS=1):
+            self.assertEqual(deliver_outbox(connection=FailingEmailBackend()), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboundEmail.Status.FAILED)
+        self.assertEqual(claim_batch(10), [])
+
+    def test_stale_claims_count_as_attempts(self):
+        retried, exhausted = self.queue(), OutboundEmail.objects.create(
+            to_email='bob@example.com', from_email='host@example.com', subject='Hi', body='Hi',
+        )
+        OutboundEmail.objects.update(
+            status=OutboundEmail.Status.SENDING, claimed_by='dead-worker',
+            claimed_at=timezone.now() - timedelta(hours=1),
+        )
+        OutboundEmail.objects.filter(pk=exhausted.pk).update(attempts=4)
+
+        with invite_settings(EMAIL_MAX_ATTEMPTS=5):
+            self.assertEqual([email.pk for email in claim_batch(10)], [retried.pk])
+        retried.refresh_from_db()
+        exhausted.refresh_from_db()
+        self.assertEqual((retried.status, retried.attempts), (OutboundEmail.Status.SENDING, 1))
+        self.assertEqual((exhausted.status, exhausted.attempts), (OutboundEmail.Status.FAILED, 5))
+
+
+class BulkSendTests(TestCase):
+    """Bulk sends queue one email per selected guest, inline or from a job."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='host@example.com', username='host', password='password')
+        cls.invitation = Invitation.objects.create(
+            user=cls.user, title='Party', event_date=date(2030, 1, 1), status=Invitation.Status.ACTIVE
+        )
+        cls.unsent = Guest.objects.create(invitation=cls.invitation, name='Ann', email='ann@example.com')
+        cls.sent = Guest.objects.create(
+            invitation=cls.invitation, name='Bob', email='bob@example.com', invitation_sent=True
+        )
+        cls.attending = Guest.objects.create(
+            invitation=cls.invitation, name='Cat', email='cat@example.com',
+            rsvp_status=Guest.RSVPStatus.ATTENDING,
+        )
+        other = Invitation.objects.create(user=cls.user, title='Other', event_date=date(2030, 1, 1))
+        cls.stranger = Guest.objects.create(invitation=other, name='Dan', email='dan@example.com')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = f'/api/invitations/{self.invitation.pk}/send_invitations/'
+
+    def send(self, **data):
+        response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, 202, response.data)
+        return response
+
+    def queued_to(self):
+        return sorted(OutboundEmail.objects.values_list('to_email', flat=True))
+
+    def test_audiences(self):
+        response = self.send()
+        self.assertEqual(response.data['queued'], 2)
+        self.assertEqual(self.queued_to(), ['ann@example.com', 'cat@example.com'])
+        self.assertEqual(
+            sorted(response.data['email_ids']), sorted(OutboundEmail.objects.values_list('pk', flat=True))
+        )
+
+        # Guests with an email still waiting in the outbox are skipped
+        self.assertEqual(self.send(audience='pending').data['queued'], 1)
+        self.assertEqual(self.queued_to(), ['ann@example.com', 'bob@example.com', 'cat@example.com'])
+
+    def test_guest_ids(self):
+        response = self.send(guest_ids=[str(self.sent.pk), str(self.stranger.pk)])
+        self.assertEqual(response.data['queued'], 1)
+        self.assertEqual(self.queued_to(), ['bob@example.com'])
+
+        response = self.client.post(
+            self.url, {'audience': 'pending', 'guest_ids': [str(self.sent.pk)]}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_large_send_runs_as_job(self):
+        with invite_settings(BULK_SEND_INLINE_LIMIT=2):
+            response = self.send(audience='pending')
+        self.assertEqual(OutboundEmail.objects.count(), 0)
+
+        self.assertEqual(run_due_jobs(), (1, 0))
+        self.assertEqual(self.queued_to(), ['ann@example.com', 'bob@example.com'])
+        job = Job.objects.get(pk=response.data['job_id'])
+        self.assertEqual(job.result['queued'], 2)
+
+        self.assertEqual(deliver_outbox(), (2, 0))
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(Guest.objects.filter(invitation_sent=True).count(), 2)
+
+    def test_new_share_link_reaches_invited_guests(self):
+        url = f'/api/invitations/{self.invitation.pk}/share_link/'
+        response = self.client.post(url, {'notify_guests': True}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(OutboundEmail.objects.count(), 0)
+
+        self.assertEqual(run_due_jobs(), (1, 0))
+        self.assertEqual(Job.objects.get(pk=response.data['job_id']).result['queued'], 1)
+        email = OutboundEmail.objects.get()
+        self.assertEqual(email.to_email, 'bob@example.com')
+        self.assertIn(f"/invite/{response.data['token']}", email.body)
+
+        # Without notify_guests only the link is created
+        response = self.client.post(url, {}, format='json')
+        self.assertNotIn('job_id', response.data)
+        self.assertFalse(Job.objects.filter(status=Job.Status.QUEUED).exists())
+
+
+@task('tests.echo')
+def echo_task(value, fail=False, delay=0):
+    clock.sleep(delay)
+    if fail:
+        raise RuntimeError(f'Could not echo {value}')
+    return value
+
+
+class JobTests(TestCase):
+    """Jobs are claimed once, retried with backoff and reported to their owner only."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='host@example.com', username='host', password='password')
+
+    def test_claim(self):
+        jobs = [enqueue('tests.echo', {'value': i}, user=self.user) for i in range(3)]
+        self.assertEqual(len(claim_jobs(2)), 2)
+        self.assertEqual([job.pk for job in claim_jobs(5)], [jobs[2].pk])
+        self.assertEqual(claim_jobs(5), [])
+
+        # A claim that is no longer refreshed goes stale and is taken over
+        with invite_settings(JOB_CLAIM_TIMEOUT=60):
+            Job.objects.filter(pk=jobs[0].pk).update(claimed_at=timezone.now() - timedelta(minutes=5))
+            (reclaimed,) = claim_jobs(5)
+        self.assertEqual((reclaimed.pk, reclaimed.attempts), (jobs[0].pk, 1))
+
+        # The worker that lost the claim can no longer record an outcome
+        stale = Job.objects.get(pk=jobs[0].pk)
+        stale.claimed_by = 'dead-worker'
+        run_job(stale)
+        self.assertEqual(Job.objects.get(pk=jobs[0].pk).status, Job.Status.RUNNING)
+        self.assertTrue(run_job(reclaimed))
+        self.assertEqual(Job.objects.get(pk=jobs[0].pk).result, 0)
+
+    def test_stale_claims_use_up_attempts(self):
+        with invite_settings(JOB_MAX_ATTEMPTS=3, JOB_CLAIM_TIMEOUT=60):
+            job = enqueue('tests.echo', {'value': 1})
+            attempts = []
+            # Every worker that claims the job dies before finishing it
+            while claimed := claim_jobs(5):
+                attempts.append(claimed[0].attempts)
+                Job.objects.filter(pk=job.pk).update(claimed_at=timezone.now() - timedelta(minutes=5))
+
+        self.assertEqual(attempts, [0, 1, 2])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.claimed_by), (Job.Status.FAILED, 3, ''))
+        self.assertEqual(job.last_error, 'The job did not finish within JOB_CLAIM_TIMEOUT.')
+        self.assertIsNotNone(job.finished_at)
+
+    def test_retry_with_backoff(self):
+        with invite_settings(JOB_MAX_ATTEMPTS=2, JOB_RETRY_BACKOFF=30):
+            job = enqueue('tests.echo', {'value': 1, 'fail': True})
+            with self.assertLogs('invitations.jobs', 'ERROR'):
+                self.assertEqual(run_due_jobs(), (0, 1))
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.attempts), (Job.Status.QUEUED, 1))
+            self.assertGreater(job.next_attempt_at, timezone.now() + timedelta(seconds=20))
+            self.assertEqual(job.last_error, 'RuntimeError: Could not echo 1')
+
+            # Not due before its backoff is over
+            self.assertEqual(run_due_jobs(), (0, 0))
+            Job.objects.update(next_attempt_at=timezone.now())
+            with self.assertLogs('invitations.jobs', 'ERROR'):
+                self.assertEqual(run_due_jobs(), (0, 1))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.Status.FAILED, 2))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_status_endpoints(self):
+        mine = enqueue('tests.echo', {'value': 'mine'}, user=self.user)
+        enqueue('tests.echo', {'value': 'failing', 'fail': True}, user=self.user)
+        other = User.objects.create_user(email='other@example.com', username='other', password='password')
+        theirs = enqueue('tests.echo', {'value': 'theirs'}, user=other)
+        with invite_settings(JOB_MAX_ATTEMPTS=1), self.assertLogs('invitations.jobs', 'ERROR'):
+            self.assertEqual(run_due_jobs(), (2, 1))
+
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.get('/api/jobs/')
+        self.assertEqual(len(response.data['results']), 2)
+        response = client.get('/api/jobs/', {'status': Job.Status.SUCCEEDED})
+        self.assertEqual([job['id'] for job in response.data['results']], [str(mine.pk)])
+
+        job = client.get(f'/api/jobs/{mine.pk}/').data
+        self.assertEqual(
+            (job['status'], job['result'], job['attempts']), (Job.Status.SUCCEEDED, 'mine', 1)
+        )
+        self.assertEqual(client.get(f'/api/jobs/{theirs.pk}/').status_code, 404)
+
+
+class JobRunnerTests(TransactionTestCase):
+    """The runner keeps its workers busy, refreshes running claims and drives the pollers."""
+
+    def run_all(self, workers, pollers=()):
+        with ThreadPoolExecutor(JobRunner.pool_size(workers, pollers)) as executor:
+            runner = JobRunner(executor, workers, pollers=list(pollers))
+            return list(runner.run(once=True, interval=0.01))
+
+    def test_claims_as_workers_free_up(self):
+        slow = enqueue('tests.echo', {'value': 'slow', 'delay': 0.6})
+        for i in range(4):
+            enqueue('tests.echo', {'value': i, 'delay': 0.05})
+
+        with invite_settings(JOB_HEARTBEAT_INTERVAL=0.1):
+            results = self.run_all(workers=2)
+
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(succeeded for _, succeeded in results))
+        slow.refresh_from_db()
+        # The fast jobs went through the second worker while the slow one ran
+        fast_finished = Job.objects.exclude(pk=slow.pk).values_list('finished_at', flat=True)
+        self.assertLess(max(fast_finished), slow.finished_at)
+        # and the slow job's claim was refreshed until it finished
+        self.assertLess(slow.finished_at - slow.claimed_at, timedelta(seconds=0.4))
+
+    def test_pollers(self):
+        user = User.objects.create_user(email='host@example.com', username='host', password='password')
+        invitation = Invitation.objects.create(user=user, title='Party', event_date=date(2030, 1, 1))
+        guest = Guest.objects.create(invitation=invitation, name='Ann', email='ann@example.com')
+        queue_invitation_email(guest, invitation, 'https://example.com/invite/x')
+
+        self.assertEqual(self.run_all(workers=1, pollers=['emails.outbox']), [])
+        self.assertEqual(OutboundEmail.objects.get().status, OutboundEmail.Status.SENT)
+        self.assertEqual(len(mail.outbox), 1)
+
+
+class ExpirySweepTests(TestCase):
+    """Sweeps move expired rows in bounded chunks and keep the stats and caches in step."""
+
+    @classmethod
+    def setUpTestData(cls):
+        past = timezone.now() - timedelta(days=1)
+        cls.hosts = [
+            User.objects.create_user(email=f'host{i}@example.com', username=f'host{i}', password='password')
+            for i in range(2)
+        ]
+        cls.expired = [
+            Invitation.objects.create(
+                user=cls.hosts[i % 2], title=f'Past {i}', event_date=date(2020, 1, 1),
+                status=Invitation.Status.ACTIVE, expires_at=past - timedelta(hours=i),
+            )
+            for i in range(3)
+        ]
+        cls.draft = Invitation.objects.create(
+            user=cls.hosts[0], title='Old draft', event_date=date(2020, 1, 1), expires_at=past
+        )
+        cls.current = Invitation.objects.create(
+            user=cls.hosts[0], title='Upcoming', event_date=date(2030, 1, 1),
+            status=Invitation.Status.ACTIVE,
+        )
+        cls.links = [
+            ShareLink.objects.create(invitation=cls.current, expires_at=past - timedelta(hours=i))
+            for i in range(3)
+        ]
+        cls.live_link = ShareLink.objects.create(invitation=cls.current)
+
+    def setUp(self):
+        for host in self.hosts:
+            get_user_stats(host.pk)
+
+    def test_invitations_in_chunks(self):
+        self.assertEqual(expire_invitations(batch_size=2), 2)
+        # Oldest expiry first
+        self.assertEqual(
+            set(Invitation.objects.filter(status=Invitation.Status.EXPIRED).values_list('pk', flat=True)),
+            {self.expired[2].pk, self.expired[1].pk},
+        )
+        self.assertEqual(expire_invitations(batch_size=2), 2)
+        self.assertEqual(expire_invitations(batch_size=2), 0)
+
+        self.assertEqual(
+            set(Invitation.objects.exclude(status=Invitation.Status.EXPIRED).values_list('pk', flat=True)),
+            {self.current.pk},
+        )
+        self.assertEqual(rebuild_user_stats(fix=False), [])
+        self.assertEqual(get_user_stats(self.hosts[0].pk)['active_invitations'], 1)
+
+    def test_share_links_in_chunks(self):
+        token = self.links[0].token
+        get_public_entry(token)
+        self.assertIsNotNone(cache.get(_public_key(token)))
+
+        self.assertEqual(expire_share_links(batch_size=2), 2)
+        self.assertEqual(expire_share_links(batch_size=2), 1)
+        self.assertEqual(expire_share_links(batch_size=2), 0)
+
+        self.assertEqual(
+            list(ShareLink.objects.filter(is_active=True).values_list('pk', flat=True)), [self.live_link.pk]
+        )
+        self.assertIsNone(cache.get(_public_key(token)))
+
+    def test_command(self):
+        stdout = StringIO()
+        call_command('sweep_expired', once=True, batch_size=2, stdout=stdout)
+        self.assertIn('4 invitations expired, 3 share links deactivated', stdout.getvalue())
+
+
+class DashboardStatsTests(TestCase):
+    """The materialized dashboard stats match the ones computed from the tables."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='host@example.com', username='host', password='password')
+        cls.other = User.objects.create_user(email='other@example.com', username='other', password='password')
+        cls.template = Template.objects.create(id='party', name='Party', category='birthday')
+        for user, count in ((cls.user, 2), (cls.other, 1)):
+            for _ in range(count):
+                Invitation.objects.create(
+                    user=user, template=cls.template, title='Party', event_date=date(2030, 1, 1)
+                )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        for user in (self.user, self.other):
+            get_user_stats(user.pk)
+
+    def dashboard(self):
+        return self.client.get('/api/dashboard/stats/').json()
+
+    def assertInSync(self):
+        with invite_settings(DASHBOARD_STATS_MATERIALIZED=False):
+            computed = self.dashboard()
+        self.assertEqual(self.dashboard(), computed)
+        self.assertEqual(rebuild_user_stats(fix=False), [])
+
+    def test_invitation_and_guest_writes(self):
+        invitation = Invitation.objects.filter(user=self.user).first()
+        invitation.status = Invitation.Status.ACTIVE
+        invitation.save()
+        Guest.objects.create(invitation=invitation, name='Ann', email='ann@example.com')
+        self.assertEqual(self.dashboard()['active_invitations'], 1)
+        self.assertEqual(self.dashboard()['total_guests'], 1)
+        self.assertInSync()
+
+        invitation.delete()
+        self.assertEqual(self.dashboard()['invitations_by_template'], {'birthday': 1})
+        self.assertInSync()
+
+    def test_template_category_change(self):
+        self.template.category = 'wedding'
+        self.template.save()
+        # Applied as a delta: the rows stay in place, no rebuild needed
+        self.assertEqual(UserStats.objects.count(), 2)
+        self.assertEqual(self.dashboard()['invitations_by_template'], {'wedding': 2})
+        self.assertEqual(get_user_stats(self.other.pk)['invitations_by_template'], {'wedding': 1})
+        self.assertInSync()
+
+        self.template.name = 'Renamed'
+        self.template.save()
+        self.assertInSync()
+
+    def test_template_deleted(self):
+        self.template.delete()
+        self.assertEqual(self.dashboard()['invitations_by_template'], {})
+        self.assertEqual(self.dashboard()['total_invitations'], 2)
+        self.assertInSync()
+
+
+class SharedCacheTests(TestCase):
+    """Per-worker caches are invalidated through the shared default cache."""
+
+    def test_local_cache_is_refused(self):
+        for backend in ('locmem.LocMemCache', 'filebased.FileBasedCache'):
+            local = {'default': {'BACKEND': f'django.core.cache.backends.{backend}', 'LOCATION': ''}}
+            with override_settings(CACHES=local, DEBUG=False):
+                with self.assertRaises(ImproperlyConfigured):
+                    check_shared_cache()
+            with override_settings(CACHES=local, DEBUG=True):
+                check_shared_cache()
+
+        redis = {'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': 'redis://127.0.0.1:6379',
+        }}
+        with override_settings(CACHES=redis, DEBUG=False):
+            check_shared_cache()
+
+    @invite_settings(CATALOG_VERSION_CHECK_INTERVAL=0)
+    def test_catalog_reloads_in_other_workers(self):
+        template = Template.objects.create(id='party', name='Party', category='birthday')
+        worker = Catalog()
+        self.assertEqual(worker.get_template('party').name, 'Party')
+
+        # Saved in another worker: this one only learns of it through the cache
+        template.name = 'Birthday party'
+        template.save()
+        self.assertEqual(worker.get_template('party').name, 'Birthday party')
+
+    @invite_settings(SHARE_LINK_VERSION_CHECK_INTERVAL=0)
+    def test_revoked_share_link_in_other_workers(self):
+        user = User.objects.create_user(email='host@example.com', username='host', password='password')
+        template = Template.objects.create(id='party', name='Party', category='birthday')
+        invitation = Invitation.objects.create(
+            user=user, template=template, title='Party', event_date=date(2030, 1, 1)
+        )
+        share_link = ShareLink.objects.create(invitation=invitation)
+        worker = TokenCache()
+        self.assertTrue(worker.resolve(share_link.token).is_valid)
+        with self.assertNumQueries(0):
+            worker.resolve(share_link.token)
+
+        # Deactivated in another worker: this one only learns of it through the cache
+        share_link.is_active = False
+        share_link.save()
+        resolved = worker.resolve(share_link.token)
+        self.assertEqual(resolved.invitation_id, invitation.pk)
+        self.assertFalse(resolved.is_valid)
+
+
+class RowSerializerTests(TestCase):
+    """The compiled row serializers must render byte-identical JSON to the DRF ones."""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(
+            email='host@example.com', username='host', password='password', tier=User.Tier.PREMIUM
+        )
+        template = Template.objects.create(
+            id='parity', name='Parity', category='wedding', emoji='\U0001f389', hue_a=12, hue_b=300,
+            description='Line one\nline "two"', image_url='https://example.com/a.png',
+        )
+        theme = Theme.objects.create(
+            id='parity', name='Parity', primary_color='#fff', secondary_color='#000',
+            bg_gradient='linear-gradient(#fff, #000)',
+        )
+        full = Invitation.objects.create(
+            user=user, template=template, theme=theme, title='Wedding \u00e9', subtitle='Sub',
+            celebrant_name='Ana', event_date=date(2030, 6, 1), event_time=time(18, 30, 15),
+            venue_name='Hall', venue_address='1 Road\nTown',
+        )
+        bare = Invitation.objects.create(user=user, title='Bare', event_date=date(2030, 1, 1))
+        ShareLink.objects.create(invitation=full)
+        ShareLink.objects.create(invitation=bare)
+
+        Guest.objects.create(invitation=full, name='Pending', email='pending@example.com')
+        Guest.objects.create(
+            invitation=full, name='Responded \u00fc', email='responded@example.com', phone='+1 555',
+            rsvp_status=Guest.RSVPStatus.ATTENDING, rsvp_date=timezone.now() - timedelta(days=1),
+            plus_one=True, plus_one_count=2, notes='Vegan, "no nuts"', invitation_sent=True,
+            invitation_sent_at=timezone.now().replace(microsecond=0),
+        )
+
+    def assertSameJSON(self, expected, actual):
+        renderer = JSONRenderer()
+        self.assertEqual(renderer.render(expected), renderer.render(actual))
+
+    def test_guest_parity(self):
+        guests = Guest.objects.order_by('created_at')
+        self.assertSameJSON(GuestSerializer(guests, many=True).data, guest_rows.serialize(guests))
+
+    def test_template_and_theme_parity(self):
+        templates = Template.objects.all()
+        self.assertSameJSON(
+            TemplateSerializer(templates, many=True).data, template_rows.serialize(templates)
+        )
+        themes = Theme.objects.all()
+        self.assertSameJSON(ThemeSerializer(themes, many=True).data, theme_rows.serialize(themes))
+
+    def test_public_invitation_parity(self):
+        share_links = ShareLink.objects.select_related('invitation__template', 'invitation__theme')
+        for share_link in share_links:
+            row = ShareLink.objects.filter(pk=share_link.pk).values(
+                *public_invitation_rows.paths
+            ).get()
+            self.assertSameJSON(
+                PublicInvitationSerializer(share_link.invitation).data,
+                public_invitation_rows.to_representation(row),
+            )
+
+
+@benchmark
+class RowSerializerBenchmark(TestCase):
+    """Per-row serialization cost of GuestSerializer against guest_rows."""
+
+    rows = 10_000
+
+    def test_guest_rows_per_row_cost(self):
+        user = User.objects.create_user(
+            email='host@example.com', username='host', password='password', tier=User.Tier.PREMIUM
+        )
+        invitation = Invitation.objects.create(user=user, title='Party', event_date=date(2030, 1, 1))
+        now = timezone.now()
+        Guest.objects.bulk_create([
+            Guest(
+                invitation=invitation, name=f'Guest {i}', email=f'guest{i}@example.com',
+                rsvp_date=now if i % 2 else None, notes='Table 4' if i % 3 else '',
+            )
+            for i in range(self.rows)
+        ])
+        guests = Guest.objects.filter(invitation=invitation)
+        instances = list(guests)
+        rows = list(guests.values(*guest_rows.paths))
+
+        drf = min(timeit.repeat(lambda: GuestSerializer(instances, many=True).data, number=1, repeat=3))
+        fast = min(timeit.repeat(lambda: guest_rows.many(rows), number=1, repeat=3))
+
+        sys.stderr.write(
+            f'\n{self.rows} guests: GuestSerializer {drf / self.rows * 1e6:.2f} us/row, '
+            f'guest_rows {fast / self.rows * 1e6:.2f} us/row ({drf / fast:.1f}x)\n'
+        )
+        self.assertLess(fast, drf)
+
+
+class FastJSONTests(TestCase):
+    """The fast renderer and parser are drop-in replacements for DRF's JSON classes."""
+
+    def test_render_matches_drf(self):
+        data = {
+            'id': uuid.uuid4(),
+            'date': date(2030, 6, 1),
+            'time': time(18, 30, 5, 123456),
+            'aware': datetime(2030, 6, 1, 18, 30, 5, 123456, tzinfo=dt_timezone.utc),
+            'naive': datetime(2030, 6, 1, 18, 30, 5, 654321),
+            'whole': datetime(2030, 6, 1, 18, 30, tzinfo=dt_timezone(timedelta(hours=2))),
+            'price': Decimal('12.50'),
+            'text': 'caf\u00e9 \u2028 "quoted"',
+            'items': [1, 2.5, None, True],
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertNotIn(b'\xe2\x80\xa8', FastJSONRenderer().render(data))
+
+    def test_parse_errors_are_400(self):
+        self.assertEqual(
+            FastJSONParser().parse(BytesIO(b'{"name": "caf\xc3\xa9"}')), {'name': 'caf\u00e9'}
+        )
+        user = User.objects.create_user(email='host@example.com', username='host', password='password')
+        invitation = Invitation.objects.create(user=user, title='Party', event_date=date(2030, 1, 1))
+        token = ShareLink.objects.create(invitation=invitation).token
+        response = APIClient().post(
+            f'/api/invite/{token}/rsvp/', b'{"name": ', content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+@benchmark
+class FastJSONBenchmark(TestCase):
+    """Render time of GuestSerializer output: DRF's JSONRenderer against FastJSONRenderer."""
+
+    sizes = (1_000, 10_000, 100_000)
+
+    def test_render_guest_lists(self):
+        user = User.objects.create_user(
+            email='host@example.com', username='host', password='password', tier=User.Tier.PREMIUM
+        )
+        invitation = Invitation.objects.create(user=user, title='Party', event_date=date(2030, 1, 1))
+        now = timezone.now()
+        guests = [
+            Guest(
+                invitation=invitation, name=f'Guest {i}', email=f'guest{i}@example.com',
+                rsvp_date=now if i % 2 else None, notes='Table 4' if i % 3 else '',
+                created_at=now, updated_at=now,
+            )
+            for i in range(1_000)
+        ]
+        page = list(GuestSerializer(guests, many=True).data)
+
+        for size in self.sizes:
+            data = page * (size // len(page))
+            drf = min(timeit.repeat(lambda: JSONRenderer().render(data), number=1, repeat=3))
+            fast = min(timeit.repeat(lambda: FastJSONRenderer().render(data), number=1, repeat=3))
+            sys.stderr.write(
+                f'\n{size} guests: JSONRenderer {drf * 1e3:.1f} ms, '
+                f'FastJSONRenderer {fast * 1e3:.1f} ms ({drf / fast:.1f}x)'
+            )
+            if orjson is not None:
+                self.assertLess(fast, drf)
+        sys.stderr.write('\n')
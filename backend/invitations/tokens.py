@@ -0,0 +1,145 @@
+"""
+Process-local resolution of share link tokens.
+
+The public invitation and RSVP endpoints start by resolving the token in the
+URL to its invitation and validity window. Each worker keeps these in a
+bounded LRU (SHARE_LINK_CACHE_SIZE entries) for SHARE_LINK_CACHE_TIMEOUT
+seconds, and remembers unknown tokens for SHARE_LINK_NEGATIVE_CACHE_TIMEOUT
+seconds, so neither real guests nor bots scanning random tokens reach the
+database on repeat lookups.
+
+Saving or deleting a share link drops its entry (signals.py) and bumps a
+version stamp in the shared cache; like the catalog, workers compare the
+stamp at most every SHARE_LINK_VERSION_CHECK_INTERVAL seconds and clear
+their entries on a mismatch. The default cache therefore has to be shared by
+all workers (settings.CACHES; enforced by cache.check_shared_cache).
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import Http404
+from django.utils import timezone
+
+SHARE_LINK_VERSION_KEY = 'share-link-tokens:version'
+
+
+def _setting(name, default):
+    return settings.INVITEFLOW_SETTINGS.get(name, default)
+
+
+class ResolvedToken(NamedTuple):
+    """What the public endpoints need to know about a share link."""
+
+    invitation_id: uuid.UUID
+    is_active: bool
+    expires_at: datetime
+
+    @property
+    def is_valid(self):
+        """Mirror of ShareLink.is_valid."""
+        return self.is_active and timezone.now() <= self.expires_at
+
+
+class TokenCache:
+    """Bounded LRU of token -> ResolvedToken (or None for unknown tokens), with TTLs."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._version = None
+        self._checked_at = 0.0
+
+    def _version_due(self, now):
+        interval = _setting('SHARE_LINK_VERSION_CHECK_INTERVAL', 1)
+        return self._version is None or now - self._checked_at >= interval
+
+    def _sync_version(self, version, now):
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            self._checked_at = now
+
+    def _lookup(self, token, now):
+        """(found, entry) for ``token``, dropping it if its TTL has passed."""
+        with self._lock:
+            item = self._entries.get(token)
+            if item is None:
+                return False, None
+            entry, deadline = item
+            if now >= deadline:
+                del self._entries[token]
+                return False, None
+            self._entries.move_to_end(token)
+            return True, entry
+
+    def _store(self, token, entry, now):
+        if entry is None:
+            timeout = _setting('SHARE_LINK_NEGATIVE_CACHE_TIMEOUT', 10)
+        else:
+            timeout = _setting('SHARE_LINK_CACHE_TIMEOUT', 60)
+        size = _setting('SHARE_LINK_CACHE_SIZE', 10000)
+
+        with self._lock:
+            self._entries[token] = (entry, now + timeout)
+            self._entries.move_to_end(token)
+            while len(self._entries) > size:
+                self._entries.popitem(last=False)
+
+    @staticmethod
+    def _queryset(token):
+        from .models import ShareLink
+
+        return ShareLink.objects.filter(token=token).values_list(
+            'invitation_id', 'is_active', 'expires_at'
+        )
+
+    @staticmethod
+    def _result(entry):
+        if entry is None:
+            raise Http404('No ShareLink matches the given query.')
+        return entry
+
+    def resolve(self, token):
+        """The ResolvedToken for ``token``. Raises Http404 for unknown tokens."""
+        now = time.monotonic()
+        if self._version_due(now):
+            # A fresh stamp on a miss, so an evicted version always forces a reload.
+            version = cache.get_or_set(SHARE_LINK_VERSION_KEY, time.time_ns, timeout=None)
+            self._sync_version(version, now)
+
+        found, entry = self._lookup(token, now)
+        if not found:
+            row = self._queryset(token).first()
+            entry = ResolvedToken(*row) if row else None
+            self._store(token, entry, now)
+        return self._result(entry)
+
+    def discard(self, tokens):
+        """Drop ``tokens`` from this worker only."""
+        with self._lock:
+            for token in tokens:
+                self._entries.pop(token, None)
+
+    def invalidate(self, tokens):
+        """Drop ``tokens`` here and make every worker clear its entries."""
+        tokens = list(tokens)
+        self.discard(tokens)
+        cache.set(SHARE_LINK_VERSION_KEY, time.time_ns(), timeout=None)
+
+        def bump():
+            # Again once the change is visible to other connections.
+            self.discard(tokens)
+            cache.set(SHARE_LINK_VERSION_KEY, time.time_ns(), timeout=None)
+
+        transaction.on_commit(bump)
+
+
+share_link_tokens = TokenCache()
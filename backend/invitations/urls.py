@@ -9,6 +9,9 @@ from .views import (
     CategoryListView,
     InvitationViewSet,
     GuestViewSet,
+    OutboundEmailDetailView,
+    JobListView,
+    JobDetailView,
     PublicInvitationView,
     RSVPView,
     DashboardStatsView
@@ -36,6 +39,13 @@ urlpatterns = [
     # Dashboard
     path('dashboard/stats/', DashboardStatsView.as_view(), name='dashboard_stats'),
 
+    # Email outbox
+    path('emails/<uuid:pk>/', OutboundEmailDetailView.as_view(), name='email_detail'),
+
+    # Background jobs
+    path('jobs/', JobListView.as_view(), name='job_list'),
+    path('jobs/<uuid:pk>/', JobDetailView.as_view(), name='job_detail'),
+
     # Public invitation endpoints (no auth required)
     path('invite/<str:token>/', PublicInvitationView.as_view(), name='public_invitation'),
     path('invite/<str:token>/rsvp/', RSVPView.as_view(), name='rsvp'),
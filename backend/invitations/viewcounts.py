@@ -0,0 +1,125 @@
+"""
+Write-behind buffer for share link view counts.
+
+Public invitation hits only bump an in-process counter. A background thread
+folds the buffered increments into the database with atomic
+``F('view_count') + n`` updates, either every ``VIEW_COUNT_FLUSH_INTERVAL``
+seconds, as soon as ``VIEW_COUNT_FLUSH_THRESHOLD`` views are pending, or when
+the process exits.
+"""
+import atexit
+import logging
+import os
+import threading
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+FLUSH_CHUNK_SIZE = 500
+
+
+class ViewCountBuffer:
+    """Thread-safe per-token view counter that is flushed in batches."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = Counter()
+        self._wakeup = threading.Event()
+        self._flusher = None
+        self._pid = None
+
+    @property
+    def flush_interval(self):
+        return settings.INVITEFLOW_SETTINGS.get('VIEW_COUNT_FLUSH_INTERVAL', 5)
+
+    @property
+    def flush_threshold(self):
+        return settings.INVITEFLOW_SETTINGS.get('VIEW_COUNT_FLUSH_THRESHOLD', 500)
+
+    def increment(self, token, count=1):
+        """Record ``count`` views for a share link token without touching the database."""
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked worker: the parent's buffer and flusher thread don't belong to us.
+                self._pending.clear()
+                self._flusher = None
+                self._pid = os.getpid()
+            self._pending[token] += count
+            threshold_reached = self._pending.total() >= self.flush_threshold
+
+        if self.flush_interval:
+            self._ensure_flusher()
+            if threshold_reached:
+                self._wakeup.set()
+        elif threshold_reached:
+            self.flush()
+
+    def pending(self, token):
+        """Views recorded for ``token`` that have not been flushed yet."""
+        with self._lock:
+            return self._pending[token]
+
+    def flush(self):
+        """Write all buffered increments to the database. Returns the number of views written."""
+        from .models import ShareLink
+
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+
+        if not pending:
+            return 0
+
+        # One UPDATE per distinct increment instead of one per token.
+        tokens_by_count = defaultdict(list)
+        for token, count in pending.items():
+            tokens_by_count[count].append(token)
+
+        try:
+            with transaction.atomic():
+                for count, tokens in tokens_by_count.items():
+                    for start in range(0, len(tokens), FLUSH_CHUNK_SIZE):
+                        ShareLink.objects.filter(
+                            token__in=tokens[start:start + FLUSH_CHUNK_SIZE]
+                        ).update(view_count=F('view_count') + count)
+        except Exception:
+            # Put the views back so they are retried on the next flush.
+            with self._lock:
+                self._pending.update(pending)
+            raise
+
+        return pending.total()
+
+    def _ensure_flusher(self):
+        with self._lock:
+            if self._flusher is not None and self._flusher.is_alive():
+                return
+            self._flusher = threading.Thread(
+                target=self._run, name='view-count-flusher', daemon=True
+            )
+            self._flusher.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Failed to flush share link view counts')
+            finally:
+                connections.close_all()
+
+
+view_count_buffer = ViewCountBuffer()
+
+
+@atexit.register
+def _flush_at_exit():
+    try:
+        view_count_buffer.flush()
+    except Exception:
+        logger.exception('Failed to flush share link view counts at shutdown')
@@ -2,14 +2,34 @@ from rest_framework import generics, status, viewsets
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.settings import api_settings
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from django.db.models import Count, Q
-from django.core.mail import send_mail
+from django.db import transaction
 from django.conf import settings
-from django.utils import timezone
-
-from .models import Template, Theme, Invitation, Guest, ShareLink
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from .cache import get_public_entry, is_entry_valid
+from .catalog import catalog
+from .clones import clone_invitations
+from .counters import RSVP_COUNTER_FIELDS, compute_user_stats, get_user_stats
+from .emails import queue_bulk_invitations, queue_invitation_email
+from .imports import import_guests
+from .jobs import enqueue
+from .exports import EXPORT_FORMATS
+from .quotas import (
+    GUEST_LIMIT_MESSAGE, INVITATION_LIMIT_MESSAGE, guest_capacity, reserve_guests,
+    reserve_invitation
+)
+from .rsvp import get_rsvp, queue_rsvp, upsert_rsvp
+from .tokens import share_link_tokens
+from .pagination import GuestCursorPagination
+from .rowserializers import guest_rows
+from .models import Template, Theme, Invitation, Guest, ShareLink, OutboundEmail, Job
+from .viewcounts import view_count_buffer
 from .serializers import (
     TemplateSerializer,
     ThemeSerializer,
@@ -17,15 +37,34 @@ from .serializers import (
     InvitationDetailSerializer,
     InvitationCreateSerializer,
     InvitationUpdateSerializer,
+    InvitationCloneSerializer,
+    InvitationBulkCloneSerializer,
     GuestSerializer,
     GuestCreateSerializer,
     RSVPSerializer,
+    PublicRSVPSerializer,
     ShareLinkSerializer,
-    PublicInvitationSerializer,
+    ShareLinkCreateSerializer,
+    BulkSendSerializer,
+    OutboundEmailSerializer,
+    JobSerializer,
     DashboardStatsSerializer
 )
 
 
+def catalog_response(request, payload, etag):
+    """Response for a catalog payload, honouring conditional requests."""
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = Response(payload)
+    response['ETag'] = etag
+    patch_cache_control(
+        response, public=True,
+        max_age=settings.INVITEFLOW_SETTINGS.get('CATALOG_MAX_AGE', 300)
+    )
+    return response
+
+
 class TemplateListView(generics.ListAPIView):
     """List all active templates."""
 
@@ -34,12 +73,9 @@ class TemplateListView(generics.ListAPIView):
     permission_classes = [AllowAny]
     pagination_class = None
 
-    def get_queryset(self):
-        queryset = super().get_queryset()
-        category = self.request.query_params.get('category')
-        if category:
-            queryset = queryset.filter(category=category)
-        return queryset
+    def list(self, request, *args, **kwargs):
+        category = request.query_params.get('category') or None
+        return catalog_response(request, *catalog.template_list(category))
 
 
 class TemplateDetailView(generics.RetrieveAPIView):
@@ -49,6 +85,12 @@ class TemplateDetailView(generics.RetrieveAPIView):
     serializer_class = TemplateSerializer
     permission_classes = [AllowAny]
 
+    def retrieve(self, request, *args, **kwargs):
+        detail = catalog.template_detail(kwargs['pk'])
+        if detail is None:
+            raise Http404
+        return catalog_response(request, *detail)
+
 
 class ThemeListView(generics.ListAPIView):
     """List all active themes."""
@@ -58,6 +100,9 @@ class ThemeListView(generics.ListAPIView):
     permission_classes = [AllowAny]
     pagination_class = None
 
+    def list(self, request, *args, **kwargs):
+        return catalog_response(request, *catalog.theme_list())
+
 
 class InvitationViewSet(viewsets.ModelViewSet):
     """ViewSet for invitation CRUD operations."""
@@ -65,9 +110,11 @@ class InvitationViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Invitation.objects.filter(user=self.request.user).select_related(
-            'template', 'theme'
-        ).prefetch_related('guests')
+        queryset = Invitation.objects.filter(user=self.request.user)
+        if self.action in ('list', 'retrieve'):
+            # Load only the columns and joins the requested fields need
+            queryset = self.get_serializer_class().shape_queryset(queryset, self.request)
+        return queryset
 
     def get_serializer_class(self):
         if self.action == 'list':
@@ -79,36 +126,77 @@ class InvitationViewSet(viewsets.ModelViewSet):
         return InvitationDetailSerializer
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        with transaction.atomic():
+            if not reserve_invitation(self.request.user):
+                raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [INVITATION_LIMIT_MESSAGE]})
+            serializer.save(user=self.request.user)
+
+    def get_total_count(self):
+        """Invitation count for ?include_count=1, read from the host's stats row."""
+        return get_user_stats(self.request.user.pk)['total_invitations']
+
+    def perform_clone(self, sources, include_guests):
+        """Clone ``sources`` within the host's invitation and guest quotas."""
+        if include_guests:
+            for source in sources:
+                capacity = guest_capacity(source.max_guests, self.request.user.tier)
+                if capacity is not None and source.guests_total > capacity:
+                    raise ValidationError(GUEST_LIMIT_MESSAGE)
+
+        with transaction.atomic():
+            if not reserve_invitation(self.request.user, count=len(sources)):
+                raise ValidationError(INVITATION_LIMIT_MESSAGE)
+            return clone_invitations(sources, include_guests)
 
     @action(detail=True, methods=['post'])
     def clone(self, request, pk=None):
-        """Clone an existing invitation."""
+        """Clone an existing invitation, with its guest list if include_guests is set."""
         invitation = self.get_object()
 
-        new_invitation = Invitation.objects.create(
-            user=request.user,
-            template=invitation.template,
-            theme=invitation.theme,
-            title=f"{invitation.title} (Copy)",
-            subtitle=invitation.subtitle,
-            celebrant_name=invitation.celebrant_name,
-            event_date=invitation.event_date,
-            event_time=invitation.event_time,
-            venue_name=invitation.venue_name,
-            venue_address=invitation.venue_address,
-            max_guests=invitation.max_guests,
-            status=Invitation.Status.DRAFT
+        serializer = InvitationCloneSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        new_invitation, = self.perform_clone([invitation], serializer.validated_data['include_guests'])
+
+        return Response(
+            InvitationDetailSerializer(new_invitation, context=self.get_serializer_context()).data,
+            status=status.HTTP_201_CREATED
+        )
+
+    @action(detail=False, methods=['post'], url_path='clone')
+    def clone_many(self, request):
+        """Clone several invitations in one call."""
+        serializer = InvitationBulkCloneSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data['ids']
+
+        sources = {
+            invitation.pk: invitation
+            for invitation in Invitation.objects.filter(user=request.user, pk__in=ids)
+        }
+        missing = [str(pk) for pk in ids if pk not in sources]
+        if missing:
+            raise ValidationError({'ids': [f"Invitation not found: {pk}" for pk in missing]})
+
+        clones = self.perform_clone(
+            [sources[pk] for pk in ids], serializer.validated_data['include_guests']
         )
 
+        # Read the clones back the way the list endpoint does, with their template joined
+        queryset = InvitationListSerializer.shape_queryset(
+            Invitation.objects.filter(pk__in=[clone.pk for clone in clones]), request
+        )
+        rows = {invitation.pk: invitation for invitation in queryset}
         return Response(
-            InvitationDetailSerializer(new_invitation).data,
+            InvitationListSerializer(
+                [rows[clone.pk] for clone in clones], many=True,
+                context=self.get_serializer_context()
+            ).data,
             status=status.HTTP_201_CREATED
         )
 
     @action(detail=True, methods=['get', 'post'])
     def share_link(self, request, pk=None):
-        """Get or create a share link for the invitation."""
+        """Get or create a share link; with notify_guests, email it to the guests already invited."""
         invitation = self.get_object()
 
         if request.method == 'GET':
@@ -118,12 +206,78 @@ class InvitationViewSet(viewsets.ModelViewSet):
             return Response({'detail': 'No active share link.'}, status=status.HTTP_404_NOT_FOUND)
 
         # POST - create new share link
+        serializer = ShareLinkCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
         share_link = ShareLink.objects.create(invitation=invitation)
-        return Response(
-            ShareLinkSerializer(share_link).data,
-            status=status.HTTP_201_CREATED
+        data = ShareLinkSerializer(share_link).data
+
+        if serializer.validated_data['notify_guests']:
+            # One email per invited guest, so the fan-out always runs as a job
+            job = enqueue('emails.send_invitations', {
+                'invitation_id': str(invitation.pk),
+                'site_url': request.build_absolute_uri('/'),
+                'audience': 'invited',
+                'share_link_id': str(share_link.pk),
+            }, user=request.user)
+            data['job_id'] = job.id
+
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['post'])
+    def send_invitations(self, request, pk=None):
+        """Queue invitation emails for every guest matching a filter."""
+        invitation = self.get_object()
+
+        serializer = BulkSendSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        site_url = request.build_absolute_uri('/')
+
+        if invitation.guest_count > settings.INVITEFLOW_SETTINGS.get('BULK_SEND_INLINE_LIMIT', 200):
+            job = enqueue('emails.send_invitations', {
+                'invitation_id': str(invitation.pk),
+                'site_url': site_url,
+                'audience': data.get('audience'),
+                'guest_ids': [str(pk) for pk in data['guest_ids']] if 'guest_ids' in data else None,
+            }, user=request.user)
+            return Response({
+                'message': 'Invitations will be queued for delivery shortly.',
+                'job_id': job.id,
+                'status': job.status,
+            }, status=status.HTTP_202_ACCEPTED)
+
+        emails = queue_bulk_invitations(
+            invitation, site_url, data.get('audience'), data.get('guest_ids')
         )
 
+        return Response({
+            'message': f'{len(emails)} invitation(s) queued for delivery.',
+            'queued': len(emails),
+            'email_ids': [email.id for email in emails],
+        }, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=['get'])
+    def export(self, request, pk=None):
+        """Stream the guest list as CSV or NDJSON (?export_format=), with the guest list filters."""
+        invitation = self.get_object()
+
+        export_format = request.query_params.get('export_format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {'error': f"export_format must be one of: {', '.join(EXPORT_FORMATS)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        content_type, extension, stream = EXPORT_FORMATS[export_format]
+
+        guest_view = GuestViewSet(
+            request=request, kwargs={'invitation_pk': invitation.pk}, format_kwarg=None, action='list'
+        )
+        guests = guest_view.filter_queryset(invitation.guests.all())
+
+        response = StreamingHttpResponse(stream(guests), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="guests-{invitation.pk}.{extension}"'
+        return response
+
     @action(detail=True, methods=['get'])
     def analytics(self, request, pk=None):
         """Get analytics for an invitation."""
@@ -135,7 +289,8 @@ class InvitationViewSet(viewsets.ModelViewSet):
             'pending_count': invitation.pending_count,
             'not_attending_count': invitation.not_attending_count,
             'share_link_views': sum(
-                link.view_count for link in invitation.share_links.all()
+                link.view_count + view_count_buffer.pending(link.token)
+                for link in invitation.share_links.all()
             ),
             'invitation_sent_count': invitation.guests.filter(invitation_sent=True).count(),
         })
@@ -146,19 +301,56 @@ class GuestViewSet(viewsets.ModelViewSet):
 
     serializer_class = GuestSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = GuestCursorPagination
+    filterset_fields = ['rsvp_status', 'invitation_sent', 'plus_one']
+    search_fields = ['name', 'email']
 
     def get_queryset(self):
         invitation_id = self.kwargs.get('invitation_pk')
-        return Guest.objects.filter(
+        queryset = Guest.objects.filter(
             invitation_id=invitation_id,
             invitation__user=self.request.user
         )
+        if self.action in ('list', 'retrieve'):
+            queryset = self.get_serializer_class().shape_queryset(queryset, self.request)
+        return queryset
 
     def get_serializer_class(self):
         if self.action == 'create':
             return GuestCreateSerializer
         return GuestSerializer
 
+    def list(self, request, *args, **kwargs):
+        if 'fields' in request.query_params or 'expand' in request.query_params:
+            return super().list(request, *args, **kwargs)
+
+        # The full representation is built straight from values() rows
+        queryset = self.filter_queryset(self.get_queryset()).values(*guest_rows.paths)
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(guest_rows.many(queryset))
+        return self.get_paginated_response(guest_rows.many(page))
+
+    def get_total_count(self):
+        """Guest count for ?include_count=1, read from the invitation's stored counters.
+
+        Only available when the list is unfiltered or filtered by RSVP status alone.
+        """
+        params = self.request.query_params
+        filters = {name for name in [*self.filterset_fields, 'search'] if name in params}
+        if filters - {'rsvp_status'}:
+            return None
+
+        counter = 'guests_total'
+        if 'rsvp_status' in filters:
+            counter = RSVP_COUNTER_FIELDS.get(params['rsvp_status'])
+            if counter is None:
+                return None
+
+        return Invitation.objects.filter(
+            id=self.kwargs.get('invitation_pk'), user=self.request.user
+        ).values_list(counter, flat=True).first()
+
     def get_serializer_context(self):
         context = super().get_serializer_context()
         invitation_id = self.kwargs.get('invitation_pk')
@@ -173,91 +365,85 @@ class GuestViewSet(viewsets.ModelViewSet):
             Invitation, id=invitation_id, user=self.request.user
         )
 
-        if not invitation.can_add_guest():
-            from rest_framework.exceptions import ValidationError
-            raise ValidationError("Maximum guest limit reached for this invitation.")
-
-        serializer.save(invitation=invitation)
+        with transaction.atomic():
+            if reserve_guests(invitation.pk, self.request.user.tier) == 0:
+                raise ValidationError(GUEST_LIMIT_MESSAGE)
+            serializer.save(invitation=invitation)
 
     @action(detail=True, methods=['post'])
     def send_invitation(self, request, invitation_pk=None, pk=None):
-        """Send invitation email to a guest."""
+        """Queue the invitation email for a guest."""
         guest = self.get_object()
 
-        # Get or create share link
         invitation = guest.invitation
-        share_link = invitation.share_links.filter(is_active=True).first()
-        if not share_link:
-            share_link = ShareLink.objects.create(invitation=invitation)
-
-        # Send email
-        try:
-            send_mail(
-                subject=f"You're Invited: {invitation.title}",
-                message=f"""
-Hi {guest.name},
-
-You've been invited to {invitation.title}!
-
-Event Date: {invitation.event_date}
-Venue: {invitation.venue_name}
-
-Please RSVP using this link:
-{request.build_absolute_uri(f'/invite/{share_link.token}')}
-
-We hope to see you there!
-                """,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[guest.email],
-                fail_silently=False,
-            )
+        share_link = invitation.get_active_share_link()
 
-            guest.invitation_sent = True
-            guest.invitation_sent_at = timezone.now()
-            guest.save()
+        email = queue_invitation_email(
+            guest,
+            invitation,
+            request.build_absolute_uri(f'/invite/{share_link.token}')
+        )
 
-            return Response({'message': 'Invitation sent successfully.'})
-        except Exception as e:
-            return Response(
-                {'error': f'Failed to send email: {str(e)}'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+        return Response({
+            'message': 'Invitation queued for delivery.',
+            'email_id': email.id,
+            'status': email.status,
+        }, status=status.HTTP_202_ACCEPTED)
 
     @action(detail=False, methods=['post'])
     def bulk_create(self, request, invitation_pk=None):
-        """Add multiple guests at once."""
-        invitation = get_object_or_404(
-            Invitation, id=invitation_pk, user=request.user
-        )
-
+        """Add multiple guests at once; large imports run as a background job."""
         guests_data = request.data.get('guests', [])
-        created_guests = []
-        errors = []
+        invitation = get_object_or_404(Invitation, id=invitation_pk, user=request.user)
 
-        for guest_data in guests_data:
-            serializer = GuestCreateSerializer(
-                data=guest_data,
-                context={'invitation': invitation, 'request': request}
-            )
-            if serializer.is_valid():
-                if invitation.can_add_guest():
-                    guest = serializer.save(invitation=invitation)
-                    created_guests.append(GuestSerializer(guest).data)
-                else:
-                    errors.append({
-                        'email': guest_data.get('email'),
-                        'error': 'Maximum guest limit reached.'
-                    })
-            else:
-                errors.append({
-                    'email': guest_data.get('email'),
-                    'error': serializer.errors
-                })
+        if len(guests_data) > settings.INVITEFLOW_SETTINGS.get('GUEST_IMPORT_INLINE_LIMIT', 500):
+            job = enqueue('guests.import', {
+                'invitation_id': str(invitation.pk),
+                'guests': guests_data,
+            }, user=request.user)
+            return Response({
+                'message': 'Guest import queued.',
+                'job_id': job.id,
+                'status': job.status,
+            }, status=status.HTTP_202_ACCEPTED)
+
+        new_guests, errors = import_guests(invitation, request.user.tier, guests_data)
 
         return Response({
-            'created': created_guests,
+            'created': GuestSerializer(new_guests, many=True).data,
             'errors': errors
-        }, status=status.HTTP_201_CREATED if created_guests else status.HTTP_400_BAD_REQUEST)
+        }, status=status.HTTP_201_CREATED if new_guests else status.HTTP_400_BAD_REQUEST)
+
+
+class OutboundEmailDetailView(generics.RetrieveAPIView):
+    """Delivery status of a queued email."""
+
+    serializer_class = OutboundEmailSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return OutboundEmail.objects.filter(guest__invitation__user=self.request.user)
+
+
+class JobListView(generics.ListAPIView):
+    """The authenticated user's background jobs, newest first."""
+
+    serializer_class = JobSerializer
+    permission_classes = [IsAuthenticated]
+    filterset_fields = ['status', 'task']
+
+    def get_queryset(self):
+        return Job.objects.filter(user=self.request.user)
+
+
+class JobDetailView(generics.RetrieveAPIView):
+    """Status and result of a background job."""
+
+    serializer_class = JobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return Job.objects.filter(user=self.request.user)
 
 
 class PublicInvitationView(APIView):
@@ -266,62 +452,92 @@ class PublicInvitationView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request, token):
-        share_link = get_object_or_404(ShareLink, token=token)
+        # Unknown, expired and deactivated tokens are answered without the payload cache
+        if not share_link_tokens.resolve(token).is_valid:
+            return Response(
+                {'error': 'This invitation link has expired or is no longer valid.'},
+                status=status.HTTP_410_GONE
+            )
 
-        if not share_link.is_valid:
+        entry = get_public_entry(token)
+        if not is_entry_valid(entry):
             return Response(
                 {'error': 'This invitation link has expired or is no longer valid.'},
                 status=status.HTTP_410_GONE
             )
 
-        share_link.increment_view_count()
+        view_count_buffer.increment(token)
+
+        last_modified = int(entry['last_modified'].timestamp())
+        response = get_conditional_response(
+            request, etag=entry['etag'], last_modified=last_modified
+        )
+        if response is None:
+            response = Response(entry['payload'])
 
-        return Response(PublicInvitationSerializer(share_link.invitation).data)
+        # Returning guests revalidate and get a 304 while the payload is unchanged
+        response['ETag'] = entry['etag']
+        response['Last-Modified'] = http_date(last_modified)
+        patch_cache_control(response, no_cache=True)
+        return response
 
 
 class RSVPView(APIView):
-    """Public endpoint for RSVP submission."""
+    """Public endpoint for RSVP submission.
 
-    permission_classes = [AllowAny]
+    With RSVP_INGESTION = 'queued', submissions are appended to the RSVP log
+    and acknowledged with 202; GET ?email= reads a guest's RSVP back including
+    submissions that have not been applied yet.
+    """
 
-    def post(self, request, token):
-        share_link = get_object_or_404(ShareLink, token=token)
+    permission_classes = [AllowAny]
 
+    def get_share_link(self, token):
+        share_link = share_link_tokens.resolve(token)
         if not share_link.is_valid:
+            return None
+        return share_link
+
+    def link_gone_response(self):
+        return Response(
+            {'error': 'This invitation link has expired or is no longer valid.'},
+            status=status.HTTP_410_GONE
+        )
+
+    def get(self, request, token):
+        share_link = self.get_share_link(token)
+        if share_link is None:
+            return self.link_gone_response()
+
+        email = request.query_params.get('email')
+        if not email:
             return Response(
-                {'error': 'This invitation link has expired or is no longer valid.'},
-                status=status.HTTP_410_GONE
+                {'error': 'The email query parameter is required.'},
+                status=status.HTTP_400_BAD_REQUEST
             )
 
+        guest = get_rsvp(share_link.invitation_id, email)
+        if guest is None:
+            raise Http404
+        return Response({'guest': PublicRSVPSerializer(guest).data})
+
+    def post(self, request, token):
+        share_link = self.get_share_link(token)
+        if share_link is None:
+            return self.link_gone_response()
+
         serializer = RSVPSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        invitation = share_link.invitation
-        data = serializer.validated_data
-
-        # Check if guest already exists
-        guest, created = Guest.objects.get_or_create(
-            invitation=invitation,
-            email=data['email'],
-            defaults={
-                'name': data['name'],
-                'rsvp_status': data['rsvp_status'],
-                'plus_one': data['plus_one'],
-                'plus_one_count': data['plus_one_count'],
-                'notes': data.get('notes', ''),
-                'rsvp_date': timezone.now()
-            }
-        )
+        if settings.INVITEFLOW_SETTINGS.get('RSVP_INGESTION', 'direct') == 'queued':
+            queue_rsvp(share_link.invitation_id, serializer.validated_data)
+            guest = get_rsvp(share_link.invitation_id, serializer.validated_data['email'])
+            return Response({
+                'message': 'RSVP received.',
+                'guest': PublicRSVPSerializer(guest).data
+            }, status=status.HTTP_202_ACCEPTED)
 
-        if not created:
-            # Update existing guest RSVP
-            guest.name = data['name']
-            guest.rsvp_status = data['rsvp_status']
-            guest.plus_one = data['plus_one']
-            guest.plus_one_count = data['plus_one_count']
-            guest.notes = data.get('notes', '')
-            guest.rsvp_date = timezone.now()
-            guest.save()
+        guest = upsert_rsvp(share_link.invitation_id, serializer.validated_data)
 
         return Response({
             'message': 'RSVP submitted successfully.',
@@ -335,29 +551,10 @@ class DashboardStatsView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        invitations = Invitation.objects.filter(user=request.user)
-
-        # Get counts by template
-        template_counts = invitations.values('template__category').annotate(
-            count=Count('id')
-        )
-        invitations_by_template = {
-            item['template__category']: item['count']
-            for item in template_counts if item['template__category']
-        }
-
-        # Calculate totals
-        guests = Guest.objects.filter(invitation__user=request.user)
-
-        stats = {
-            'total_invitations': invitations.count(),
-            'active_invitations': invitations.filter(status=Invitation.Status.ACTIVE).count(),
-            'total_guests': guests.count(),
-            'total_attending': guests.filter(rsvp_status=Guest.RSVPStatus.ATTENDING).count(),
-            'total_pending': guests.filter(rsvp_status=Guest.RSVPStatus.PENDING).count(),
-            'total_not_attending': guests.filter(rsvp_status=Guest.RSVPStatus.NOT_ATTENDING).count(),
-            'invitations_by_template': invitations_by_template,
-        }
+        if settings.INVITEFLOW_SETTINGS.get('DASHBOARD_STATS_MATERIALIZED', True):
+            stats = get_user_stats(request.user.pk)
+        else:
+            stats = compute_user_stats(request.user.pk)
 
         return Response(DashboardStatsSerializer(stats).data)
 
@@ -0,0 +1,55 @@
+"""
+Admin paginator that never counts a whole large table.
+
+Django's changelist asks its paginator for ``count``, which is a COUNT(*)
+over the filtered queryset. Here rows are counted only up to
+ADMIN_EXACT_COUNT_LIMIT; past that, an unfiltered changelist reports the
+database's own row estimate (PostgreSQL, MySQL), so browsing a large table
+costs a bounded count. Filtered changelists, and databases that keep no
+estimate (SQLite), fall back to an exact count: a total capped at the limit
+would leave the rows past it out of reach.
+"""
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+def estimated_row_count(model, using='default'):
+    """The database's estimate of the rows in ``model``'s table, or None if it keeps none."""
+    connection = connections[using]
+    table = model._meta.db_table
+    if connection.vendor == 'postgresql':
+        sql = 'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass'
+    elif connection.vendor == 'mysql':
+        sql = (
+            'SELECT table_rows FROM information_schema.tables '
+            'WHERE table_schema = DATABASE() AND table_name = %s'
+        )
+    else:
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [table])
+        row = cursor.fetchone()
+    # reltuples is -1 for tables that were never analyzed
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator whose count is exact up to ADMIN_EXACT_COUNT_LIMIT rows and estimated beyond."""
+
+    @cached_property
+    def count(self):
+        limit = settings.INVITEFLOW_SETTINGS.get('ADMIN_EXACT_COUNT_LIMIT', 10000)
+        queryset = self.object_list
+        counted = queryset.order_by()[:limit + 1].count()
+        if counted <= limit:
+            return counted
+        if not queryset.query.where:
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None:
+                return max(estimate, counted)
+        return queryset.count()
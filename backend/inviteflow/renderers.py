@@ -0,0 +1,47 @@
+"""
+JSON renderer backed by orjson when it is installed.
+
+orjson serializes dicts, lists, strings, numbers and UUIDs in C. Everything
+else (datetimes, dates and times, Decimal, lazy translation strings,
+querysets, ...) reaches the ``default`` hook, which hands it to DRF's encoder,
+so the output matches DRF's JSONRenderer. Datetimes are passed through on
+purpose: orjson's own format keeps microseconds, while DRF truncates them to
+milliseconds. Without orjson the DRF renderer is used unchanged.
+"""
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+_encoder = JSONEncoder()
+
+
+def orjson_default(obj):
+    """Encode the types orjson has no native support for, the way DRF does."""
+    return _encoder.default(obj)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """Drop-in replacement for DRF's JSONRenderer that uses orjson when available."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+
+        options = ORJSON_OPTIONS
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            options |= orjson.OPT_INDENT_2
+
+        ret = orjson.dumps(data, default=orjson_default, option=options)
+        # Like DRF, escape the separators that are valid JSON but not valid JavaScript
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
@@ -70,9 +70,35 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'TEST': {
+            # On disk, so concurrency tests see real SQLite locking
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
     }
 }
 
+# Cache. It must be shared by every worker process: the per-worker token and
+# catalog caches and the cached users and public payloads are invalidated
+# through it. Configure Redis or Memcached with DJANGO_CACHE_BACKEND and
+# DJANGO_CACHE_LOCATION; outside DEBUG, startup fails on any other backend
+# (see invitations.cache.check_shared_cache). Without one, local development
+# uses a file cache in a directory private to this checkout.
+if os.environ.get('DJANGO_CACHE_BACKEND'):
+    CACHES = {
+        'default': {
+            'BACKEND': os.environ['DJANGO_CACHE_BACKEND'],
+            'LOCATION': os.environ.get('DJANGO_CACHE_LOCATION', ''),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': BASE_DIR / '.cache',
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -103,12 +129,22 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    # orjson-backed when installed, DRF's stdlib JSON classes otherwise
+    'DEFAULT_RENDERER_CLASSES': [
+        'inviteflow.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'inviteflow.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'invitations.pagination.KeysetPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
@@ -125,6 +161,9 @@ SIMPLE_JWT = {
     'BLACKLIST_AFTER_ROTATION': True,
     'AUTH_HEADER_TYPES': ('Bearer',),
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
+    # Tokens carry the user's tier and token version (accounts.serializers)
+    'TOKEN_OBTAIN_SERIALIZER': 'accounts.serializers.UserTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'accounts.serializers.UserTokenRefreshSerializer',
 }
 
 # CORS Configuration
@@ -156,4 +195,40 @@ INVITEFLOW_SETTINGS = {
     'PREMIUM_TIER_MAX_INVITATIONS': None,  # Unlimited
     'PREMIUM_TIER_MAX_GUESTS_PER_INVITATION': None,  # Unlimited
     'SHARE_LINK_EXPIRY_DAYS': 30,
+    'GUEST_BULK_CREATE_BATCH_SIZE': 500,
+    'GUEST_EXPORT_CHUNK_SIZE': 2000,  # Rows fetched per round trip when streaming exports
+    'DASHBOARD_STATS_MATERIALIZED': True,  # Serve the dashboard from the user_stats table
+    # Email outbox (delivered by `manage.py send_outbox`)
+    'EMAIL_BATCH_SIZE': 100,
+    'EMAIL_CHUNK_SIZE': 50,  # Messages sent per SMTP connection
+    'EMAIL_RATE_LIMIT': 0,  # Messages per second, 0 = unlimited
+    'EMAIL_MAX_ATTEMPTS': 5,
+    'EMAIL_RETRY_BACKOFF': 60,  # Seconds, doubled after every failed attempt
+    'EMAIL_CLAIM_TIMEOUT': 600,  # Seconds before a stuck claim is retried
+    'VIEW_COUNT_FLUSH_INTERVAL': 5,  # Seconds; 0 flushes inline once the threshold is hit
+    'VIEW_COUNT_FLUSH_THRESHOLD': 500,
+    'PUBLIC_INVITATION_CACHE_TIMEOUT': 3600,  # Seconds
+    # Per-worker share link token resolution (see invitations/tokens.py)
+    'SHARE_LINK_CACHE_SIZE': 10000,
+    'SHARE_LINK_CACHE_TIMEOUT': 60,  # Seconds
+    'SHARE_LINK_NEGATIVE_CACHE_TIMEOUT': 10,  # Seconds unknown tokens are remembered
+    'SHARE_LINK_VERSION_CHECK_INTERVAL': 1,  # Seconds between invalidation checks
+    'CATALOG_VERSION_CHECK_INTERVAL': 1,  # Seconds between template/theme version checks
+    'CATALOG_MAX_AGE': 300,  # Seconds clients may cache template/theme lists
+    # 'queued' appends RSVPs to a log applied by `manage.py apply_rsvps`
+    'RSVP_INGESTION': 'direct',
+    'RSVP_APPLY_BATCH_SIZE': 500,
+    'AUTH_USER_CACHE_TIMEOUT': 60,  # Seconds authenticated users are served from the cache
+    # Background jobs (run by `manage.py run_jobs`)
+    'JOB_WORKERS': 4,
+    'JOB_BATCH_SIZE': 20,
+    'JOB_MAX_ATTEMPTS': 3,
+    'JOB_RETRY_BACKOFF': 30,  # Seconds, doubled after every failed attempt
+    'JOB_HEARTBEAT_INTERVAL': 60,  # Seconds between refreshes of a running job's claim
+    'JOB_CLAIM_TIMEOUT': 300,  # Seconds without a refresh before a running job is run again
+    'GUEST_IMPORT_INLINE_LIMIT': 500,  # Larger bulk imports run as a job
+    'BULK_SEND_INLINE_LIMIT': 200,  # Bulk sends on larger guest lists run as a job
+    'EXPIRY_BATCH_SIZE': 1000,  # Rows per transaction in `manage.py sweep_expired`
+    'CLONE_MAX_INVITATIONS': 20,  # Invitations cloned per bulk clone request
+    'ADMIN_EXACT_COUNT_LIMIT': 10000,  # Admin changelists estimate row counts above this
 }